@@ -0,0 +1,29 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Import times of the package, each measured in a fresh interpreter (timeraw_*): the package alone, and the package
+plus the modules needed by a single widget or explorer.
+"""
+
+def timeraw_import_package():
+    return "import pypowsybl_jupyter"
+
+def timeraw_import_display_sld():
+    return "from pypowsybl_jupyter import display_sld"
+
+def timeraw_import_display_nad():
+    return "from pypowsybl_jupyter import display_nad"
+
+def timeraw_import_network_map():
+    return "from pypowsybl_jupyter import NetworkMapWidget"
+
+def timeraw_import_network_explorer():
+    return "from pypowsybl_jupyter import network_explorer"
+
+def timeraw_first_sld_widget():
+    return "SldWidget(None)", "from pypowsybl_jupyter import SldWidget"
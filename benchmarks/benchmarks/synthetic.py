@@ -0,0 +1,107 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Synthetic networks of configurable size, with substations and lines positions, and time series data.
+
+The substations are laid on a square grid; each substation holds a high voltage (400 kV) and a
+low voltage (63 kV) voltage level, connected through a two windings transformer. The high voltage
+levels are connected to their right and bottom neighbours with lines; each low voltage level has a load.
+"""
+
+import numpy as np
+import pandas as pd
+import pypowsybl.network as pn
+
+def create_synthetic_network(substations_count: int, line_positions: bool = True) -> pn.Network:
+    side = int(np.ceil(np.sqrt(substations_count)))
+    idx = np.arange(substations_count)
+    rows, cols = idx // side, idx % side
+    sub_ids = [f'S{i}' for i in idx]
+
+    network = pn.create_empty(f'synthetic-{substations_count}')
+    network.create_substations(pd.DataFrame({'name': [f'Substation {i}' for i in idx], 'country': 'FR'},
+                                            index=pd.Index(sub_ids, name='id')))
+
+    hv_ids = [f'S{i}_400' for i in idx]
+    lv_ids = [f'S{i}_63' for i in idx]
+    vls = pd.DataFrame({
+        'substation_id': sub_ids + sub_ids,
+        'name': [f'{vl} 400kV' for vl in hv_ids] + [f'{vl} 63kV' for vl in lv_ids],
+        'topology_kind': 'BUS_BREAKER',
+        'nominal_v': [400.0] * substations_count + [63.0] * substations_count,
+        'high_voltage_limit': [440.0] * substations_count + [70.0] * substations_count,
+        'low_voltage_limit': [360.0] * substations_count + [55.0] * substations_count,
+    }, index=pd.Index(hv_ids + lv_ids, name='id'))
+    network.create_voltage_levels(vls)
+    network.create_buses(pd.DataFrame({'voltage_level_id': hv_ids + lv_ids},
+                                      index=pd.Index([f'{vl}_B' for vl in hv_ids + lv_ids], name='id')))
+
+    network.create_2_windings_transformers(pd.DataFrame({
+        'voltage_level1_id': hv_ids, 'bus1_id': [f'{vl}_B' for vl in hv_ids],
+        'voltage_level2_id': lv_ids, 'bus2_id': [f'{vl}_B' for vl in lv_ids],
+        'rated_u1': 400.0, 'rated_u2': 63.0, 'r': 0.5, 'x': 10.0, 'g': 0.0, 'b': 0.0,
+    }, index=pd.Index([f'T{i}' for i in idx], name='id')))
+    network.create_loads(pd.DataFrame({
+        'voltage_level_id': lv_ids, 'bus_id': [f'{vl}_B' for vl in lv_ids], 'p0': 10.0, 'q0': 2.0,
+    }, index=pd.Index([f'LD{i}' for i in idx], name='id')))
+
+    right = idx[(cols < side - 1) & (idx + 1 < substations_count)]
+    down = idx[idx + side < substations_count]
+    side1 = np.concatenate([right, down])
+    side2 = np.concatenate([right + 1, down + side])
+    line_ids = [f'L{a}-{b}' for a, b in zip(side1, side2)]
+    network.create_lines(pd.DataFrame({
+        'voltage_level1_id': [hv_ids[i] for i in side1], 'bus1_id': [f'{hv_ids[i]}_B' for i in side1],
+        'voltage_level2_id': [hv_ids[i] for i in side2], 'bus2_id': [f'{hv_ids[i]}_B' for i in side2],
+        'r': 0.1, 'x': 1.0, 'g1': 0.0, 'b1': 0.0, 'g2': 0.0, 'b2': 0.0,
+    }, index=pd.Index(line_ids, name='id')))
+
+    latitudes = 42.0 + rows * (9.0 / side)
+    longitudes = -4.0 + cols * (12.0 / side)
+    network.create_extensions('substationPosition', pd.DataFrame({'latitude': latitudes, 'longitude': longitudes},
+                                                                 index=pd.Index(sub_ids, name='id')))
+
+    if line_positions:
+        # a middle point for each line, in addition to its two ends
+        mid_lat = (latitudes[side1] + latitudes[side2]) / 2 + 0.01
+        mid_lon = (longitudes[side1] + longitudes[side2]) / 2 + 0.01
+        coordinates = np.stack([np.column_stack([latitudes[side1], mid_lat, latitudes[side2]]),
+                                np.column_stack([longitudes[side1], mid_lon, longitudes[side2]])], axis=-1)
+        network = _with_line_positions(network, line_ids, coordinates)
+
+    return network
+
+def _with_line_positions(network: pn.Network, line_ids, coordinates) -> pn.Network:
+    # the linePosition extension cannot be created through the network's create_extensions API:
+    # it is injected in the network's XIIDM export, then the network is reloaded
+    xiidm = network.save_to_string('XIIDM')
+    extensions = ''.join(
+        f'<iidm:extension id="{line_id}"><lp:linePosition>'
+        + ''.join(f'<sp:coordinate longitude="{lon}" latitude="{lat}"/>' for lat, lon in coords)
+        + '</lp:linePosition></iidm:extension>'
+        for line_id, coords in zip(line_ids, coordinates))
+    if 'xmlns:lp=' not in xiidm:
+        xiidm = xiidm.replace('<iidm:network ', '<iidm:network xmlns:lp="http://www.powsybl.org/schema/iidm/ext/line_position/1_0" ', 1)
+    if 'xmlns:sp=' not in xiidm:
+        xiidm = xiidm.replace('<iidm:network ', '<iidm:network xmlns:sp="http://www.powsybl.org/schema/iidm/ext/substation_position/1_0" ', 1)
+    xiidm = xiidm.replace('</iidm:network>', extensions + '</iidm:network>')
+    return pn.load_from_string(f'{network.id}.xiidm', xiidm)
+
+def create_synthetic_time_series(network: pn.Network, time_steps_count: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    branch_ids = network.get_branches(attributes=[]).index.to_numpy()
+    timestamps = pd.date_range('2024-01-01', periods=time_steps_count, freq='h')
+    values = rng.normal(100.0, 30.0, size=(time_steps_count, len(branch_ids)))
+    return pd.DataFrame({
+        'timestamp': np.repeat(timestamps, len(branch_ids)),
+        'branch_id': np.tile(branch_ids, time_steps_count),
+        'value1': values.ravel(),
+        'value2': -values.ravel(),
+        'connected1': True,
+        'connected2': rng.random(time_steps_count * len(branch_ids)) > 0.01,
+    })
@@ -0,0 +1,381 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Python-side data preparation of the widgets: timings (time_*), payload sizes (track_*_size, in characters),
+python memory peaks (track_*_python_peak, in bytes, as measured by tracemalloc) and process memory peaks (peakmem_*).
+No browser is involved: the widgets are created without a frontend.
+"""
+
+import functools
+import json
+import os
+import tempfile
+import tracemalloc
+
+import pypowsybl.network as pn
+import pypowsybl.security as sa
+
+from pypowsybl_jupyter import display_nad, display_sld, NetworkMapWidget
+from pypowsybl_jupyter.selectcontext import SelectContext
+from pypowsybl_jupyter.networksnapshot import invalidate_network_snapshot
+from pypowsybl_jupyter.nadexplorer import prepare_branch_states
+from pypowsybl_jupyter.timeseries import DataFrameTimeSeriesSource, compute_branch_aggregates
+from pypowsybl_jupyter.networkexplorer import get_hovering_equipment_info, format_to_html_table
+from pypowsybl_jupyter.vlgraph import get_voltage_level_graph
+from pypowsybl_jupyter.flowsrefresh import (
+    get_terminal_values, get_bus_values, get_nad_branch_states, get_nad_voltage_level_states, get_sld_feeder_values
+)
+from pypowsybl_jupyter.variantcomparison import VariantComparison
+from pypowsybl_jupyter.contingencybrowser import ContingencyResults
+from pypowsybl_jupyter.scheduler import NetworkScheduler, Priority
+from pypowsybl_jupyter.diagramcache import DiagramCache, get_network_checksum
+
+from .synthetic import create_synthetic_network, create_synthetic_time_series
+
+SIZES = [100, 1000, 5000]
+
+@functools.lru_cache(maxsize=None)
+def get_network(substations_count):
+    return create_synthetic_network(substations_count)
+
+@functools.lru_cache(maxsize=None)
+def get_time_series(substations_count, time_steps_count):
+    return create_synthetic_time_series(get_network(substations_count), time_steps_count)
+
+def python_peak(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def map_payload_size(widget):
+    return sum(len(data) for data in (widget.smap, widget.spos, widget.lmap, widget.lpos, widget.tlmap, widget.hlmap))
+
+
+class NetworkMapSuite:
+    params = SIZES
+    param_names = ['substations']
+    timeout = 600
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        self.widget = NetworkMapWidget(self.network)
+
+    # the network snapshot is invalidated, so that the network tables fetches are part of the measures
+    def time_extract_map_data(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        self.widget.extract_map_data(self.network, True, False)
+
+    def time_extract_map_data_with_line_geodata(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        self.widget.extract_map_data(self.network, True, True)
+
+    def time_extract_map_data_from_snapshot(self, substations_count):
+        self.widget.extract_map_data(self.network, True, False)
+
+    def time_network_map_widget(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        NetworkMapWidget(self.network)
+
+    def peakmem_network_map_widget(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        NetworkMapWidget(self.network)
+
+    def track_extract_map_data_python_peak(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        return python_peak(self.widget.extract_map_data, self.network, True, True)
+    track_extract_map_data_python_peak.unit = 'bytes'
+
+    def track_map_payload_size(self, substations_count):
+        return map_payload_size(NetworkMapWidget(self.network, use_line_geodata=True))
+    track_map_payload_size.unit = 'characters'
+
+    def track_map_payload_size_top_tier(self, substations_count):
+        return map_payload_size(NetworkMapWidget(self.network, use_line_geodata=True, nominal_voltages_top_tiers_filter=1,
+                                                 load_nominal_voltages_on_demand=True))
+    track_map_payload_size_top_tier.unit = 'characters'
+
+    def time_extract_clusters_data(self, substations_count):
+        self.widget.extract_clusters_data(self.network, True, 7)
+
+    def track_clusters_payload_size(self, substations_count):
+        return len(NetworkMapWidget(self.network, cluster_zoom_threshold=7).clusters)
+    track_clusters_payload_size.unit = 'characters'
+
+
+class MapSpatialIndexSuite:
+    params = SIZES
+    param_names = ['substations']
+    timeout = 600
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        self.widget = NetworkMapWidget(self.network)
+        self.index = self.widget.get_spatial_index()
+        positions = self.network.get_extensions('substationPosition')
+        self.latitude = positions['latitude'].median()
+        self.longitude = positions['longitude'].median()
+
+    def time_spatial_index_build(self, substations_count):
+        self.widget.extract_spatial_index(self.network, True, False)
+
+    def time_rectangle_query(self, substations_count):
+        self.index.query_rectangle(self.latitude - 0.5, self.longitude - 0.5, self.latitude + 0.5, self.longitude + 0.5)
+
+    def time_polygon_query(self, substations_count):
+        self.index.query_polygon([(self.latitude - 0.5, self.longitude), (self.latitude, self.longitude + 0.5),
+                                  (self.latitude + 0.5, self.longitude), (self.latitude, self.longitude - 0.5)])
+
+    def time_radius_query(self, substations_count):
+        self.index.query_radius(self.latitude, self.longitude, 50)
+
+    def time_nearest_substations(self, substations_count):
+        self.index.get_nearest_substations(self.latitude, self.longitude, count=10)
+
+
+class SelectContextSuite:
+    params = SIZES
+    param_names = ['substations']
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        self.context = SelectContext(self.network, use_name=True, history_max_length=10)
+
+    def time_select_context(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        SelectContext(self.network, use_name=True, history_max_length=10)
+
+    def time_apply_filter(self, substations_count):
+        self.context.apply_filter('400')
+
+    def time_get_filtered_vls_as_list(self, substations_count):
+        self.context.get_filtered_vls_as_list()
+
+    def track_select_context_python_peak(self, substations_count):
+        invalidate_network_snapshot(self.network)
+        return python_peak(SelectContext, self.network, use_name=True, history_max_length=10)
+    track_select_context_python_peak.unit = 'bytes'
+
+
+class VoltageLevelGraphSuite:
+    params = (SIZES, [1, 5, 20])
+    param_names = ['substations', 'depth']
+
+    def setup(self, substations_count, depth):
+        self.network = get_network(substations_count)
+        self.graph = get_voltage_level_graph(self.network)
+        self.vl_id = self.graph.vl_ids[len(self.graph.vl_ids) // 2]
+
+    def time_build_graph(self, substations_count, depth):
+        invalidate_network_snapshot(self.network)
+        get_voltage_level_graph(self.network)
+
+    def time_graph_voltage_levels(self, substations_count, depth):
+        self.graph.get_voltage_levels([self.vl_id], depth)
+
+    def time_network_displayed_voltage_levels(self, substations_count, depth):
+        self.network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=self.vl_id, depth=depth)
+
+    def time_graph_voltage_levels_counts(self, substations_count, depth):
+        self.graph.get_voltage_levels_counts([self.vl_id], 20)
+
+
+class BranchStatesSuite:
+    params = (SIZES, [24])
+    param_names = ['substations', 'time_steps']
+    timeout = 600
+
+    def setup(self, substations_count, time_steps_count):
+        self.time_series = get_time_series(substations_count, time_steps_count)
+        self.time_step = self.time_series['timestamp'].iloc[0]
+
+    def time_prepare_branch_states(self, substations_count, time_steps_count):
+        prepare_branch_states(self.time_series, self.time_step)
+
+    def time_read_time_step(self, substations_count, time_steps_count):
+        DataFrameTimeSeriesSource(self.time_series).get_time_step(self.time_step)
+
+    def time_compute_branch_aggregates(self, substations_count, time_steps_count):
+        compute_branch_aggregates(self.time_series, percentile=95, threshold=100)
+
+    def track_branch_states_payload_size(self, substations_count, time_steps_count):
+        return len(json.dumps(prepare_branch_states(self.time_series, self.time_step)))
+    track_branch_states_payload_size.unit = 'characters'
+
+    def track_prepare_branch_states_python_peak(self, substations_count, time_steps_count):
+        return python_peak(prepare_branch_states, self.time_series, self.time_step)
+    track_prepare_branch_states_python_peak.unit = 'bytes'
+
+
+class HoverSuite:
+    params = SIZES
+    param_names = ['substations']
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        self.line_row = self.network.get_lines(id=['L0-1']).iloc[0]
+
+    def time_hover_line(self, substations_count):
+        get_hovering_equipment_info(self.network, 'L0-1', 'LINE')
+
+    def time_hover_transformer(self, substations_count):
+        get_hovering_equipment_info(self.network, 'T0', 'TWO_WINDINGS_TRANSFORMER')
+
+    def time_hover_load(self, substations_count):
+        get_hovering_equipment_info(self.network, 'LD0', 'LOAD')
+
+    def time_format_to_html_table(self, substations_count):
+        format_to_html_table(self.line_row, 'L0-1', 'LINE')
+
+
+class DiagramWidgetsSuite:
+    params = (SIZES, [1, 3])
+    param_names = ['substations', 'depth']
+    timeout = 600
+
+    def setup(self, substations_count, depth):
+        self.network = get_network(substations_count)
+        self.vl_ids = self.network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=['S0_400'], depth=depth)
+        self.sld = self.network.get_single_line_diagram('S0_400')
+        self.nad = self.network.get_network_area_diagram(voltage_level_ids=self.vl_ids)
+        self.terminal_values = get_terminal_values(self.network)
+        self.bus_values = get_bus_values(self.network)
+
+    def time_nad_generation(self, substations_count, depth):
+        self.network.get_network_area_diagram(voltage_level_ids=self.vl_ids)
+
+    def time_display_nad(self, substations_count, depth):
+        display_nad(self.nad, drag_enabled=True)
+
+    def time_display_sld(self, substations_count, depth):
+        display_sld(self.sld, enable_callbacks=True)
+
+    def time_get_terminal_values(self, substations_count, depth):
+        get_terminal_values(self.network)
+
+    def time_nad_values_refresh(self, substations_count, depth):
+        # to compare with time_nad_generation: the values of the displayed NAD are updated in place
+        get_nad_branch_states(self.nad.metadata, self.terminal_values)
+        get_nad_voltage_level_states(self.nad.metadata, self.bus_values)
+
+    def time_sld_values_refresh(self, substations_count, depth):
+        get_sld_feeder_values(self.sld.metadata, self.terminal_values)
+
+    def track_nad_payload_size(self, substations_count, depth):
+        return len(self.nad.svg) + len(self.nad.metadata)
+    track_nad_payload_size.unit = 'characters'
+
+    def track_sld_payload_size(self, substations_count, depth):
+        return len(self.sld.svg) + len(self.sld.metadata)
+    track_sld_payload_size.unit = 'characters'
+
+
+class VariantComparisonSuite:
+    params = SIZES
+    param_names = ['substations']
+    timeout = 600
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        if 'compared' not in self.network.get_variant_ids():
+            self.network.clone_variant(self.network.get_working_variant_id(), 'compared')
+        self.comparison = VariantComparison(self.network, 'compared')
+        self.nad = self.network.get_network_area_diagram(voltage_level_ids=['S0_400'], depth=3)
+
+    def time_variant_comparison(self, substations_count):
+        # both variants values read, and their differences
+        self.comparison.refresh()
+
+    def time_delta_mode_switch(self, substations_count):
+        # to compare with DiagramWidgetsSuite.time_nad_generation: only the values are sent when switching modes
+        get_nad_branch_states(self.nad.metadata, self.comparison.get_terminal_values('delta'))
+        get_nad_voltage_level_states(self.nad.metadata, self.comparison.get_bus_values('delta'))
+
+
+class ContingencyBrowserSuite:
+    # N-1 on all the lines of the IEEE 118 buses network
+    timeout = 600
+
+    def setup_cache(self):
+        network = pn.create_ieee118()
+        analysis = sa.create_analysis()
+        analysis.add_single_element_contingencies(network.get_lines(attributes=[]).index.tolist())
+        analysis.add_monitored_elements(branch_ids=network.get_branches(attributes=[]).index.tolist(),
+                                        voltage_level_ids=network.get_voltage_levels(attributes=[]).index.tolist())
+        return network, analysis.run_ac(network)
+
+    def setup(self, cache):
+        self.network, self.result = cache
+        self.results = ContingencyResults(self.network, self.result)
+        self.nad = self.network.get_network_area_diagram(voltage_level_ids=['VL1'], depth=3)
+        self.nad_branch_ids = {edge['equipmentId'] for edge in json.loads(self.nad.metadata)['edges']}
+        self.contingency_id = self.results.contingency_ids[0]
+
+    def time_results_extraction(self, cache):
+        ContingencyResults(self.network, self.result)
+
+    def time_contingency_switch(self, cache):
+        # to compare with a NAD generation: only the values are sent when selecting a contingency
+        self.results.get_branch_states(self.contingency_id, 'loading', self.nad_branch_ids)
+        get_nad_voltage_level_states(self.nad.metadata, self.results.get_bus_values(self.contingency_id).dropna())
+
+
+class NetworkSchedulerSuite:
+    # the scheduling overhead of the network accesses, for 100 accesses
+    timeout = 600
+
+    def setup(self):
+        self.network = get_network(100)
+        self.scheduler = NetworkScheduler(self.network)
+
+    def time_reading(self):
+        for _ in range(100):
+            with self.scheduler.reading():
+                pass
+
+    def time_submit_read(self):
+        futures = [self.scheduler.submit_read(int, priority=Priority.BACKGROUND) for _ in range(100)]
+        for future in futures:
+            future.result()
+
+    def time_submit_mixed(self):
+        # writes interleaved with reads: each write waits for the previous reads
+        futures = [(self.scheduler.submit_write if i % 10 == 0 else self.scheduler.submit_read)(int) for i in range(100)]
+        for future in futures:
+            future.result()
+
+
+class DiagramCacheSuite:
+    params = SIZES
+    param_names = ['substations']
+    timeout = 600
+
+    def setup(self, substations_count):
+        self.network = get_network(substations_count)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiagramCache(os.path.join(self.tmp_dir.name, 'diagrams.sqlite'))
+        self.vl_ids = self.network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=['S0_400'], depth=3)
+        # the explorers compute the checksum once, until the network is modified
+        self.checksum = get_network_checksum(self.network)
+        self.cache.get_network_area_diagram(self.network, voltage_level_ids=self.vl_ids, checksum=self.checksum)
+        self.cache.get_single_line_diagram(self.network, 'S0_400', checksum=self.checksum)
+
+    def teardown(self, substations_count):
+        self.tmp_dir.cleanup()
+
+    def time_network_checksum(self, substations_count):
+        get_network_checksum(self.network)
+
+    def time_nad_cache_hit(self, substations_count):
+        # to compare with DiagramWidgetsSuite.time_nad_generation
+        self.cache.get_network_area_diagram(self.network, voltage_level_ids=self.vl_ids, checksum=self.checksum)
+
+    def time_sld_cache_hit(self, substations_count):
+        self.cache.get_single_line_diagram(self.network, 'S0_400', checksum=self.checksum)
@@ -0,0 +1,113 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ * SPDX-License-Identifier: MPL-2.0
+ */
+
+// Browser side of the frontend render benchmark: renders the widgets, fed with a recorded payload,
+// through a minimal anywidget model and collects the timings reported by the widgets' profiling.
+
+import nadwidget from '../../js/nadwidget';
+import sldwidget from '../../js/sldwidget';
+import networkmapwidget from '../../js/networkmapwidget';
+
+const WIDGETS = { nad: nadwidget, sld: sldwidget, map: networkmapwidget };
+
+const RENDER_TIMEOUT_MS = 120000;
+
+class BenchmarkModel {
+    constructor(state) {
+        this.state = { ...state, profiling_enabled: true };
+        this.listeners = new Map();
+        this.sent = [];
+    }
+
+    get(key) {
+        return this.state[key];
+    }
+
+    set(key, value) {
+        this.state[key] = value;
+        (this.listeners.get(`change:${key}`) ?? []).forEach((callback) => callback());
+    }
+
+    on(event, callback) {
+        this.listeners.set(event, [...(this.listeners.get(event) ?? []), callback]);
+    }
+
+    off(event, callback) {
+        this.listeners.set(
+            event,
+            (this.listeners.get(event) ?? []).filter((cb) => cb !== callback)
+        );
+    }
+
+    save_changes() {
+        // nothing to synchronize: there is no kernel
+    }
+
+    send(content) {
+        this.sent.push(content);
+    }
+
+    profilingStages() {
+        return Object.fromEntries(
+            this.sent.filter((msg) => msg.event === 'profiling').map((msg) => [msg.stage, msg.duration])
+        );
+    }
+}
+
+function waitForStage(model, stage) {
+    return new Promise((resolve, reject) => {
+        const start = performance.now();
+        const poll = () => {
+            if (stage in model.profilingStages()) {
+                resolve();
+            } else if (performance.now() - start > RENDER_TIMEOUT_MS) {
+                reject(new Error(`timeout waiting for the ${stage} stage`));
+            } else {
+                setTimeout(poll, 5);
+            }
+        };
+        poll();
+    });
+}
+
+function usedHeap() {
+    if (window.gc) {
+        window.gc();
+    }
+    return performance.memory ? performance.memory.usedJSHeapSize : null;
+}
+
+window.runBenchmark = async (payload) => {
+    const container = document.createElement('div');
+    document.body.appendChild(container);
+
+    const heapBefore = usedHeap();
+    const model = new BenchmarkModel(payload.state);
+    const experimental = { invoke: async () => ['', []] };
+
+    const start = performance.now();
+    const cleanup = await WIDGETS[payload.widget].render({ model: model, el: container, experimental: experimental });
+    await waitForStage(model, 'frontend_render');
+    const total = performance.now() - start;
+    const heapAfter = usedHeap();
+
+    if (typeof cleanup === 'function') {
+        cleanup();
+    }
+    container.remove();
+
+    return {
+        widget: payload.widget,
+        size: payload.size,
+        total_ms: total,
+        stages_ms: model.profilingStages(),
+        heap_delta_bytes: heapBefore === null ? null : heapAfter - heapBefore,
+    };
+};
+
+window.harnessReady = true;
@@ -0,0 +1,53 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Records the payloads that the python side of the NAD, SLD and network map widgets sends to the browser,
+for synthetic networks of increasing size. The recorded payloads are the input of render_bench.mjs.
+
+Usage (from the repository root):
+    python benchmarks/frontend/record_payloads.py --sizes 100 1000 5000 --output benchmarks/frontend/payloads
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from pypowsybl_jupyter import display_nad, display_sld, NetworkMapWidget
+from pypowsybl_jupyter.util import _get_widget_state
+from benchmarks.synthetic import create_synthetic_network
+
+def record_payloads(sizes, nad_depth, output):
+    output.mkdir(parents=True, exist_ok=True)
+    for size in sizes:
+        network = create_synthetic_network(size)
+
+        vl_ids = network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=['S0_400'], depth=nad_depth)
+        nad_widget = display_nad(network.get_network_area_diagram(voltage_level_ids=vl_ids), drag_enabled=True)
+        sld_widget = display_sld(network.get_single_line_diagram('S0_400'), enable_callbacks=True)
+        map_widget = NetworkMapWidget(network, use_line_geodata=True)
+
+        payloads = {
+            'nad': _get_widget_state(nad_widget),
+            'sld': _get_widget_state(sld_widget),
+            'map': _get_widget_state(map_widget),
+        }
+        for widget_name, state in payloads.items():
+            path = output / f'{widget_name}_{size}.json'
+            path.write_text(json.dumps({'widget': widget_name, 'size': size, 'state': state}, default=float))
+            print(f'{path}: {path.stat().st_size} bytes')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Records the widgets payloads for the frontend render benchmark.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000], help='synthetic networks sizes, in substations')
+    parser.add_argument('--nad-depth', type=int, default=10, help='depth of the recorded NADs, around the first substation')
+    parser.add_argument('--output', type=pathlib.Path, default=pathlib.Path(__file__).parent / 'payloads')
+    args = parser.parse_args()
+    record_payloads(args.sizes, args.nad_depth, args.output)
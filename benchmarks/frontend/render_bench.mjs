@@ -0,0 +1,147 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ * SPDX-License-Identifier: MPL-2.0
+ */
+
+// Headless frontend render benchmark: bundles the widgets with harness.mjs, then renders the payloads recorded by
+// record_payloads.py in a locally installed headless Chromium/Chrome, measuring parse and first render times and the
+// JS heap. puppeteer-core is not a dependency of the widgets' build: it is installed on demand, without saving it.
+//
+// Usage (from the repository root):
+//   npm install --no-save puppeteer-core@23
+//   CHROME_PATH=/usr/bin/chromium npm run bench:frontend -- --runs 5 --output results.json [--baseline previous.json]
+
+import esbuild from 'esbuild';
+import fs from 'fs/promises';
+import path from 'path';
+import { parseArgs } from 'util';
+import { fileURLToPath } from 'url';
+
+const benchDir = path.dirname(fileURLToPath(import.meta.url));
+
+const { values: options } = parseArgs({
+    options: {
+        payloads: { type: 'string', default: path.join(benchDir, 'payloads') },
+        chrome: { type: 'string', default: process.env.CHROME_PATH },
+        runs: { type: 'string', default: '3' },
+        output: { type: 'string' },
+        baseline: { type: 'string' },
+        tolerance: { type: 'string', default: '0.25' },
+    },
+});
+
+if (!options.chrome) {
+    console.error(
+        'A local Chromium/Chrome executable is required: use --chrome or the CHROME_PATH environment variable.'
+    );
+    process.exit(2);
+}
+
+async function bundleHarness() {
+    const result = await esbuild.build({
+        entryPoints: [path.join(benchDir, 'harness.mjs')],
+        bundle: true,
+        write: false,
+        format: 'esm',
+        target: ['es2020'],
+        outdir: path.join(benchDir, 'out'),
+        define: {
+            'define.amd': 'false',
+        },
+    });
+    const find = (ext) => result.outputFiles.find((file) => file.path.endsWith(ext))?.text ?? '';
+    return { js: find('.js'), css: find('.css') };
+}
+
+function median(values) {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.floor(sorted.length / 2)];
+}
+
+function summarize(runs) {
+    const stages = Object.keys(runs[0].stages_ms);
+    return {
+        widget: runs[0].widget,
+        size: runs[0].size,
+        total_ms: median(runs.map((run) => run.total_ms)),
+        ...Object.fromEntries(stages.map((stage) => [`${stage}_ms`, median(runs.map((run) => run.stages_ms[stage]))])),
+        heap_delta_bytes: runs[0].heap_delta_bytes === null ? null : median(runs.map((run) => run.heap_delta_bytes)),
+    };
+}
+
+function findRegressions(results, baseline, tolerance) {
+    const regressions = [];
+    for (const result of results) {
+        const previous = baseline.find((entry) => entry.widget === result.widget && entry.size === result.size);
+        if (previous) {
+            for (const [key, value] of Object.entries(result)) {
+                if (key.endsWith('_ms') && previous[key] !== undefined && value > previous[key] * (1 + tolerance)) {
+                    const change = `${previous[key].toFixed(1)} -> ${value.toFixed(1)}`;
+                    regressions.push(`${result.widget} (${result.size}): ${key} ${change}`);
+                }
+            }
+        }
+    }
+    return regressions;
+}
+
+const payloadFiles = (await fs.readdir(options.payloads)).filter((file) => file.endsWith('.json')).sort();
+if (payloadFiles.length === 0) {
+    console.error(`No payloads in ${options.payloads}: run record_payloads.py first.`);
+    process.exit(2);
+}
+
+const puppeteer = await import('puppeteer-core').then(
+    (module) => module.default,
+    () => {
+        console.error('puppeteer-core is not installed: run npm install --no-save puppeteer-core@23 first.');
+        process.exit(2);
+    }
+);
+
+const { js, css } = await bundleHarness();
+
+const browser = await puppeteer.launch({
+    executablePath: options.chrome,
+    headless: true,
+    args: ['--enable-precise-memory-info', '--js-flags=--expose-gc', '--enable-unsafe-swiftshader'],
+});
+
+const results = [];
+try {
+    const page = await browser.newPage();
+    await page.setViewport({ width: 1024, height: 768 });
+    page.on('pageerror', (error) => console.error(`page error: ${error.message}`));
+    await page.setContent(`<html><head><style>${css}</style></head><body></body></html>`);
+    await page.addScriptTag({ content: js, type: 'module' });
+    await page.waitForFunction(() => window.harnessReady === true);
+
+    for (const file of payloadFiles) {
+        const payload = JSON.parse(await fs.readFile(path.join(options.payloads, file), 'utf8'));
+        const runs = [];
+        for (let i = 0; i < Number(options.runs); i++) {
+            runs.push(await page.evaluate((p) => window.runBenchmark(p), payload));
+        }
+        results.push(summarize(runs));
+    }
+} finally {
+    await browser.close();
+}
+
+console.table(results);
+
+if (options.output) {
+    await fs.writeFile(options.output, JSON.stringify(results, null, 2));
+}
+
+if (options.baseline) {
+    const baseline = JSON.parse(await fs.readFile(options.baseline, 'utf8'));
+    const regressions = findRegressions(results, baseline, Number(options.tolerance));
+    if (regressions.length > 0) {
+        console.error(`Regressions (tolerance ${options.tolerance}):\n${regressions.join('\n')}`);
+        process.exit(1);
+    }
+}
@@ -11,7 +11,8 @@ import './nadwidget.css';
 import { NetworkAreaDiagramViewer, NadViewerParametersOptions } from '@powsybl/network-viewer';
 
 import { PopupMenu } from './popupmenu';
-import { PopupInfo } from './popupinfo';
+import { PopupInfo, HoverInfoCache } from './popupinfo';
+import { reportRenderTime } from './profiling';
 
 interface NadWidgetModel {
     diagram_data: any;
@@ -22,12 +23,24 @@ interface NadWidgetModel {
     current_nad_metadata: string;
     popup_menu_items: string[];
     hover_enabled: boolean;
+    hover_version: number;
     branch_states: any[];
+    voltage_level_states: any[];
+    invalid_lf: boolean;
+    profiling_enabled: boolean;
 }
 
 function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
     let nad_viewer: NetworkAreaDiagramViewer | null = null;
 
+    const hoverInfoCache = new HoverInfoCache();
+    model.on('change:hover_version', () => hoverInfoCache.clear());
+
+    const fetchHoverInfo = async (id: string, type: string): Promise<string> => {
+        const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', { id: id, type: type });
+        return retInfo as string;
+    };
+
     const handleSelectNode = (equipmentId: string, nodeId: string, _mousePosition: any) => {
         model.set('selected_node', {
             equipment_id: equipmentId,
@@ -104,16 +117,35 @@ function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
         };
     }
 
+    // the states received from a branch states stream, since the last branch_states change: applied again on top of
+    // the branch_states when the diagram is rendered again
+    const streamedStates = new Map<string, any>();
+
     const applyBranchStates = () => {
         if (nad_viewer) {
             const branch_states = model.get('branch_states');
             if (branch_states && branch_states.length > 0) {
                 nad_viewer.setBranchStates(branch_states);
             }
+            if (streamedStates.size > 0) {
+                nad_viewer.setBranchStates(Array.from(streamedStates.values()));
+            }
+            const voltage_level_states = model.get('voltage_level_states');
+            if (voltage_level_states && voltage_level_states.length > 0) {
+                nad_viewer.setVoltageLevelStates(voltage_level_states);
+            }
         }
     };
 
+    const applyBranchStatesDelta = (seq: number, states: any[]) => {
+        states.forEach((state) => streamedStates.set(state.branchId, state));
+        nad_viewer?.setBranchStates(states);
+        // acknowledged once the frame has been painted: the kernel sends the next one only then
+        requestAnimationFrame(() => model.send({ event: 'branch_states_ack', seq: seq }));
+    };
+
     function render_diagram(model: any, diagram_svg: string, diagram_meta: string | null): any {
+        const render_start = performance.now();
         const diagram_data = model.get('diagram_data');
         const is_invalid_lf = diagram_data['invalid_lf'];
         const is_grayout = diagram_data['grayout'];
@@ -124,7 +156,7 @@ function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
         const el_div = document.createElement('div');
         el_div.classList.add('svg-nad-viewer-widget');
 
-        el_div.classList.toggle('invalid-lf', is_invalid_lf);
+        el_div.classList.toggle('invalid-lf', is_invalid_lf || model.get('invalid_lf'));
 
         el_div.classList.toggle('grayout', is_grayout);
 
@@ -178,12 +210,11 @@ function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
             onRightClickCallback: handleMenu,
         };
 
-        nad_viewer = new NetworkAreaDiagramViewer(
-            el_div,
-            diagram_svg,
-            diagram_meta ? JSON.parse(diagram_meta) : null,
-            nadViewerParametersOptions
-        );
+        const parse_start = performance.now();
+        const parsed_meta = diagram_meta ? JSON.parse(diagram_meta) : null;
+        reportRenderTime(model, 'frontend_metadata_parse', parse_start);
+
+        nad_viewer = new NetworkAreaDiagramViewer(el_div, diagram_svg, parsed_meta, nadViewerParametersOptions);
 
         setTimeout(() => {
             applyBranchStates();
@@ -210,13 +241,14 @@ function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
 
         popupInfo = new PopupInfo(el_div, async (id: string, type: string) => {
             try {
-                const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', { id: id, type: type });
-                return retInfo as string;
+                return await hoverInfoCache.get(id, type, fetchHoverInfo);
             } catch (e) {
                 return `Error retrieving hover info: ${e}`;
             }
         });
 
+        reportRenderTime(model, 'frontend_render', render_start);
+
         return el_div;
     }
 
@@ -261,12 +293,26 @@ function render({ model, el, experimental }: RenderProps<NadWidgetModel>) {
                 metad = nad_viewer.getJsonMetadata() || '';
             }
             updateCurrentMetadataInModel(metad);
+        } else if (content.type === 'branchStatesDelta') {
+            applyBranchStatesDelta(content.seq, content.states);
         }
     });
 
     model.on('change:branch_states', () => {
+        streamedStates.clear();
+        applyBranchStates();
+    });
+
+    model.on('change:voltage_level_states', () => {
         applyBranchStates();
     });
+
+    model.on('change:invalid_lf', () => {
+        el.querySelector('.svg-nad-viewer-widget')?.classList.toggle(
+            'invalid-lf',
+            model.get('diagram_data')['invalid_lf'] || model.get('invalid_lf')
+        );
+    });
 }
 
 export default { render };
@@ -6,13 +6,15 @@
  * SPDX-License-Identifier: MPL-2.0
  */
 
-import React, { useEffect, useRef, useState, useCallback } from 'react';
+import React, { useEffect, useMemo, useRef, useState, useCallback } from 'react';
 
 import { createRender, useModelState, useModel, useExperimental } from '@anywidget/react';
 
 import { NetworkMap, GeoData, MapEquipments } from '@powsybl/network-viewer';
 import VoltageLevelChoice from './voltage-level-choice';
 import NominalVoltageFilter from './nominal-voltage-filter';
+import { reportRenderTime } from './profiling';
+import { HoverInfoCache } from './popupinfo';
 
 import './networkmapwidget.css';
 
@@ -21,6 +23,8 @@ import { Box, createTheme, LinearProgress, ThemeProvider, StyledEngineProvider }
 const INITIAL_ZOOM = 0;
 const LABELS_ZOOM_THRESHOLD = 9;
 const ARROWS_ZOOM_THRESHOLD = 7;
+// the period, in ms, of the zoom level checks switching between the clusters and the equipments
+const ZOOM_CHECK_PERIOD = 250;
 
 const styles = {
     divNominalVoltageFilter: {
@@ -37,6 +41,16 @@ const styles = {
         width: '100%',
         zIndex: 2,
     },
+    divRegionSelection: {
+        position: 'absolute',
+        left: '10px',
+        top: '10px',
+        padding: '2px 6px',
+        backgroundColor: 'background.paper',
+        fontFamily: 'sans-serif',
+        fontSize: '12px',
+        zIndex: 2,
+    },
 };
 
 const darkTheme = createTheme({
@@ -87,8 +101,95 @@ class WidgetMapEquipments extends MapEquipments {
     }
 }
 
+function parseMapData(spos, lpos, smap, lmap, tlmap, hlmap) {
+    return {
+        spos: JSON.parse(spos),
+        lpos: JSON.parse(lpos),
+        smap: JSON.parse(smap),
+        lmap: JSON.parse(lmap),
+        tlmap: JSON.parse(tlmap),
+        hlmap: JSON.parse(hlmap),
+    };
+}
+
+// adds to the map data the equipments of newly loaded nominal voltages: substations are replaced by id
+// (they come with their additional voltage levels), the other equipments are new ones
+function mergeMapData(mapData, addedData) {
+    const substationsById = new Map(mapData.smap.map((substation) => [substation.id, substation]));
+    addedData.smap.forEach((substation) => substationsById.set(substation.id, substation));
+    return {
+        spos: mapData.spos.concat(addedData.spos),
+        lpos: mapData.lpos.concat(addedData.lpos),
+        smap: Array.from(substationsById.values()),
+        lmap: mapData.lmap.concat(addedData.lmap),
+        tlmap: mapData.tlmap.concat(addedData.tlmap),
+        hlmap: mapData.hlmap.concat(addedData.hlmap),
+    };
+}
+
+function buildEquipmentData(mapData) {
+    const geoData = new GeoData(new Map(), new Map());
+    geoData.setSubstationPositions(mapData.spos);
+    geoData.setLinePositions(mapData.lpos);
+    const mapEquipments = new WidgetMapEquipments(mapData.smap, mapData.lmap, mapData.tlmap, mapData.hlmap);
+    return { gdata: geoData, edata: mapEquipments };
+}
+
+// updates the flows and connection status of the lines (and tie lines) in the branch states, returns the updated lines
+function applyBranchStates(edata, states) {
+    const changedLines = [];
+    states.forEach((state) => {
+        // the line objects are shared with the map data: the states survive a nominal voltages loading
+        const line = edata.linesById.get(state.branchId) ?? edata.tieLinesById.get(state.branchId);
+        if (line) {
+            line.p1 = state.value1;
+            line.p2 = state.value2;
+            line.terminal1Connected = state.connected1;
+            line.terminal2Connected = state.connected2;
+            changedLines.push(line);
+        }
+    });
+    return changedLines;
+}
+
+// the clusters of a zoom level are displayed as substations with a single voltage level,
+// at their highest nominal voltage, and the bundles as lines between them
+function buildClustersEquipmentData(level) {
+    return buildEquipmentData({
+        spos: level.clusters.map((cluster) => ({ id: cluster.id, coordinate: { lat: cluster.lat, lon: cluster.lon } })),
+        lpos: [],
+        smap: level.clusters.map((cluster) => ({
+            id: cluster.id,
+            name: cluster.name,
+            voltageLevels: [
+                {
+                    id: cluster.id,
+                    name: cluster.name,
+                    substationId: cluster.id,
+                    nominalV: cluster.nominalV,
+                },
+            ],
+        })),
+        lmap: level.bundles.map((bundle) => ({
+            id: bundle.id,
+            name: bundle.name,
+            voltageLevelId1: bundle.cluster1,
+            voltageLevelId2: bundle.cluster2,
+            terminal1Connected: bundle.connected > 0,
+            terminal2Connected: bundle.connected > 0,
+            p1: bundle.p,
+            p2: -bundle.p,
+            i1: 0,
+            i2: 0,
+        })),
+        tlmap: [],
+        hlmap: [],
+    });
+}
+
 const render = createRender(() => {
     const networkMapRef = useRef();
+    const mapViewRef = useRef();
 
     let model = useModel();
     let experimental = useExperimental();
@@ -104,6 +205,7 @@ const render = createRender(() => {
 
     const [params, setParams] = useModelState('params');
     const [nvls] = useModelState('nvls');
+    const [all_nvls] = useModelState('all_nvls');
 
     const [enable_callbacks] = useModelState('enable_callbacks');
 
@@ -121,18 +223,28 @@ const render = createRender(() => {
 
     const [is_hover_enabled] = useModelState('hover_enabled');
 
+    const [invalid_lf] = useModelState('invalid_lf');
+
+    const [branch_states] = useModelState('branch_states');
+
+    const [clusters] = useModelState('clusters');
+    const [cluster_zoom_threshold] = useModelState('cluster_zoom_threshold');
+
+    const renderStart = useRef(performance.now());
+
+    // the map data received so far and, when the payload is limited to some nominal voltages, these nominal voltages
+    // (null when all the nominal voltages have been received)
+    const mapData = useRef(null);
+    const loadedNominalVoltages = useRef(all_nvls.length > 0 ? nvls : null);
+    const [nominalVoltagesLoading, setNominalVoltagesLoading] = useState(false);
+
     useEffect(() => {
         let initDataTask = new Promise((resolve, reject) => {
-            const geoData = new GeoData(new Map(), new Map());
-            geoData.setSubstationPositions(JSON.parse(spos));
-            geoData.setLinePositions(JSON.parse(lpos));
-            const mapEquipments = new WidgetMapEquipments(
-                JSON.parse(smap),
-                JSON.parse(lmap),
-                JSON.parse(tlmap),
-                JSON.parse(hlmap)
-            );
-            resolve({ gdata: geoData, edata: mapEquipments });
+            const parseStart = performance.now();
+            mapData.current = parseMapData(spos, lpos, smap, lmap, tlmap, hlmap);
+            const result = buildEquipmentData(mapData.current);
+            reportRenderTime(model, 'frontend_data_parse', parseStart);
+            resolve(result);
         });
         initDataTask.then((result) => {
             setMapDataReady(true);
@@ -140,14 +252,58 @@ const render = createRender(() => {
         });
     }, []);
 
+    useEffect(() => {
+        if (mapDataReady) {
+            reportRenderTime(model, 'frontend_render', renderStart.current);
+        }
+    }, [mapDataReady]);
+
+    // the displayed zoom level, null until known
+    const [zoomLevel, setZoomLevel] = useState(null);
+
     useEffect(() => {
         const targetSubId = params['subId'];
         if (!('centered' in params)) {
+            // the substations are displayed, instead of the clusters, until the next zoom level check
+            setZoomLevel(null);
             setCenterOnSubId(targetSubId === null ? null : { to: targetSubId });
             setParams({ ...params, centered: true });
         }
     }, [params]);
 
+    // the clusters are displayed below cluster_zoom_threshold: their equipment data is built once per zoom level
+    const clusterLevels = useMemo(() => JSON.parse(clusters ?? '[]'), [clusters]);
+    const clustersEquipmentData = useRef(new Map());
+
+    useEffect(() => {
+        if ((cluster_zoom_threshold ?? 0) <= 0) {
+            return;
+        }
+        const checkZoom = () => {
+            const viewState = mapViewRef.current?.getCurrentViewState?.();
+            if (viewState) {
+                setZoomLevel(Math.max(0, Math.floor(viewState.zoom)));
+            }
+        };
+        const timer = setInterval(checkZoom, ZOOM_CHECK_PERIOD);
+        return () => clearInterval(timer);
+    }, [cluster_zoom_threshold]);
+
+    let clusterLevel = null;
+    if (mapDataReady && zoomLevel !== null && zoomLevel < cluster_zoom_threshold && clusterLevels.length > 0) {
+        clusterLevel = clusterLevels[Math.min(zoomLevel, clusterLevels.length - 1)];
+    }
+    let displayedData = equipmentData;
+    let displayedNominalVoltages = null;
+    if (clusterLevel !== null) {
+        if (!clustersEquipmentData.current.has(clusterLevel.zoom)) {
+            clustersEquipmentData.current.set(clusterLevel.zoom, buildClustersEquipmentData(clusterLevel));
+        }
+        displayedData = clustersEquipmentData.current.get(clusterLevel.zoom);
+        // the nominal voltages filter only applies to the equipments
+        displayedNominalVoltages = displayedData.edata.getNominalVoltages();
+    }
+
     const [choiceVoltageLevelsSubstationId, setChoiceVoltageLevelsSubstationId] = useState(null);
 
     const [position, setPosition] = useState([-1, -1]);
@@ -208,22 +364,61 @@ const render = createRender(() => {
 
     const [filteredNominalVoltages, setFilteredNominalVoltages] = useState(nvls);
 
+    async function loadNominalVoltages(requested) {
+        const loaded = loadedNominalVoltages.current;
+        loadedNominalVoltages.current = [...loaded, ...requested];
+        setNominalVoltagesLoading(true);
+        try {
+            const [retData, _buffers] = await experimental.invoke('_load_nominal_voltages', { loaded, requested });
+            mapData.current = mergeMapData(mapData.current, JSON.parse(retData));
+            setEquipmentData(buildEquipmentData(mapData.current));
+        } catch (e) {
+            console.error('Error loading nominal voltages: ', e);
+            loadedNominalVoltages.current = loadedNominalVoltages.current.filter((nv) => !requested.includes(nv));
+        } finally {
+            setNominalVoltagesLoading(false);
+        }
+    }
+
+    function onNominalVoltagesChange(newFilteredNominalVoltages) {
+        setFilteredNominalVoltages(newFilteredNominalVoltages);
+        if (loadedNominalVoltages.current !== null && mapData.current !== null) {
+            const requested = newFilteredNominalVoltages.filter((nv) => !loadedNominalVoltages.current.includes(nv));
+            if (requested.length > 0) {
+                loadNominalVoltages(requested);
+            }
+        }
+    }
+
     function renderNominalVoltageFilter() {
         return (
             <Box sx={styles.divNominalVoltageFilter}>
                 <NominalVoltageFilter
-                    nominalVoltages={equipmentData.edata.getNominalVoltages()}
+                    nominalVoltages={all_nvls.length > 0 ? all_nvls : equipmentData.edata.getNominalVoltages()}
                     filteredNominalVoltages={filteredNominalVoltages}
-                    onChange={setFilteredNominalVoltages}
+                    onChange={onNominalVoltagesChange}
+                    loading={nominalVoltagesLoading}
                 />
             </Box>
         );
     }
 
+    const hoverInfoCache = useRef(new HoverInfoCache());
+
+    useEffect(() => {
+        const clearHoverInfoCache = () => hoverInfoCache.current.clear();
+        model.on('change:hover_version', clearHoverInfoCache);
+        return () => model.off('change:hover_version', clearHoverInfoCache);
+    }, [model]);
+
+    async function fetchHoverInfo(elementId) {
+        const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', { id: elementId });
+        return retInfo;
+    }
+
     async function getPopupContent(elementId) {
         try {
-            const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', { id: elementId });
-            return retInfo;
+            return await hoverInfoCache.current.get(elementId, 'LINE', fetchHoverInfo);
         } catch (e) {
             return `Error retrieving hover info: ${e}`;
         }
@@ -304,24 +499,112 @@ const render = createRender(() => {
         [hoverLineData]
     );
 
+    // the lines updated by the last branch states stream frame: their flows and connection status are redrawn
+    const [updatedLines, setUpdatedLines] = useState([]);
+    const equipmentDataRef = useRef(equipmentData);
+    equipmentDataRef.current = equipmentData;
+
+    // the states received from a branch states stream, since the last branch_states change: applied again on top of
+    // the branch_states when more nominal voltages are loaded
+    const streamedStates = useRef(new Map());
+
+    useEffect(() => {
+        const handleCustomMessage = (content) => {
+            if (content.type !== 'branchStatesDelta') {
+                return;
+            }
+            content.states.forEach((state) => streamedStates.current.set(state.branchId, state));
+            const changedLines = applyBranchStates(equipmentDataRef.current.edata, content.states);
+            if (changedLines.length > 0) {
+                setUpdatedLines(changedLines);
+            }
+            // acknowledged once the frame has been painted: the kernel sends the next one only then
+            requestAnimationFrame(() => model.send({ event: 'branch_states_ack', seq: content.seq }));
+        };
+        model.on('msg:custom', handleCustomMessage);
+        return () => model.off('msg:custom', handleCustomMessage);
+    }, [model]);
+
+    useEffect(() => {
+        streamedStates.current.clear();
+    }, [branch_states]);
+
+    // the states set by set_branch_states: applied once the map data are ready (e.g., when the map is displayed after
+    // they have been set), again when more nominal voltages are loaded, and when they change
+    useEffect(() => {
+        if (!mapDataReady) {
+            return;
+        }
+        const changedLines = applyBranchStates(equipmentData.edata, branch_states ?? []).concat(
+            applyBranchStates(equipmentData.edata, Array.from(streamedStates.current.values()))
+        );
+        if (changedLines.length > 0) {
+            setUpdatedLines(changedLines);
+        }
+    }, [mapDataReady, equipmentData, branch_states]);
+
+    // the region selected with the polygon tool: its equipments are found by the kernel's spatial index
+    const [regionSelection, setRegionSelection] = useState(null);
+    const regionQuerySeq = useRef(0);
+
+    async function onPolygonChanged(feature) {
+        const seq = ++regionQuerySeq.current;
+        const coordinates = feature?.geometry?.coordinates?.[0];
+        if (!enable_callbacks || !coordinates || coordinates.length < 4) {
+            setRegionSelection(null);
+            return;
+        }
+        try {
+            const [retData, _buffers] = await experimental.invoke('_query_region', {
+                region: { shape: 'polygon', coordinates },
+                nominal_voltages: filteredNominalVoltages,
+                select: true,
+            });
+            if (seq === regionQuerySeq.current) {
+                setRegionSelection(JSON.parse(retData));
+            }
+        } catch (e) {
+            console.error('Error querying the region: ', e);
+        }
+    }
+
+    function renderRegionSelection() {
+        return (
+            <Box sx={styles.divRegionSelection}>
+                {regionSelection.substations.length} substations, {regionSelection.voltage_levels.length} voltage
+                levels, {regionSelection.lines.length} lines selected
+            </Box>
+        );
+    }
+
+    function onSubstationClick(vlId) {
+        if (clusterLevel !== null) {
+            // zooms in on the clicked cluster
+            setCenterOnSubId({ to: vlId });
+        } else {
+            propagate_selectedvl_event(vlId);
+        }
+    }
+
     const renderMap = () => (
         <NetworkMap
-            ref={networkMapRef}
-            mapEquipments={equipmentData.edata}
-            geoData={equipmentData.gdata}
+            ref={mapViewRef}
+            mapEquipments={displayedData.edata}
+            geoData={displayedData.gdata}
             labelsZoomThreshold={LABELS_ZOOM_THRESHOLD}
             arrowsZoomThreshold={ARROWS_ZOOM_THRESHOLD}
             initialZoom={INITIAL_ZOOM}
             useName={use_name}
             centerOnSubstation={centerOnSubId}
-            onSubstationClick={(vlId) => {
-                propagate_selectedvl_event(vlId);
-            }}
+            onSubstationClick={onSubstationClick}
             onSubstationClickChooseVoltageLevel={chooseVoltageLevelForSubstation}
             mapLibrary={'cartonolabel'}
             mapTheme={dark_mode ? 'dark' : 'light'}
-            filteredNominalVoltages={filteredNominalVoltages}
-            renderPopover={is_hover_enabled ? renderLinePopover : null}
+            filteredNominalVoltages={displayedNominalVoltages ?? filteredNominalVoltages}
+            renderPopover={is_hover_enabled && clusterLevel === null ? renderLinePopover : null}
+            updatedLines={clusterLevel === null ? updatedLines : []}
+            onPolygonChanged={onPolygonChanged}
+            areFlowsValid={!invalid_lf}
         />
     );
 
@@ -336,10 +619,13 @@ const render = createRender(() => {
                             height: 600,
                         }}
                     >
-                        <Box sx={styles.divTemporaryGeoDataLoading}>{!mapDataReady && <LinearProgress />}</Box>
+                        <Box sx={styles.divTemporaryGeoDataLoading}>
+                            {(!mapDataReady || nominalVoltagesLoading) && <LinearProgress />}
+                        </Box>
 
                         {renderMap()}
                         {choiceVoltageLevelsSubstationId && renderVoltageLevelChoice()}
+                        {regionSelection !== null && renderRegionSelection()}
 
                         {equipmentData.edata?.substations?.length > 0 && renderNominalVoltageFilter()}
                     </div>
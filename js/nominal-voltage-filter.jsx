@@ -43,7 +43,7 @@ const styles = {
     },
 };
 
-const NominalVoltageFilter = ({ nominalVoltages, filteredNominalVoltages, onChange }) => {
+const NominalVoltageFilter = ({ nominalVoltages, filteredNominalVoltages, onChange, loading = false }) => {
     // Set up filteredNominalVoltages
     useEffect(() => {
         if (nominalVoltages && !filteredNominalVoltages) {
@@ -80,6 +80,7 @@ const NominalVoltageFilter = ({ nominalVoltages, filteredNominalVoltages, onChan
                         size={'small'}
                         sx={styles.nominalVoltageSelectionControl}
                         onClick={handleToggle(nominalVoltages, false)}
+                        disabled={loading}
                     >
                         All
                     </Button>
@@ -95,7 +96,7 @@ const NominalVoltageFilter = ({ nominalVoltages, filteredNominalVoltages, onChan
                                 role={undefined}
                                 dense
                                 onClick={handleToggle([value], true)}
-                                disabled={!filteredNominalVoltages}
+                                disabled={!filteredNominalVoltages || loading}
                             >
                                 <Checkbox
                                     color="default"
@@ -9,6 +9,47 @@ type Point = { x: number; y: number };
 
 type FetchElementInfoFn = (elementId: string, elementType: string) => Promise<string>;
 
+/**
+ * Bounded cache of the hover infos retrieved from the python side, keyed by element id and type; the least recently
+ * used infos are evicted first. The widgets clear it when the model's hover_version changes, i.e., when the python side
+ * signals that the network state (and so the hover infos) may have changed.
+ */
+export class HoverInfoCache {
+    maxSize: number;
+    entries = new Map<string, Promise<string>>();
+
+    constructor(maxSize: number = 500) {
+        this.maxSize = maxSize;
+    }
+
+    get(elementId: string, elementType: string, fetchElementInfo: FetchElementInfoFn): Promise<string> {
+        const key = `${elementType}\u0000${elementId}`;
+        let info = this.entries.get(key);
+        if (info !== undefined) {
+            // moves the entry to the end of the map, i.e., to the most recently used position
+            this.entries.delete(key);
+            this.entries.set(key, info);
+            return info;
+        }
+        info = fetchElementInfo(elementId, elementType);
+        this.entries.set(key, info);
+        // failed requests are not cached
+        info.catch(() => {
+            if (this.entries.get(key) === info) {
+                this.entries.delete(key);
+            }
+        });
+        if (this.entries.size > this.maxSize) {
+            this.entries.delete(this.entries.keys().next().value as string);
+        }
+        return info;
+    }
+
+    clear(): void {
+        this.entries.clear();
+    }
+}
+
 export class PopupInfo {
     container: HTMLElement;
     fetchElementInfo: FetchElementInfoFn;
@@ -0,0 +1,19 @@
+// Copyright (c) 2025, RTE (http://www.rte-france.com)
+// This Source Code Form is subject to the terms of the Mozilla Public
+// License, v. 2.0. If a copy of the MPL was not distributed with this
+// file, You can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+//
+
+/**
+ * Reports back to the python side the time elapsed since start (in ms), once the browser has painted the next frame.
+ * Nothing is sent when the widget's profiling is disabled.
+ */
+export function reportRenderTime(model: any, stage: string, start: number): void {
+    if (!model.get('profiling_enabled')) {
+        return;
+    }
+    requestAnimationFrame(() => {
+        model.send({ event: 'profiling', stage: stage, duration: performance.now() - start });
+    });
+}
@@ -11,7 +11,8 @@ import { SingleLineDiagramViewer } from '@powsybl/network-viewer';
 
 import './sldwidget.css';
 
-import { PopupInfo } from './popupinfo';
+import { PopupInfo, HoverInfoCache } from './popupinfo';
+import { reportRenderTime } from './profiling';
 
 /* Specifies attributes defined with traitlets in ../src/pypowsybl_jupyter/__init__.py */
 interface SldWidgetModel {
@@ -21,6 +22,11 @@ interface SldWidgetModel {
     clicked_feeder: any;
     clicked_bus: any;
     hover_enabled: boolean;
+    hover_version: number;
+    pending_switches: Record<string, boolean>;
+    feeder_values: FeederValue[];
+    invalid_lf: boolean;
+    profiling_enabled: boolean;
 }
 
 function initialize({ model }: Initialize<SldWidgetModel>) {
@@ -35,6 +41,59 @@ function toWidgetCoordinates(container: HTMLElement, x: number, y: number): { x:
     };
 }
 
+// displays the pending switches (switch id -> open status) with their requested status,
+// and the others with their diagram status
+function showPendingSwitches(container: HTMLElement, metadata: any, pendingSwitches: Record<string, boolean>) {
+    metadata?.nodes?.forEach((node: any) => {
+        const switchElement = container.querySelector('#' + CSS.escape(node.id));
+        if (
+            switchElement === null ||
+            !(switchElement.classList.contains('sld-open') || switchElement.classList.contains('sld-closed'))
+        ) {
+            return;
+        }
+        const pending = node.equipmentId in pendingSwitches;
+        const open = pending ? pendingSwitches[node.equipmentId] : node.open;
+        switchElement.classList.toggle('sld-open', open);
+        switchElement.classList.toggle('sld-closed', !open);
+        switchElement.classList.toggle('sld-pending-switch', pending);
+    });
+}
+
+interface FeederValue {
+    id: string;
+    label: string;
+    direction: 'IN' | 'OUT' | null;
+}
+
+// updates the feeder infos labels and arrows in place, e.g., after a load flow
+function showFeederValues(container: HTMLElement, feederValues: FeederValue[]) {
+    feederValues.forEach((feederValue) => {
+        const feederInfoElement = container.querySelector('#' + CSS.escape(feederValue.id));
+        if (feederInfoElement === null) {
+            return;
+        }
+        const labelElement = feederInfoElement.querySelector('.sld-label');
+        if (labelElement !== null) {
+            labelElement.textContent = feederValue.label;
+        }
+        feederInfoElement.classList.toggle('sld-in', feederValue.direction === 'IN');
+        feederInfoElement.classList.toggle('sld-out', feederValue.direction === 'OUT');
+    });
+}
+
+// dispatches copies of the pointer events on the elements with the same ids in another rendering of the diagram
+function replayPointerEvents(container: HTMLElement, events: MouseEvent[]) {
+    events.forEach((event) => {
+        const source = event.target instanceof Element ? event.target.closest('[id]') : null;
+        const target = source ? container.querySelector(`[id="${CSS.escape(source.id)}"]`) : null;
+        target?.dispatchEvent(new MouseEvent(event.type, event));
+        if (event.type === 'mouseover') {
+            target?.dispatchEvent(new MouseEvent('mouseenter', { clientX: event.clientX, clientY: event.clientY }));
+        }
+    });
+}
+
 function render({ model, el, experimental }: RenderProps<SldWidgetModel>) {
     const handleNextVl = (id: string, _event: MouseEvent) => {
         model.set('clicked_nextvl', id);
@@ -62,16 +121,31 @@ function render({ model, el, experimental }: RenderProps<SldWidgetModel>) {
 
     let popupInfo: PopupInfo | null = null;
 
-    function render_diagram(model: any, viewDataPre: string): any {
+    // the metadata of the displayed diagram
+    let diagramMetadata: any = null;
+
+    const hoverInfoCache = new HoverInfoCache();
+    model.on('change:hover_version', () => hoverInfoCache.clear());
+
+    const fetchHoverInfo = async (id: string, type: string): Promise<string> => {
+        const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', {
+            id: id ?? null,
+            type: type,
+        });
+        return retInfo as string;
+    };
+
+    function render_diagram(model: any, viewDataPre: string, lazyMetadata: string | null = null): any {
+        const render_start = performance.now();
         const diagram_data = model.get('diagram_data');
         const svg_data = diagram_data['value']; //svg content
-        const metadata = diagram_data['value_meta']; //metadata
+        const metadata = lazyMetadata ?? diagram_data['value_meta']; //metadata
         const is_invalid_lf = diagram_data['invalid_lf'];
 
         const el_div = document.createElement('div');
         el_div.classList.add('svg-sld-viewer-widget');
 
-        el_div.classList.toggle('invalid-lf', is_invalid_lf);
+        el_div.classList.toggle('invalid-lf', is_invalid_lf || model.get('invalid_lf'));
 
         const is_hover_enabled = model.get('hover_enabled');
 
@@ -98,10 +172,14 @@ function render({ model, el, experimental }: RenderProps<SldWidgetModel>) {
             popupInfo?.handleHover(shouldDisplay, mousePos, equipmentId, equipmentType);
         };
 
+        const parse_start = performance.now();
+        const parsed_meta = metadata ? JSON.parse(metadata) : null;
+        reportRenderTime(model, 'frontend_metadata_parse', parse_start);
+
         new SingleLineDiagramViewer(
             el_div,
             svg_data,
-            metadata ? JSON.parse(metadata) : null,
+            parsed_meta,
             'voltage-level',
             800,
             600,
@@ -115,29 +193,109 @@ function render({ model, el, experimental }: RenderProps<SldWidgetModel>) {
             is_hover_enabled ? handleTogglePopover : null //callback on the togglePopOver
         );
 
-        if (diagram_data['keep_viewbox']) {
+        diagramMetadata = parsed_meta;
+        showPendingSwitches(el_div, diagramMetadata, model.get('pending_switches') ?? {});
+        showFeederValues(el_div, model.get('feeder_values') ?? []);
+
+        if (diagram_data['keep_viewbox'] || lazyMetadata !== null) {
             const outerSvgElement = el_div.querySelector('svg');
             outerSvgElement?.setAttribute('viewBox', viewDataPre);
         }
 
         popupInfo = new PopupInfo(el_div, async (id: string, type: string) => {
             try {
-                const [retInfo, _buffers] = await experimental.invoke('_get_on_hover_info', {
-                    id: id ?? null,
-                    type: type,
-                });
-                return retInfo as string;
+                return await hoverInfoCache.get(id, type, fetchHoverInfo);
             } catch (e) {
                 return `Error retrieving hover info: ${e}`;
             }
         });
 
+        reportRenderTime(model, 'frontend_render', render_start);
+
+        // lazy metadata mode: the metadata are left on the python side until the pointer first enters the diagram,
+        // or until switches are pending, to highlight them
+        const lazyToken = diagram_data['lazy_metadata'];
+        if (lazyToken && !metadata) {
+            el_div.addEventListener('pointerenter', () => loadLazyMetadata(el_div, lazyToken), { once: true });
+            if (hasPendingSwitches()) {
+                loadLazyMetadata(el_div, lazyToken);
+            }
+        }
+
         return el_div;
     }
 
+    const hasPendingSwitches = () => Object.keys(model.get('pending_switches') ?? {}).length > 0;
+
+    // the diagram elements whose lazy metadata are loading, or loaded
+    const lazyMetadataRequests = new WeakSet<HTMLElement>();
+
+    async function loadLazyMetadata(diagramElement: HTMLElement, lazyToken: number) {
+        if (lazyMetadataRequests.has(diagramElement)) {
+            return;
+        }
+        lazyMetadataRequests.add(diagramElement);
+        // the clicks and the hovered element while the metadata are loading are replayed on the diagram rendered
+        // with them, where the callbacks are set
+        const pendingClicks: MouseEvent[] = [];
+        let hoverEvent: MouseEvent | null = null;
+        const queueClick = (event: Event) => {
+            event.stopPropagation();
+            pendingClicks.push(event as MouseEvent);
+        };
+        const trackHover = (event: Event) => {
+            hoverEvent = event as MouseEvent;
+        };
+        const clearHover = () => {
+            hoverEvent = null;
+        };
+        diagramElement.addEventListener('click', queueClick, true);
+        diagramElement.addEventListener('contextmenu', queueClick, true);
+        diagramElement.addEventListener('mouseover', trackHover, true);
+        diagramElement.addEventListener('pointerleave', clearHover);
+        try {
+            const [lazyMetadata, _buffers] = await experimental.invoke('_get_lazy_metadata', { token: lazyToken });
+            // ignored if the diagram has been replaced in the meantime
+            if (!lazyMetadata || diagramElement.parentNode !== el) {
+                return;
+            }
+            const currViewData = diagramElement.querySelector('svg')?.getAttribute('viewBox') || '';
+            const newDiagramElement = render_diagram(model, currViewData, lazyMetadata as string);
+            el.replaceChild(newDiagramElement, diagramElement);
+            replayPointerEvents(newDiagramElement, hoverEvent ? [...pendingClicks, hoverEvent] : pendingClicks);
+        } finally {
+            diagramElement.removeEventListener('click', queueClick, true);
+            diagramElement.removeEventListener('contextmenu', queueClick, true);
+            diagramElement.removeEventListener('mouseover', trackHover, true);
+            diagramElement.removeEventListener('pointerleave', clearHover);
+        }
+    }
+
     const diagram_element = render_diagram(model, '');
     el.appendChild(diagram_element);
 
+    model.on('change:pending_switches', () => {
+        const lazyToken = model.get('diagram_data')['lazy_metadata'];
+        const diagramElement = el.querySelector('.svg-sld-viewer-widget') as HTMLElement | null;
+        if (diagramMetadata === null && lazyToken && diagramElement && hasPendingSwitches()) {
+            // highlighted by the diagram rendered with the metadata
+            loadLazyMetadata(diagramElement, lazyToken);
+            return;
+        }
+        showPendingSwitches(el, diagramMetadata, model.get('pending_switches') ?? {});
+    });
+
+    model.on('change:feeder_values', () => {
+        showFeederValues(el, model.get('feeder_values') ?? []);
+    });
+
+    model.on('change:invalid_lf', () => {
+        el.querySelector('.svg-sld-viewer-widget')?.classList.toggle(
+            'invalid-lf',
+            model.get('diagram_data')['invalid_lf'] || model.get('invalid_lf')
+        );
+    });
+
     model.on('change:diagram_data', () => {
         const nodes = el.querySelectorAll('.svg-sld-viewer-widget')[0];
         const currViewData = el.querySelector('svg')?.getAttribute('viewBox') || '';
@@ -0,0 +1,331 @@
+// Copyright (c) 2025, RTE (http://www.rte-france.com)
+// This Source Code Form is subject to the terms of the Mozilla Public
+// License, v. 2.0. If a copy of the MPL was not distributed with this
+// file, You can obtain one at http://mozilla.org/MPL/2.0/.
+// SPDX-License-Identifier: MPL-2.0
+//
+
+// Runtime of the static HTML export (see ../src/pypowsybl_jupyter/htmlexport.py): renders the SLD, NAD and network
+// map widgets without a kernel, from the chunks embedded in the page. Chunks (the diagrams, the map data, the hover
+// data and the widgets' code) are gzip compressed and base64 encoded; each one is decoded only the first time it is
+// needed.
+
+import './staticexport.css';
+
+/* Specifies the manifest written by ../src/pypowsybl_jupyter/htmlexport.py */
+interface Manifest {
+    title: string;
+    vls: [string, string][];
+    vl_id: string | null;
+    slds: Record<string, number>;
+    nad: number | null;
+    map: number | null;
+    map_hover: number | null;
+    hover_enabled: boolean;
+    widgets: Record<string, { esm: number; css: number }>;
+}
+
+interface Diagram {
+    svg: string;
+    metadata: string | null;
+    hover: Record<string, string>;
+}
+
+type MessageHandler = (content: any, model: StaticModel) => void;
+
+type CommandHandler = (msg: any) => Promise<string>;
+
+const decodedChunks = new Map<number, Promise<string>>();
+
+async function decodeChunk(index: number): Promise<string> {
+    const element = document.getElementById(`pj-chunk-${index}`);
+    const binary = atob(element?.textContent?.trim() ?? '');
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    return new Response(stream).text();
+}
+
+function readChunk(index: number): Promise<string> {
+    let chunk = decodedChunks.get(index);
+    if (chunk === undefined) {
+        chunk = decodeChunk(index);
+        decodedChunks.set(index, chunk);
+    }
+    return chunk;
+}
+
+async function readJsonChunk(index: number): Promise<any> {
+    return JSON.parse(await readChunk(index));
+}
+
+/**
+ * A minimal anywidget model: the state lives in the page, the messages sent by the widgets are handled by the page.
+ */
+class StaticModel {
+    state: Record<string, any>;
+    listeners = new Map<string, (() => void)[]>();
+    onMessage: MessageHandler;
+
+    constructor(state: Record<string, any>, onMessage: MessageHandler) {
+        this.state = { ...state, profiling_enabled: false };
+        this.onMessage = onMessage;
+    }
+
+    get(key: string): any {
+        return this.state[key];
+    }
+
+    set(key: string, value: any): void {
+        this.state[key] = value;
+        (this.listeners.get(`change:${key}`) ?? []).forEach((callback) => callback());
+    }
+
+    on(event: string, callback: () => void): void {
+        this.listeners.set(event, [...(this.listeners.get(event) ?? []), callback]);
+    }
+
+    off(event: string, callback: () => void): void {
+        this.listeners.set(
+            event,
+            (this.listeners.get(event) ?? []).filter((cb) => cb !== callback)
+        );
+    }
+
+    save_changes(): void {
+        // nothing to synchronize: there is no kernel
+    }
+
+    send(content: any): void {
+        this.onMessage(content, this);
+    }
+}
+
+class StaticPage {
+    manifest: Manifest;
+    widgets = new Map<string, Promise<any>>();
+    tabs = new Map<string, { button: HTMLButtonElement; pane: HTMLDivElement }>();
+    renderedTabs = new Set<string>();
+    vlSelect: HTMLSelectElement;
+    sldMessage: HTMLDivElement;
+    sldContainer: HTMLDivElement;
+    sldModel: StaticModel | null = null;
+    sldHover: Record<string, string> = {};
+    sldRequestId: number = 0;
+    nadHover: Record<string, string> = {};
+
+    constructor(root: HTMLElement, manifest: Manifest) {
+        this.manifest = manifest;
+        document.title = manifest.title;
+
+        const sidebar = document.createElement('div');
+        sidebar.classList.add('pj-sidebar');
+        const filter = document.createElement('input');
+        filter.placeholder = 'Filter';
+        filter.addEventListener('input', () => this.fillVoltageLevels(filter.value));
+        this.vlSelect = document.createElement('select');
+        this.vlSelect.size = 30;
+        this.vlSelect.addEventListener('change', () => this.showSld(this.vlSelect.value));
+        sidebar.append(filter, this.vlSelect);
+
+        const main = document.createElement('div');
+        main.classList.add('pj-main');
+        const tabBar = document.createElement('div');
+        tabBar.classList.add('pj-tabs');
+        main.appendChild(tabBar);
+
+        const addTab = (name: string, label: string) => {
+            const button = document.createElement('button');
+            button.textContent = label;
+            button.addEventListener('click', () => this.selectTab(name));
+            tabBar.appendChild(button);
+            const pane = document.createElement('div');
+            pane.classList.add('pj-pane');
+            main.appendChild(pane);
+            this.tabs.set(name, { button: button, pane: pane });
+            return pane;
+        };
+        if (manifest.nad !== null) {
+            addTab('nad', 'Network Area');
+        }
+        const sldPane = addTab('sld', 'Single Line');
+        this.sldMessage = document.createElement('div');
+        this.sldMessage.classList.add('pj-message');
+        this.sldContainer = document.createElement('div');
+        sldPane.append(this.sldMessage, this.sldContainer);
+        if (manifest.map !== null) {
+            addTab('map', 'Network map');
+        }
+
+        const title = document.createElement('h1');
+        title.textContent = manifest.title;
+        const content = document.createElement('div');
+        content.classList.add('pj-content');
+        content.append(sidebar, main);
+        root.append(title, content);
+
+        this.fillVoltageLevels('');
+        this.selectTab(manifest.nad !== null ? 'nad' : 'sld');
+        if (manifest.vl_id !== null) {
+            this.showSld(manifest.vl_id);
+        }
+    }
+
+    fillVoltageLevels(filter: string): void {
+        const text = filter.toLowerCase();
+        const options = this.manifest.vls
+            .filter(([id, name]) => text === '' || id.toLowerCase().includes(text) || name.toLowerCase().includes(text))
+            .map(([id, name]) => new Option(name, id));
+        this.vlSelect.replaceChildren(...options);
+    }
+
+    loadWidget(name: string): Promise<any> {
+        let widget = this.widgets.get(name);
+        if (widget === undefined) {
+            widget = (async () => {
+                const assets = this.manifest.widgets[name];
+                const style = document.createElement('style');
+                style.textContent = await readChunk(assets.css);
+                document.head.appendChild(style);
+                const url = URL.createObjectURL(new Blob([await readChunk(assets.esm)], { type: 'text/javascript' }));
+                try {
+                    return (await import(url)).default;
+                } finally {
+                    URL.revokeObjectURL(url);
+                }
+            })();
+            this.widgets.set(name, widget);
+        }
+        return widget;
+    }
+
+    async renderWidget(name: string, el: HTMLElement, model: StaticModel, commands: Record<string, CommandHandler>) {
+        const widget = await this.loadWidget(name);
+        const experimental = {
+            invoke: async (command: string, msg: any) => {
+                const handler = commands[command];
+                return [handler ? await handler(msg) : '', []];
+            },
+        };
+        await widget.render({ model: model, el: el, experimental: experimental });
+    }
+
+    selectTab(name: string): void {
+        this.tabs.forEach((tab, tabName) => {
+            tab.button.classList.toggle('pj-selected', tabName === name);
+            tab.pane.style.display = tabName === name ? 'block' : 'none';
+        });
+        if (!this.renderedTabs.has(name)) {
+            this.renderedTabs.add(name);
+            if (name === 'nad') {
+                this.renderNad();
+            } else if (name === 'map') {
+                this.renderMap();
+            }
+        }
+    }
+
+    goToVoltageLevel(vlId: string): void {
+        this.selectTab('sld');
+        this.showSld(vlId);
+    }
+
+    async showSld(vlId: string) {
+        const requestId = ++this.sldRequestId;
+        this.vlSelect.value = vlId;
+        const index = this.manifest.slds[vlId];
+        if (index === undefined) {
+            this.sldMessage.textContent = `The single-line diagram of ${vlId} has not been exported.`;
+            this.sldContainer.style.display = 'none';
+            return;
+        }
+        const diagram: Diagram = await readJsonChunk(index);
+        if (requestId !== this.sldRequestId) {
+            // another voltage level has been selected in the meantime
+            return;
+        }
+        this.sldMessage.textContent = '';
+        this.sldContainer.style.display = 'block';
+        this.sldHover = diagram.hover;
+        const diagramData = { value: diagram.svg, value_meta: diagram.metadata, invalid_lf: false };
+        if (this.sldModel === null) {
+            this.sldModel = new StaticModel(
+                {
+                    diagram_data: diagramData,
+                    clicked_nextvl: '',
+                    clicked_switch: {},
+                    clicked_feeder: {},
+                    clicked_bus: {},
+                    hover_enabled: this.manifest.hover_enabled,
+                },
+                (content, model) => {
+                    if (content.event === 'click_nextvl') {
+                        this.showSld(model.get('clicked_nextvl'));
+                    }
+                }
+            );
+            await this.renderWidget('sld', this.sldContainer, this.sldModel, {
+                _get_on_hover_info: async (msg) => this.sldHover[msg.id] ?? '',
+            });
+        } else {
+            this.sldModel.set('diagram_data', diagramData);
+        }
+    }
+
+    async renderNad() {
+        const diagram: Diagram = await readJsonChunk(this.manifest.nad as number);
+        this.nadHover = diagram.hover;
+        const model = new StaticModel(
+            {
+                diagram_data: {
+                    svg_data: diagram.svg,
+                    metadata: diagram.metadata,
+                    invalid_lf: false,
+                    grayout: false,
+                    drag_enabled: false,
+                },
+                selected_node: {},
+                selected_menu: {},
+                moved_node: {},
+                moved_text_node: {},
+                current_nad_metadata: '',
+                popup_menu_items: [],
+                hover_enabled: this.manifest.hover_enabled,
+                branch_states: [],
+            },
+            (content, model) => {
+                if (content.event === 'select_node') {
+                    this.goToVoltageLevel(model.get('selected_node').equipment_id);
+                }
+            }
+        );
+        await this.renderWidget('nad', (this.tabs.get('nad') as { pane: HTMLDivElement }).pane, model, {
+            _get_on_hover_info: async (msg) => this.nadHover[msg.id] ?? '',
+        });
+    }
+
+    async renderMap() {
+        const state = await readJsonChunk(this.manifest.map as number);
+        const model = new StaticModel(state, (content, model) => {
+            if (content.event === 'select_vl') {
+                this.goToVoltageLevel(model.get('selected_vl'));
+            }
+        });
+        const mapHoverIndex = this.manifest.map_hover;
+        let mapHover: Promise<Record<string, string>> | null = null;
+        await this.renderWidget('map', (this.tabs.get('map') as { pane: HTMLDivElement }).pane, model, {
+            _get_on_hover_info: async (msg) => {
+                if (mapHoverIndex === null) {
+                    return '';
+                }
+                mapHover = mapHover ?? readJsonChunk(mapHoverIndex);
+                return (await mapHover)[msg.id] ?? '';
+            },
+        });
+    }
+}
+
+const manifestElement = document.getElementById('pj-manifest');
+new StaticPage(document.getElementById('pj-root') as HTMLElement, JSON.parse(manifestElement?.textContent ?? '{}'));
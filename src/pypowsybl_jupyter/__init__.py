@@ -5,17 +5,90 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 
+import importlib
 import importlib.metadata
+from typing import TYPE_CHECKING
 
-from .sldwidget import (
-    SldWidget, display_sld, update_sld
-)
-from .nadwidget import (
-    NadWidget, display_nad, update_nad
-)
-from .nadexplorer import nad_explorer
-from .networkexplorer import network_explorer
-from .networkmapwidget import NetworkMapWidget
+# The widget modules (and their dependencies: anywidget, ipywidgets, pandas, pypowsybl) are imported
+# on first access to one of their attributes, so that a notebook only pays for the widgets it uses.
+_LAZY_ATTRIBUTES = {
+    'SldWidget': '.sldwidget',
+    'display_sld': '.sldwidget',
+    'update_sld': '.sldwidget',
+    'NadWidget': '.nadwidget',
+    'display_nad': '.nadwidget',
+    'update_nad': '.nadwidget',
+    'nad_explorer': '.nadexplorer',
+    'network_explorer': '.networkexplorer',
+    'NetworkMapWidget': '.networkmapwidget',
+    'EventCoalescer': '.eventcoalescer',
+    'enable_profiling': '.profiler',
+    'reset_profiling': '.profiler',
+    'get_profiling_data': '.profiler',
+    'get_profiling_summary': '.profiler',
+    'profiling_stats_widget': '.profiler',
+    'NetworkSnapshot': '.networksnapshot',
+    'get_network_snapshot': '.networksnapshot',
+    'invalidate_network_snapshot': '.networksnapshot',
+    'export_slds': '.batchexport',
+    'export_nads': '.batchexport',
+    'export_explorer_html': '.htmlexport',
+    'TimeSeriesSource': '.timeseries',
+    'DataFrameTimeSeriesSource': '.timeseries',
+    'ArrowTimeSeriesSource': '.timeseries',
+    'compute_branch_aggregates': '.timeseries',
+    'VariantComparison': '.variantcomparison',
+    'compare_variants': '.variantcomparison',
+    'ContingencyResults': '.contingencybrowser',
+    'contingency_browser': '.contingencybrowser',
+    'render_contingency_slds': '.contingencybrowser',
+    'NetworkScheduler': '.scheduler',
+    'Priority': '.scheduler',
+    'get_network_scheduler': '.scheduler',
+    'DiagramCache': '.diagramcache',
+    'MapSpatialIndex': '.mapindex',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .sldwidget import (
+        SldWidget, display_sld, update_sld
+    )
+    from .nadwidget import (
+        NadWidget, display_nad, update_nad
+    )
+    from .nadexplorer import nad_explorer
+    from .networkexplorer import network_explorer
+    from .networkmapwidget import NetworkMapWidget
+    from .eventcoalescer import EventCoalescer
+    from .profiler import (
+        enable_profiling, reset_profiling, get_profiling_data, get_profiling_summary, profiling_stats_widget
+    )
+    from .networksnapshot import (
+        NetworkSnapshot, get_network_snapshot, invalidate_network_snapshot
+    )
+    from .batchexport import export_slds, export_nads
+    from .htmlexport import export_explorer_html
+    from .timeseries import (
+        TimeSeriesSource, DataFrameTimeSeriesSource, ArrowTimeSeriesSource, compute_branch_aggregates
+    )
+    from .variantcomparison import VariantComparison, compare_variants
+    from .contingencybrowser import ContingencyResults, contingency_browser, render_contingency_slds
+    from .scheduler import NetworkScheduler, Priority, get_network_scheduler
+    from .diagramcache import DiagramCache
+    from .mapindex import MapSpatialIndex
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 try:
     __version__ = importlib.metadata.version("pypowsybl_jupyter")
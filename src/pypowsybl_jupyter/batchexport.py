@@ -0,0 +1,287 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Batch rendering of SLDs and NADs to disk, in parallel: each worker process loads the network once,
+then renders the diagrams it is given. Diagrams are written to a directory or to a zip archive.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+import pandas as pd
+import pypowsybl.network as pn
+from pypowsybl.network import Network, NadParameters, SldParameters
+
+ProgressType = Union[bool, Callable[[int, int], None]]
+
+EXPORT_COLUMNS = ['id', 'file', 'status', 'error']
+
+# the network loaded by a worker process, and the diagram rendering function
+_worker_network = None
+_worker_render = None
+
+def _init_worker(network_file: str, render: Callable):
+    global _worker_network, _worker_render
+    _worker_network = pn.load(network_file)
+    _worker_render = render
+
+def _render_items(network: Network, render: Callable, items: list) -> list:
+    results = []
+    for name, target in items:
+        try:
+            svg = render(network, target)
+            results.append((name, svg._content, svg._metadata, None))
+        except Exception as err:
+            results.append((name, None, None, repr(err)))
+    return results
+
+def _render_chunk(items: list) -> list:
+    return _render_items(_worker_network, _worker_render, items)
+
+class _RenderSld:
+    def __init__(self, parameters: SldParameters):
+        self.parameters = parameters
+
+    def __call__(self, network: Network, container_id: str):
+        return network.get_single_line_diagram(container_id, self.parameters)
+
+class _RenderNad:
+    def __init__(self, depth: int, parameters: NadParameters):
+        self.depth = depth
+        self.parameters = parameters
+
+    def __call__(self, network: Network, voltage_level_ids: List[str]):
+        return network.get_network_area_diagram(voltage_level_ids=voltage_level_ids, depth=self.depth, nad_parameters=self.parameters)
+
+def _get_file_name(name: str) -> str:
+    file_name = re.sub(r'[^A-Za-z0-9._-]', '_', name)
+    if file_name != name:
+        # distinct names may only differ by their replaced characters, e.g., 'A/B' and 'A_B'
+        file_name += '-' + hashlib.sha1(name.encode()).hexdigest()[:8]
+    return file_name
+
+class _DirectoryWriter:
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, file_name: str) -> bool:
+        return (self.path / file_name).exists()
+
+    def write(self, file_name: str, content: str):
+        # written to a temporary file first, so that an interrupted export never leaves a partial diagram behind
+        tmp_path = self.path / (file_name + '.tmp')
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, self.path / file_name)
+
+    def close(self):
+        pass
+
+class _ZipWriter:
+    # the diagrams are first written to a directory next to the archive, then added to the archive by close(): a zip file
+    # is only readable once complete, while the directory's diagrams are kept by an interrupted export, for its resumption
+    def __init__(self, path: pathlib.Path, resume: bool = True):
+        self.path = path
+        self.parts = _DirectoryWriter(path.with_name(path.name + '.parts'))
+        self.names = set()
+        if resume:
+            if path.exists():
+                try:
+                    with zipfile.ZipFile(path) as archive:
+                        self.names = set(archive.namelist())
+                except zipfile.BadZipFile:
+                    # e.g., left incomplete by an interrupted write: replaced by the new archive
+                    pass
+        else:
+            shutil.rmtree(self.parts.path)
+            self.parts.path.mkdir()
+
+    def exists(self, file_name: str) -> bool:
+        return file_name in self.names or self.parts.exists(file_name)
+
+    def write(self, file_name: str, content: str):
+        self.parts.write(file_name, content)
+
+    def close(self):
+        part_files = sorted(file.name for file in self.parts.path.iterdir() if file.suffix != '.tmp')
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            if self.names:
+                with zipfile.ZipFile(self.path) as previous_archive:
+                    for info in previous_archive.infolist():
+                        if info.filename not in part_files:
+                            archive.writestr(info, previous_archive.read(info))
+            for file_name in part_files:
+                archive.write(self.parts.path / file_name, file_name)
+        # replaced at once, so that the archive is always complete
+        os.replace(tmp_path, self.path)
+        shutil.rmtree(self.parts.path)
+
+def _create_progress(progress: ProgressType, total: int) -> Callable[[int, int], None]:
+    if callable(progress):
+        return progress
+    if not progress:
+        return lambda done, total: None
+
+    import ipywidgets as widgets
+    from IPython.display import display
+
+    progress_bar = widgets.IntProgress(value=0, min=0, max=total, description='Export:')
+    progress_label = widgets.Label(f'0/{total}')
+    display(widgets.HBox([progress_bar, progress_label]))
+
+    def update(done, total):
+        progress_bar.value = done
+        progress_label.value = f'{done}/{total}'
+
+    return update
+
+def _render_diagrams(network: Union[str, pathlib.Path, Network], items: List[Tuple[str, object]], render: Callable,
+                     max_workers: int = None, chunk_size: int = 20) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Renders the diagrams, yielding (name, svg, metadata, error) tuples in completion order.
+    When a single worker is needed and the network is in memory, the diagrams are rendered in the current process.
+    """
+    if len(items) == 0:
+        return
+    workers = max(1, min(max_workers if max_workers is not None else os.cpu_count() or 1,
+                         (len(items) + chunk_size - 1) // chunk_size))
+    if workers == 1 and isinstance(network, Network):
+        for i in range(0, len(items), chunk_size):
+            yield from _render_items(network, render, items[i:i + chunk_size])
+        return
+
+    tmp_dir = None
+    if isinstance(network, Network):
+        tmp_dir = tempfile.TemporaryDirectory()
+        network_file = str(pathlib.Path(tmp_dir.name) / 'network.xiidm')
+        network.save(network_file, format='XIIDM')
+    else:
+        network_file = str(network)
+    try:
+        # the 'spawn' start method: pypowsybl's native library must not be shared with a forked process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(network_file, render)) as executor:
+            futures = [executor.submit(_render_chunk, items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+def _export(network: Union[str, pathlib.Path, Network], output: Union[str, pathlib.Path], items: Dict[str, object], render: Callable,
+            include_metadata: bool, resume: bool, max_workers: int, chunk_size: int, progress: ProgressType) -> pd.DataFrame:
+    output = pathlib.Path(output)
+    file_names = {name: _get_file_name(name) for name in items}
+    if len(set(file_names.values())) < len(file_names):
+        raise ValueError('Several diagrams have the same file name')
+    writer = _ZipWriter(output, resume) if output.suffix == '.zip' else _DirectoryWriter(output)
+
+    records = []
+    to_render = []
+    for name, target in items.items():
+        file_name = file_names[name] + '.svg'
+        if resume and writer.exists(file_name):
+            records.append((name, file_name, 'skipped', None))
+        else:
+            to_render.append((name, target))
+
+    report_progress = _create_progress(progress, len(items))
+    done = len(records)
+    report_progress(done, len(items))
+    try:
+        for name, svg, metadata, error in _render_diagrams(network, to_render, render, max_workers, chunk_size):
+            file_name = file_names[name] + '.svg'
+            if error is None:
+                if include_metadata and metadata is not None:
+                    writer.write(file_names[name] + '.json', metadata)
+                writer.write(file_name, svg)
+                records.append((name, file_name, 'exported', None))
+            else:
+                records.append((name, None, 'error', error))
+            done += 1
+            report_progress(done, len(items))
+    finally:
+        writer.close()
+
+    return pd.DataFrame.from_records(records, columns=EXPORT_COLUMNS).set_index('id').reindex(list(items))
+
+def export_slds(network: Union[str, pathlib.Path, Network], output: Union[str, pathlib.Path], container_ids: List[str] = None,
+                sld_parameters: SldParameters = None, include_metadata: bool = False, resume: bool = True,
+                max_workers: int = None, chunk_size: int = 20, progress: ProgressType = True) -> pd.DataFrame:
+    """
+    Renders the single-line diagrams of a list of voltage levels (or substations) in parallel, and writes them to disk.
+
+    Args:
+        network: the network file, loaded once by each worker process. An in-memory network is first saved to a temporary file.
+        output: a directory, or a zip archive (.zip extension), where the diagrams are written: one <id>.svg file per diagram (ids characters other than letters, digits, '.', '_' and '-' are replaced by '_', and a hash of the id is appended).
+        container_ids: the voltage levels (or substations) ids. None exports all the network's voltage levels.
+        sld_parameters: layout properties to adjust the svg rendering
+        include_metadata: when True, the diagrams metadata are written too, in <id>.json files
+        resume: when True (default), the diagrams already written to the output, e.g., by an interrupted export, are skipped. When False, a zip archive is replaced.
+        max_workers: the number of worker processes. None uses the number of CPUs. When a single worker is needed (e.g., max_workers=1) and the network is in memory, the diagrams are rendered in the current process.
+        chunk_size: the number of diagrams rendered by a worker in a row, before sending them back
+        progress: True (default) displays a progress bar; a function is called with the number of processed diagrams and their total; False disables the progress reporting.
+
+    Returns:
+        A dataframe, indexed by id, with the written file name and the export status ('exported', 'skipped' or 'error', with the error message) of each diagram.
+
+    Examples:
+
+        .. code-block:: python
+
+            export_slds('network.xiidm', 'slds.zip')
+    """
+    if container_ids is None:
+        vl_network = network if isinstance(network, Network) else pn.load(str(network))
+        container_ids = list(vl_network.get_voltage_levels(attributes=[]).index)
+    return _export(network, output, {container_id: container_id for container_id in container_ids}, _RenderSld(sld_parameters),
+                   include_metadata, resume, max_workers, chunk_size, progress)
+
+def export_nads(network: Union[str, pathlib.Path, Network], output: Union[str, pathlib.Path], areas: Union[List[str], Dict[str, List[str]]] = None,
+                depth: int = 0, nad_parameters: NadParameters = None, include_metadata: bool = False, resume: bool = True,
+                max_workers: int = None, chunk_size: int = 5, progress: ProgressType = True) -> pd.DataFrame:
+    """
+    Renders network area diagrams in parallel, and writes them to disk.
+
+    Args:
+        network: the network file, loaded once by each worker process. An in-memory network is first saved to a temporary file.
+        output: a directory, or a zip archive (.zip extension), where the diagrams are written: one <area name>.svg file per diagram (names characters other than letters, digits, '.', '_' and '-' are replaced by '_', and a hash of the name is appended).
+        areas: the diagrams to render: a dict of area names to lists of voltage levels ids, or a list of voltage levels ids (one diagram per voltage level). None renders one diagram per voltage level of the network.
+        depth: the diagrams depth around the areas voltage levels
+        nad_parameters: layout properties to adjust the svg rendering
+        include_metadata: when True, the diagrams metadata are written too, in <area name>.json files
+        resume: when True (default), the diagrams already written to the output, e.g., by an interrupted export, are skipped. When False, a zip archive is replaced.
+        max_workers: the number of worker processes. None uses the number of CPUs. When a single worker is needed (e.g., max_workers=1) and the network is in memory, the diagrams are rendered in the current process.
+        chunk_size: the number of diagrams rendered by a worker in a row, before sending them back
+        progress: True (default) displays a progress bar; a function is called with the number of processed diagrams and their total; False disables the progress reporting.
+
+    Returns:
+        A dataframe, indexed by area name, with the written file name and the export status ('exported', 'skipped' or 'error', with the error message) of each diagram.
+
+    Examples:
+
+        .. code-block:: python
+
+            export_nads('network.xiidm', 'nads', {'north': ['VL1', 'VL2'], 'south': ['VL3']}, depth=1)
+    """
+    if areas is None:
+        vl_network = network if isinstance(network, Network) else pn.load(str(network))
+        areas = list(vl_network.get_voltage_levels(attributes=[]).index)
+    if not isinstance(areas, dict):
+        areas = {vl_id: [vl_id] for vl_id in areas}
+    return _export(network, output, areas, _RenderNad(depth, nad_parameters),
+                   include_metadata, resume, max_workers, chunk_size, progress)
@@ -0,0 +1,392 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Browsing of a security analysis' post-contingency states on diagrams laid out and rendered once: the branches flows,
+currents and loadings of all the contingencies are extracted from the security analysis result into arrays, in one pass,
+so that navigating the contingencies only sends the selected state's values to the browser. The post-contingency SLDs,
+which do need to be rendered again (their topology changes), can be rendered ahead of time, in parallel.
+"""
+
+import json
+from typing import Dict, List
+
+import ipywidgets as widgets
+import numpy as np
+import pandas as pd
+import pypowsybl.loadflow as lf
+from pypowsybl.network import Network, NadParameters, SldParameters
+from pypowsybl.security import SecurityAnalysisResult
+
+from .batchexport import _create_progress, _render_diagrams
+from .nadwidget import display_nad
+from .networkmapwidget import NetworkMapWidget
+from .sldwidget import display_sld, update_sld
+from .profiler import get_profiler
+from .flowsrefresh import get_nad_voltage_level_states
+
+BROWSED_VALUES = ['p', 'i', 'loading']
+
+_BRANCH_VALUES_COLUMNS = ['p1', 'p2', 'i1', 'i2']
+
+# the network variant where the post-contingency states are computed, to render their SLDs
+_CONTINGENCY_VARIANT_ID = 'pypowsybl-jupyter-contingency'
+
+def _to_state_array(values: pd.Series, state_codes: np.ndarray, item_codes: np.ndarray, shape) -> np.ndarray:
+    array = np.full(shape, np.nan)
+    array[state_codes, item_codes] = values.to_numpy(dtype=float)
+    return array
+
+def _get_permanent_current_limits(network: Network, branch_ids: pd.Index) -> np.ndarray:
+    """
+    Returns the permanent current limits of the branches' sides ONE and TWO, as a (2, branches count) array (NaN without limit).
+    """
+    limits = network.get_operational_limits().reset_index()
+    limits = limits[(limits['type'] == 'CURRENT') & (limits['acceptable_duration'] == -1)]
+    limits = limits.groupby(['element_id', 'side'])['value'].min()
+    return np.array([limits.reindex(pd.MultiIndex.from_arrays([branch_ids, [side] * len(branch_ids)])).to_numpy(dtype=float)
+                     for side in ('ONE', 'TWO')])
+
+class ContingencyResults:
+    """
+    The branches and buses values of the pre-contingency state and of all the post-contingency states of a security analysis,
+    as (states, branches) and (states, buses) arrays. The branches loading is the highest current of the branch's sides,
+    relative to the side's permanent current limit, in percent.
+
+    The security analysis only reports the values of the monitored branches and voltage levels: they must have been
+    added to the analysis (add_monitored_elements) before running it.
+
+    Args:
+        network: the analyzed network, in its pre-contingency state
+        result: the security analysis result (the operator strategies results are ignored)
+    """
+
+    def __init__(self, network: Network, result: SecurityAnalysisResult):
+        with get_profiler().measure('contingency_browser', 'results_extraction'):
+            self.contingency_ids: List[str] = list(result.post_contingency_results)
+            self.statuses = pd.Series({contingency_id: post_contingency_result.status.name
+                                       for contingency_id, post_contingency_result in result.post_contingency_results.items()},
+                                      dtype=object).reindex(self.contingency_ids)
+            # the state index 0 is the pre-contingency state
+            self._state_ids = pd.Index([''] + self.contingency_ids)
+
+            branch_results = result.branch_results
+            branch_results = branch_results[branch_results.index.get_level_values('operator_strategy_id') == '']
+            self.branch_ids = pd.Index(pd.unique(branch_results.index.get_level_values('branch_id')))
+            state_codes = self._state_ids.get_indexer(branch_results.index.get_level_values('contingency_id'))
+            branch_codes = self.branch_ids.get_indexer(branch_results.index.get_level_values('branch_id'))
+            shape = (len(self._state_ids), len(self.branch_ids))
+            self._branch_values = {column: _to_state_array(branch_results[column], state_codes, branch_codes, shape)
+                                   for column in _BRANCH_VALUES_COLUMNS}
+            # the branches lost by a contingency have no post-contingency result
+            present = np.zeros(shape, dtype=bool)
+            present[state_codes, branch_codes] = True
+            branches = network.get_branches(attributes=['connected1', 'connected2']).reindex(self.branch_ids)
+            self._connected = [present & branches[column].fillna(False).to_numpy(dtype=bool) for column in ('connected1', 'connected2')]
+
+            limits = _get_permanent_current_limits(network, self.branch_ids)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._branch_values['loading'] = 100 * np.fmax(np.abs(self._branch_values['i1']) / limits[0],
+                                                               np.abs(self._branch_values['i2']) / limits[1])
+
+            bus_results = result.bus_results
+            bus_results = bus_results[bus_results.index.get_level_values('operator_strategy_id') == '']
+            # the results are given per bus of the bus breaker view, the diagrams display the buses of the bus view
+            bus_view_ids = network.get_bus_breaker_view_buses(attributes=['bus_id'])['bus_id']
+            result_bus_ids = bus_results.index.get_level_values('bus_id')
+            bus_ids = pd.Series(bus_view_ids.reindex(result_bus_ids).to_numpy(dtype=object), dtype=object)
+            bus_ids = bus_ids.where(bus_ids.notna() & (bus_ids != ''), pd.Series(result_bus_ids, dtype=object))
+            self.bus_ids = pd.Index(pd.unique(bus_ids))
+            state_codes = self._state_ids.get_indexer(bus_results.index.get_level_values('contingency_id'))
+            bus_codes = self.bus_ids.get_indexer(bus_ids)
+            shape = (len(self._state_ids), len(self.bus_ids))
+            self._bus_values = {column: _to_state_array(bus_results[column], state_codes, bus_codes, shape)
+                                for column in ('v_mag', 'v_angle')}
+
+            self._violations_counts = {contingency_id: len(post_contingency_result.limit_violations)
+                                       for contingency_id, post_contingency_result in result.post_contingency_results.items()}
+
+    def _get_state_index(self, contingency_id: str) -> int:
+        state_index = self._state_ids.get_loc(contingency_id if contingency_id is not None else '')
+        return state_index
+
+    def get_branch_values(self, contingency_id: str, values: str = 'p') -> pd.DataFrame:
+        """
+        Returns the branches values ('p', 'i' or 'loading') of a post-contingency state (None: the pre-contingency state),
+        with their connection status, indexed by branch id: columns value1, value2, connected1, connected2.
+        The loading is the same on both sides.
+        """
+        if values not in BROWSED_VALUES:
+            raise ValueError(f'values must be one of {BROWSED_VALUES}')
+        state_index = self._get_state_index(contingency_id)
+        if values == 'loading':
+            value1 = value2 = self._branch_values['loading'][state_index]
+        else:
+            value1, value2 = self._branch_values[values + '1'][state_index], self._branch_values[values + '2'][state_index]
+        return pd.DataFrame({'value1': value1, 'value2': value2,
+                             'connected1': self._connected[0][state_index], 'connected2': self._connected[1][state_index]},
+                            index=self.branch_ids)
+
+    def get_branch_states(self, contingency_id: str, values: str = 'p', branch_ids: List[str] = None) -> List[dict]:
+        """
+        Returns the branch states (network-viewer's format) of a post-contingency state (None: the pre-contingency state),
+        displaying the 'p', 'i' or 'loading' values. branch_ids, when not None, restricts the returned states to these branches.
+        """
+        branch_values = self.get_branch_values(contingency_id, values)
+        if branch_ids is not None:
+            branch_values = branch_values[branch_values.index.isin(branch_ids)]
+        # NaN is not valid JSON: undefined values are displayed as empty labels
+        states = pd.DataFrame({
+            'branchId': branch_values.index.to_numpy(dtype=object),
+            'value1': branch_values['value1'].astype(object).where(branch_values['value1'].notna(), '').to_numpy(),
+            'value2': branch_values['value2'].astype(object).where(branch_values['value2'].notna(), '').to_numpy(),
+            'connected1': branch_values['connected1'].to_numpy(),
+            'connected2': branch_values['connected2'].to_numpy(),
+        })
+        return states.to_dict('records')
+
+    def get_bus_values(self, contingency_id: str) -> pd.DataFrame:
+        """
+        Returns the buses (bus view) voltage magnitude and angle of a post-contingency state (None: the pre-contingency state).
+        """
+        state_index = self._get_state_index(contingency_id)
+        return pd.DataFrame({column: values[state_index] for column, values in self._bus_values.items()}, index=self.bus_ids)
+
+    def get_summary(self) -> pd.DataFrame:
+        """
+        Returns, for each contingency, its computation status, its limit violations count, its highest branch loading (in percent)
+        and the most loaded branch, sorted by decreasing highest loading.
+        """
+        loadings = self._branch_values['loading'][1:]
+        valid = ~np.all(np.isnan(loadings), axis=1) if loadings.shape[1] > 0 else np.zeros(len(loadings), dtype=bool)
+        max_loadings = np.full(len(loadings), np.nan)
+        most_loaded = np.full(len(loadings), None, dtype=object)
+        if valid.any():
+            max_loadings[valid] = np.nanmax(loadings[valid], axis=1)
+            most_loaded[valid] = self.branch_ids.to_numpy(dtype=object)[np.nanargmax(loadings[valid], axis=1)]
+        summary = pd.DataFrame({
+            'status': self.statuses.to_numpy(),
+            'limit_violations': [self._violations_counts[contingency_id] for contingency_id in self.contingency_ids],
+            'max_loading': max_loadings,
+            'most_loaded_branch': most_loaded,
+        }, index=pd.Index(self.contingency_ids, name='contingency_id'))
+        return summary.sort_values('max_loading', ascending=False, na_position='last', kind='stable')
+
+class _RenderContingencySld:
+    """
+    Renders the post-contingency SLD of a voltage level: the contingency's elements are disconnected in a variant of the network,
+    where a load flow is run. The last computed contingency is kept, so that its voltage levels are rendered from the same variant.
+    """
+
+    def __init__(self, parameters: SldParameters, loadflow_parameters: lf.Parameters):
+        self.parameters = parameters
+        self.loadflow_parameters = loadflow_parameters
+        self._elements = None
+
+    def __call__(self, network: Network, target):
+        elements, voltage_level_id = target
+        working_variant_id = network.get_working_variant_id()
+        try:
+            if elements != self._elements:
+                self._elements = None
+                network.clone_variant(working_variant_id, _CONTINGENCY_VARIANT_ID)
+                network.set_working_variant(_CONTINGENCY_VARIANT_ID)
+                for element_id in elements:
+                    network.disconnect(element_id)
+                lf.run_ac(network, self.loadflow_parameters)
+                self._elements = elements
+            network.set_working_variant(_CONTINGENCY_VARIANT_ID)
+            return network.get_single_line_diagram(voltage_level_id, self.parameters)
+        finally:
+            network.set_working_variant(working_variant_id)
+
+def _get_elements_voltage_levels(network: Network) -> Dict[str, List[str]]:
+    branches = network.get_branches(attributes=['voltage_level1_id', 'voltage_level2_id'])
+    injections = network.get_injections(attributes=['voltage_level_id'])
+    elements_voltage_levels = {branch_id: list(dict.fromkeys(vl_ids)) for branch_id, vl_ids
+                               in zip(branches.index, zip(branches['voltage_level1_id'], branches['voltage_level2_id']))}
+    elements_voltage_levels.update((injection_id, [vl_id]) for injection_id, vl_id in zip(injections.index, injections['voltage_level_id']))
+    return elements_voltage_levels
+
+def render_contingency_slds(network: Network, contingencies: Dict[str, List[str]], sld_parameters: SldParameters = None,
+                            loadflow_parameters: lf.Parameters = None, max_workers: int = None, progress=False) -> Dict[str, Dict[str, tuple]]:
+    """
+    Renders ahead of time, in parallel worker processes, the post-contingency SLDs of the voltage levels of the contingencies' elements.
+
+    Args:
+        network: the network, in its pre-contingency state
+        contingencies: contingency id -> the ids of its elements (branches and injections)
+        sld_parameters: the SLDs rendering parameters
+        loadflow_parameters: the parameters of the load flows computing the post-contingency states
+        max_workers: the maximum number of worker processes. None uses the number of CPUs.
+        progress: True displays a progress bar; a callable is called with the (done, total) rendered diagrams counts
+
+    Returns:
+        contingency id -> voltage level id -> (svg, metadata). The diagrams whose rendering failed are missing.
+    """
+    elements_voltage_levels = _get_elements_voltage_levels(network)
+    items = []
+    for contingency_id, elements in contingencies.items():
+        elements = tuple(elements)
+        vl_ids = dict.fromkeys(vl_id for element_id in elements for vl_id in elements_voltage_levels.get(element_id, []))
+        items.extend((json.dumps([contingency_id, vl_id]), (elements, vl_id)) for vl_id in vl_ids)
+
+    update_progress = _create_progress(progress, len(items))
+    slds = {}
+    try:
+        for done, (name, svg, metadata, error) in enumerate(_render_diagrams(network, items, _RenderContingencySld(sld_parameters, loadflow_parameters),
+                                                                             max_workers), start=1):
+            if error is None:
+                contingency_id, vl_id = json.loads(name)
+                slds.setdefault(contingency_id, {})[vl_id] = (svg, metadata)
+            update_progress(done, len(items))
+    finally:
+        # when rendered in the current process
+        if _CONTINGENCY_VARIANT_ID in network.get_variant_ids():
+            network.remove_variant(_CONTINGENCY_VARIANT_ID)
+    return {contingency_id: slds[contingency_id] for contingency_id in contingencies if contingency_id in slds}
+
+def contingency_browser(network: Network, result: SecurityAnalysisResult, voltage_level_ids: list = None, depth: int = 1,
+                        nad_parameters: NadParameters = None, display_map: bool = True, values: str = 'p',
+                        prerender_slds: bool = False, contingencies: Dict[str, List[str]] = None, sld_parameters: SldParameters = None,
+                        loadflow_parameters: lf.Parameters = None, max_workers: int = None):
+    """
+    Creates a widget browsing the post-contingency states of a security analysis on a NAD and, optionally, a network map.
+    The diagrams are laid out and rendered once, with the pre-contingency state; selecting a contingency only sends
+    its branches values (flows, currents or loadings), buses voltages and branches connection status.
+
+    Args:
+        network: the analyzed network, in its pre-contingency state
+        result: the security analysis result. Only the monitored branches and voltage levels (add_monitored_elements) have values.
+        voltage_level_ids: the voltage levels displayed by the NAD. None displays all the network's voltage levels.
+        depth: the NAD depth around the voltage levels
+        nad_parameters: layout properties to adjust the svg rendering for the NAD
+        display_map: when True (default), a 'Network map' tab displays the lines flows on the network's map
+        values: the initially displayed branches values: 'p' (active power, default), 'i' (current) or 'loading' (percentage of the permanent current limit)
+        prerender_slds: when True, the post-contingency SLDs of the voltage levels of the contingencies' elements are rendered
+            ahead of time, in parallel worker processes, and displayed in a 'Single Line' tab
+        contingencies: contingency id -> the ids of its elements, for prerender_slds. None considers each contingency id as its
+            single element id (as named by add_single_element_contingencies).
+        sld_parameters: the post-contingency SLDs rendering parameters
+        loadflow_parameters: the parameters of the load flows computing the post-contingency SLDs' states
+        max_workers: the maximum number of worker processes rendering the SLDs. None uses the number of CPUs.
+
+    Returns:
+        the browser widget. Its `results` attribute is the ContingencyResults.
+
+    Examples:
+
+        .. code-block:: python
+
+            analysis = pp.security.create_analysis()
+            analysis.add_single_element_contingencies(network.get_lines().index.tolist())
+            analysis.add_monitored_elements(branch_ids=network.get_branches().index.tolist(),
+                                            voltage_level_ids=network.get_voltage_levels().index.tolist())
+            result = analysis.run_ac(network)
+
+            contingency_browser(network, result, voltage_level_ids=['VL1'], depth=2, values='loading')
+    """
+    if values not in BROWSED_VALUES:
+        raise ValueError(f'values must be one of {BROWSED_VALUES}')
+
+    profiler = get_profiler()
+    results = ContingencyResults(network, result)
+    summary = results.get_summary()
+
+    nad_voltage_level_ids = voltage_level_ids if voltage_level_ids is not None else list(network.get_voltage_levels(attributes=[]).index)
+    with profiler.measure('contingency_browser', 'nad_generation'):
+        nad = network.get_network_area_diagram(voltage_level_ids=nad_voltage_level_ids, depth=depth, nad_parameters=nad_parameters)
+    nad_metadata = nad.metadata
+    nad_branch_ids = {edge['equipmentId'] for edge in json.loads(nad_metadata).get('edges', [])}
+    nad_widget = display_nad(nad, drag_enabled=False)
+
+    map_widget = NetworkMapWidget(network) if display_map else None
+    map_branch_ids = set(network.get_lines(attributes=[]).index) | set(network.get_tie_lines(attributes=[]).index) if display_map else None
+
+    slds = {}
+    sld_vl_dropdown = None
+    sld_widget = None
+    if prerender_slds:
+        if contingencies is None:
+            contingencies = {contingency_id: [contingency_id] for contingency_id in results.contingency_ids}
+        with profiler.measure('contingency_browser', 'slds_prerendering'):
+            slds = render_contingency_slds(network, contingencies, sld_parameters, loadflow_parameters, max_workers, progress=True)
+        sld_vl_dropdown = widgets.Dropdown(description='Voltage level:', options=[])
+        sld_widget = display_sld('')
+
+    def format_option(contingency_id):
+        row = summary.loc[contingency_id]
+        label = f"{contingency_id} ({row['status']}"
+        if not np.isnan(row['max_loading']):
+            label += f", max {row['max_loading']:.0f}%"
+        return label + ')'
+
+    contingency_select = widgets.Select(options=[('Pre-contingency state', None)] + [(format_option(contingency_id), contingency_id)
+                                                                                      for contingency_id in summary.index],
+                                        value=None, rows=15, layout=widgets.Layout(width='350px'))
+    values_buttons = widgets.ToggleButtons(options=[('Flows', 'p'), ('Currents', 'i'), ('Loadings', 'loading')], value=values)
+    previous_button = widgets.Button(icon='arrow-up', tooltip='Previous contingency', layout=widgets.Layout(width='40px'))
+    next_button = widgets.Button(icon='arrow-down', tooltip='Next contingency', layout=widgets.Layout(width='40px'))
+
+    def show_values():
+        contingency_id = contingency_select.value
+        with profiler.measure('contingency_browser', 'values_send'):
+            nad_widget.set_branch_states(results.get_branch_states(contingency_id, values_buttons.value, nad_branch_ids))
+            nad_widget.set_voltage_level_states(get_nad_voltage_level_states(nad_metadata, results.get_bus_values(contingency_id).dropna()))
+            if map_widget is not None:
+                # the map's flows arrows are the active powers
+                map_widget.set_branch_states(results.get_branch_states(contingency_id, 'p', map_branch_ids))
+
+    def show_sld():
+        if sld_widget is None:
+            return
+        contingency_slds = slds.get(contingency_select.value, {})
+        if sld_vl_dropdown.value in contingency_slds:
+            svg, _ = contingency_slds[sld_vl_dropdown.value]
+            update_sld(sld_widget, svg)
+        else:
+            update_sld(sld_widget, '')
+
+    def on_contingency_selected(_):
+        show_values()
+        if sld_vl_dropdown is not None:
+            vl_ids = list(slds.get(contingency_select.value, {}))
+            sld_vl_dropdown.options = vl_ids
+            sld_vl_dropdown.value = vl_ids[0] if vl_ids else None
+            show_sld()
+
+    def select_relative(offset):
+        options = [value for _, value in contingency_select.options]
+        index = options.index(contingency_select.value) + offset
+        if 0 <= index < len(options):
+            contingency_select.value = options[index]
+
+    contingency_select.observe(on_contingency_selected, names='value')
+    values_buttons.observe(lambda _: show_values(), names='value')
+    previous_button.on_click(lambda _: select_relative(-1))
+    next_button.on_click(lambda _: select_relative(1))
+    if sld_vl_dropdown is not None:
+        sld_vl_dropdown.observe(lambda _: show_sld(), names='value')
+
+    show_values()
+
+    tabs = [nad_widget]
+    titles = ['Network Area']
+    if map_widget is not None:
+        tabs.append(map_widget)
+        titles.append('Network map')
+    if sld_widget is not None:
+        tabs.append(widgets.VBox([sld_vl_dropdown, sld_widget]))
+        titles.append('Single Line')
+    diagrams = widgets.Tab()
+    diagrams.children = tabs
+    diagrams.titles = titles
+
+    left_panel = widgets.VBox([widgets.HBox([previous_button, next_button]), contingency_select])
+    browser = widgets.VBox([values_buttons, widgets.HBox([left_panel, diagrams])])
+    browser.results = results
+    return browser
@@ -0,0 +1,236 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+On-disk cache of rendered SLDs and NADs, shared by the sessions (kernels) displaying the same network, e.g., the
+dashboards of a Voila or JupyterHub deployment: a diagram rendered by a session is reused by the others. The diagrams
+are stored in an SQLite database, keyed by the network's content checksum, the variant, and the rendering arguments.
+"""
+
+import hashlib
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+import zlib
+from enum import Enum
+from typing import Union
+
+import pandas as pd
+from pypowsybl.network import Network, Svg, SldParameters, NadParameters
+
+from .profiler import get_profiler
+from .scheduler import NetworkScheduler
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS diagrams (
+    key TEXT PRIMARY KEY,
+    svg BLOB NOT NULL,
+    metadata BLOB,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS diagrams_last_access ON diagrams (last_access);
+"""
+
+def get_network_checksum(network: Network) -> str:
+    """
+    Returns the checksum of the content of the network's working variant (SHA-256 of its XIIDM export).
+    It is computed on each call: see NetworkChecksum to reuse it while the network is not modified.
+    """
+    with get_profiler().measure('diagram_cache', 'network_checksum'):
+        return hashlib.sha256(network.save_to_string('XIIDM').encode()).hexdigest()
+
+class NetworkChecksum:
+    """
+    The checksum of a network's working variant, computed on first access and computed again after the variant changes
+    or a write access to the network is granted by the scheduler: the network must only be modified through it.
+
+    Args:
+        network: the network
+        scheduler: the scheduler of the network's write accesses
+    """
+
+    def __init__(self, network: Network, scheduler: NetworkScheduler):
+        self._network = network
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._key = None
+        self._checksum = None
+
+    def get(self) -> str:
+        """
+        Returns the checksum of the network's working variant; to be called in a read access of the network.
+        """
+        key = (self._network.get_working_variant_id(), self._scheduler.write_count)
+        with self._lock:
+            if key != self._key:
+                self._checksum = get_network_checksum(self._network)
+                self._key = key
+            return self._checksum
+
+def _to_key_part(value):
+    # a JSON serializable, deterministic representation of the diagrams' rendering arguments
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return [list(map(str, value.index.names)), list(map(str, getattr(value, 'columns', [value.name]))),
+                int(pd.util.hash_pandas_object(value).sum() % (1 << 63))]
+    if isinstance(value, (list, tuple)):
+        return [_to_key_part(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _to_key_part(item) for key, item in sorted(value.items())}
+    if hasattr(value, '__dict__'):
+        return [type(value).__name__, _to_key_part(vars(value))]
+    return repr(value)
+
+class DiagramCache:
+    """
+    A shared on-disk cache of rendered diagrams: get_single_line_diagram and get_network_area_diagram return the cached
+    diagram when a session already rendered it for the same network content, variant and arguments, and render and
+    store it otherwise. The least recently used diagrams are evicted once the cache exceeds max_size.
+
+    The cache can be used concurrently by several threads and processes (SQLite's write-ahead logging); its path must
+    be on a local file system.
+
+    Args:
+        path: the SQLite database file, created if needed
+        max_size: the maximum total size, in bytes, of the (compressed) cached diagrams
+        timeout: how long, in seconds, an access waits for another process' write to end
+
+    Examples:
+
+        .. code-block:: python
+
+            cache = DiagramCache('/srv/cache/diagrams.sqlite')
+            network_explorer(network, diagram_cache=cache)
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path], max_size: int = 512 * 1024 * 1024, timeout: float = 30.0):
+        self.path = pathlib.Path(path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._get_connection().executescript(_SCHEMA)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # one connection per thread
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self._get_connection())
+
+    def _get_key(self, network: Network, kind: str, arguments: dict, checksum: str) -> str:
+        if checksum is None:
+            checksum = get_network_checksum(network)
+        key = json.dumps([kind, checksum, network.get_working_variant_id(), _to_key_part(arguments)],
+                         sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _get(self, key: str) -> Svg:
+        with self._transaction() as connection:
+            row = connection.execute('SELECT svg, metadata FROM diagrams WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute('UPDATE diagrams SET last_access = ? WHERE key = ?', (time.time(), key))
+        svg, metadata = row
+        return Svg(zlib.decompress(svg).decode(), zlib.decompress(metadata).decode() if metadata is not None else None)
+
+    def _put(self, key: str, diagram: Svg):
+        svg = zlib.compress(diagram.svg.encode())
+        metadata = zlib.compress(diagram.metadata.encode()) if diagram.metadata is not None else None
+        size = len(svg) + (len(metadata) if metadata is not None else 0)
+        if size > self.max_size:
+            return
+        with self._transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO diagrams (key, svg, metadata, size, last_access) VALUES (?, ?, ?, ?, ?)',
+                               (key, svg, metadata, size, time.time()))
+            total_size = connection.execute('SELECT COALESCE(SUM(size), 0) FROM diagrams').fetchone()[0]
+            if total_size > self.max_size:
+                # evicted down to 90% of the maximum size, so that the next insertions do not evict again
+                excess = total_size - int(self.max_size * 0.9)
+                evicted = []
+                for evicted_key, evicted_size in connection.execute('SELECT key, size FROM diagrams ORDER BY last_access'):
+                    if excess <= 0:
+                        break
+                    evicted.append((evicted_key,))
+                    excess -= evicted_size
+                connection.executemany('DELETE FROM diagrams WHERE key = ?', evicted)
+
+    def _get_or_render(self, network: Network, kind: str, arguments: dict, checksum: str, render) -> Svg:
+        profiler = get_profiler()
+        key = self._get_key(network, kind, arguments, checksum)
+        with profiler.measure('diagram_cache', f'{kind}_lookup'):
+            diagram = self._get(key)
+        if diagram is not None:
+            self.hits += 1
+            return diagram
+        self.misses += 1
+        diagram = render()
+        with profiler.measure('diagram_cache', f'{kind}_store'):
+            self._put(key, diagram)
+        return diagram
+
+    def get_single_line_diagram(self, network: Network, container_id: str, parameters: SldParameters = None, checksum: str = None) -> Svg:
+        """
+        Returns the SLD of a voltage level or a substation, as network.get_single_line_diagram, from the cache when available.
+        The checksum of the network's working variant (see get_network_checksum) is computed when not given.
+        """
+        return self._get_or_render(network, 'sld', {'container_id': container_id, 'parameters': parameters}, checksum,
+                                   lambda: network.get_single_line_diagram(container_id, parameters))
+
+    def get_network_area_diagram(self, network: Network, voltage_level_ids: Union[str, list] = None, depth: int = 0,
+                                 high_nominal_voltage_bound: float = -1, low_nominal_voltage_bound: float = -1,
+                                 nad_parameters: NadParameters = None, fixed_positions: pd.DataFrame = None, nad_profile=None,
+                                 checksum: str = None) -> Svg:
+        """
+        Returns a NAD, as network.get_network_area_diagram, from the cache when available.
+        The checksum of the network's working variant (see get_network_checksum) is computed when not given.
+        """
+        arguments = {'voltage_level_ids': voltage_level_ids, 'depth': depth, 'high_nominal_voltage_bound': high_nominal_voltage_bound,
+                     'low_nominal_voltage_bound': low_nominal_voltage_bound, 'nad_parameters': nad_parameters,
+                     'fixed_positions': fixed_positions, 'nad_profile': nad_profile}
+        return self._get_or_render(network, 'nad', arguments, checksum, lambda: network.get_network_area_diagram(**arguments))
+
+    def get_stats(self) -> dict:
+        """
+        Returns the number of cached diagrams, their total (compressed) size in bytes, and this instance's hits and misses counts.
+        """
+        with self._transaction() as connection:
+            count, size = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM diagrams').fetchone()
+        return {'diagrams': count, 'size': size, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """
+        Removes all the cached diagrams, for all the sessions.
+        """
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM diagrams')
+
+class _Transaction:
+    # an immediate transaction: the writers are serialized from its start, so that the eviction sees a consistent total size
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection.execute('ROLLBACK' if exc_type is not None else 'COMMIT')
@@ -0,0 +1,103 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Coalescing of bursts of widget events: only the latest action submitted for a given key,
+within the configured time window, is actually executed.
+"""
+
+import asyncio
+from typing import Callable, Dict
+
+class EventCoalescer:
+    """
+    Debounces the actions triggered by high-frequency widget events (e.g., nodes dragging, selection changes, sliders).
+
+    Actions are submitted with a key: when a new action is submitted for a key whose previous action is still
+    pending, the previous action is dropped and the time window restarts. Actions submitted with different keys
+    do not interfere with each other.
+
+    Args:
+        window: the coalescing time window, in seconds. 0 (or a negative value) disables the coalescing: actions are run immediately.
+
+    Examples:
+
+        .. code-block:: python
+
+            coalescer = EventCoalescer(window=0.2)
+            network_explorer(network, event_coalescer=coalescer)
+            ...
+            coalescer.get_dropped_events()
+    """
+
+    def __init__(self, window: float = 0.1):
+        self.window = window
+        self._pending: Dict[str, asyncio.TimerHandle] = {}
+        self._actions: Dict[str, Callable[[], None]] = {}
+        self._dropped: Dict[str, int] = {}
+
+    def submit(self, key: str, action: Callable[[], None]):
+        if self.window <= 0:
+            action()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop running (e.g., outside a jupyter kernel): nothing to coalesce with
+            action()
+            return
+
+        handle = self._pending.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+            self._dropped[key] = self._dropped.get(key, 0) + 1
+        self._actions[key] = action
+        self._pending[key] = loop.call_later(self.window, self._run, key)
+
+    def _run(self, key: str):
+        self._pending.pop(key, None)
+        action = self._actions.pop(key, None)
+        if action is not None:
+            action()
+
+    def flush(self, key: str = None):
+        """
+        Runs immediately the pending actions (all of them, or only the one for the given key).
+        """
+        keys = list(self._pending.keys()) if key is None else [key]
+        for k in keys:
+            handle = self._pending.get(k)
+            if handle is not None:
+                handle.cancel()
+                self._run(k)
+
+    def cancel(self, key: str = None):
+        """
+        Drops the pending actions (all of them, or only the one for the given key), without running them.
+        """
+        keys = list(self._pending.keys()) if key is None else [key]
+        for k in keys:
+            handle = self._pending.pop(k, None)
+            if handle is not None:
+                handle.cancel()
+                self._actions.pop(k, None)
+                self._dropped[k] = self._dropped.get(k, 0) + 1
+
+    def has_pending(self, key: str = None) -> bool:
+        return len(self._pending) > 0 if key is None else key in self._pending
+
+    def get_dropped_events(self, key: str = None) -> int:
+        """
+        Returns the number of events dropped so far (all of them, or only those for the given key).
+        """
+        return sum(self._dropped.values()) if key is None else self._dropped.get(key, 0)
+
+    def get_dropped_events_by_key(self) -> Dict[str, int]:
+        return dict(self._dropped)
+
+    def reset_stats(self):
+        self._dropped.clear()
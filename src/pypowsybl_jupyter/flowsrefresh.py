@@ -0,0 +1,249 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Refresh of the values displayed by already rendered diagrams (NAD branch labels and bus legends, SLD feeder infos,
+map lines flows), e.g., after a load flow: the diagrams are updated in place, from their metadata and the network's
+terminal values, instead of being generated and rendered again.
+"""
+
+import asyncio
+import json
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pypowsybl.loadflow as lf
+from pypowsybl.network import Network
+
+from .scheduler import NetworkScheduler, Priority
+
+# network getter -> the sides of its equipments' terminals ('' for injections)
+_TERMINAL_TABLES = {
+    'get_lines': ['ONE', 'TWO'],
+    'get_2_windings_transformers': ['ONE', 'TWO'],
+    'get_3_windings_transformers': ['ONE', 'TWO', 'THREE'],
+    'get_generators': [''],
+    'get_loads': [''],
+    'get_batteries': [''],
+    'get_shunt_compensators': [''],
+    'get_static_var_compensators': [''],
+    'get_dangling_lines': [''],
+    'get_lcc_converter_stations': [''],
+    'get_vsc_converter_stations': [''],
+}
+
+_SIDE_SUFFIXES = {'': '', 'ONE': '1', 'TWO': '2', 'THREE': '3'}
+
+TERMINAL_VALUES_COLUMNS = ['p', 'q', 'i', 'connected']
+
+# NAD edge info type -> terminal value
+_NAD_INFO_TYPES = {'ActivePower': 'p', 'ReactivePower': 'q', 'Current': 'i'}
+
+# SLD feeder info component type -> (terminal value, svg parameters precision, svg parameters unit)
+_SLD_FEEDER_INFO_TYPES = {
+    'ARROW_ACTIVE': ('p', 'powerValuePrecision', 'activePowerUnit'),
+    'ARROW_REACTIVE': ('q', 'powerValuePrecision', 'reactivePowerUnit'),
+    'ARROW_CURRENT': ('i', 'currentValuePrecision', 'currentUnit'),
+}
+
+def _index_by_side(frame: pd.DataFrame, ids, side: str) -> pd.DataFrame:
+    return frame.set_index(pd.MultiIndex.from_arrays([ids, [side] * len(frame)], names=['id', 'side']))
+
+def get_terminal_values(network: Network) -> pd.DataFrame:
+    """
+    Returns the p, q, i values and the connection status of the network's terminals, indexed by (equipment id, side),
+    the side being 'ONE', 'TWO' or 'THREE' for the branches and '' for the injections. The tie lines terminals are the
+    ones of their dangling lines, and the HVDC lines terminals the ones of their converter stations.
+    """
+    frames = []
+    injections = {}
+    for getter, sides in _TERMINAL_TABLES.items():
+        attributes = [column + _SIDE_SUFFIXES[side] for side in sides for column in TERMINAL_VALUES_COLUMNS]
+        table = getattr(network, getter)(attributes=attributes)
+        for side in sides:
+            frame = table[[column + _SIDE_SUFFIXES[side] for column in TERMINAL_VALUES_COLUMNS]]
+            frame.columns = TERMINAL_VALUES_COLUMNS
+            if side == '':
+                injections[getter] = frame
+            frames.append(_index_by_side(frame, table.index, side))
+
+    converter_stations = pd.concat([injections['get_lcc_converter_stations'], injections['get_vsc_converter_stations']])
+    for getter, terminals, columns in (('get_tie_lines', injections['get_dangling_lines'], ('dangling_line1_id', 'dangling_line2_id')),
+                                       ('get_hvdc_lines', converter_stations, ('converter_station1_id', 'converter_station2_id'))):
+        table = getattr(network, getter)(attributes=list(columns))
+        for side, column in zip(('ONE', 'TWO'), columns):
+            frames.append(_index_by_side(terminals.reindex(table[column].to_numpy()), table.index, side))
+    return pd.concat(frames)
+
+def get_bus_values(network: Network) -> pd.DataFrame:
+    """
+    Returns the voltage magnitude and angle of the network's buses (bus view), indexed by bus id.
+    """
+    return network.get_buses(attributes=['v_mag', 'v_angle'])
+
+def _to_json_value(value):
+    # NaN is not valid JSON: undefined values are displayed as empty labels
+    value = float(value)
+    return '' if math.isnan(value) else value
+
+def _lookup(terminal_values: pd.DataFrame, keys: List[Tuple[str, str]], value_columns: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns, for each (equipment id, side) key, the value of its column in value_columns ('p', 'q' or 'i'),
+    and its connection status (NaN for the unknown terminals).
+    """
+    if not keys:
+        return np.empty(0), np.empty(0, dtype=object)
+    values = terminal_values.reindex(pd.MultiIndex.from_tuples(keys, names=['id', 'side']))
+    rows = np.arange(len(keys))
+    columns = values.columns.get_indexer(value_columns)
+    return values.to_numpy(dtype=object)[rows, columns].astype(float), values['connected'].to_numpy(dtype=object)
+
+def get_nad_branch_states(nad_metadata: str, terminal_values: pd.DataFrame) -> List[dict]:
+    """
+    Returns the branch states (network-viewer's format) refreshing the edges labels and connection status of a NAD,
+    with the value type (active power, reactive power or current) already displayed by each edge side. The three windings
+    transformers edges, and the loops, are skipped.
+    """
+    metadata = json.loads(nad_metadata)
+    if not metadata.get('svgParameters', {}).get('edgeInfosIncluded', True):
+        return []
+    branch_ids = []
+    keys = []
+    value_columns = []
+    for edge in metadata.get('edges', []):
+        # the sides without label (e.g., without value when the diagram was generated) get an active power label, as in the NAD viewer
+        info_types = [_NAD_INFO_TYPES.get((edge.get(info) or {}).get('infoTypeB', 'ActivePower')) for info in ('edgeInfo1', 'edgeInfo2')]
+        if edge['type'].startswith('ThreeWt') or edge['node1'] == edge['node2'] or None in info_types:
+            continue
+        branch_ids.append(edge['equipmentId'])
+        keys.extend([(edge['equipmentId'], 'ONE'), (edge['equipmentId'], 'TWO')])
+        value_columns.extend(info_types)
+    values, connected = _lookup(terminal_values, keys, value_columns)
+    return [{'branchId': branch_id, 'value1': _to_json_value(value1), 'value2': _to_json_value(value2),
+             'connected1': bool(connected1), 'connected2': bool(connected2)}
+            for branch_id, value1, value2, connected1, connected2
+            in zip(branch_ids, values[0::2], values[1::2], connected[0::2], connected[1::2])
+            if not (pd.isna(connected1) or pd.isna(connected2))]
+
+def get_nad_voltage_level_states(nad_metadata: str, bus_values: pd.DataFrame) -> List[dict]:
+    """
+    Returns the voltage level states (network-viewer's format) refreshing the buses voltage and angle legends of a NAD.
+    The buses without values are skipped.
+    """
+    metadata = json.loads(nad_metadata)
+    valid_buses = bus_values.dropna()
+    buses = dict(zip(valid_buses.index, zip(valid_buses['v_mag'].tolist(), valid_buses['v_angle'].tolist())))
+    bus_values_by_vl_node = {}
+    for bus_node in metadata.get('busNodes', []):
+        bus_id = bus_node['equipmentId']
+        if bus_id in buses:
+            v_mag, v_angle = buses[bus_id]
+            bus_values_by_vl_node.setdefault(bus_node['vlNode'], []).append({'busId': bus_id, 'voltage': v_mag, 'angle': v_angle})
+    return [{'voltageLevelId': text_node['equipmentId'], 'busValue': bus_values_by_vl_node[text_node['vlNode']]}
+            for text_node in metadata.get('textNodes', []) if text_node['vlNode'] in bus_values_by_vl_node]
+
+def get_sld_feeder_values(sld_metadata: str, terminal_values: pd.DataFrame) -> List[dict]:
+    """
+    Returns the labels and arrows directions of an SLD's feeder infos (active power, reactive power and current arrows),
+    formatted as the SLD does with its default language: [{'id': svg id, 'label': str, 'direction': 'IN', 'OUT' or None}].
+    """
+    metadata = json.loads(sld_metadata)
+    svg_params = metadata.get('svgParams', {})
+    feeder_infos = [feeder_info for feeder_info in metadata.get('feederInfos', []) if feeder_info['componentType'] in _SLD_FEEDER_INFO_TYPES]
+    values, _ = _lookup(terminal_values, [(feeder_info['equipmentId'], feeder_info.get('side') or '') for feeder_info in feeder_infos],
+                        [_SLD_FEEDER_INFO_TYPES[feeder_info['componentType']][0] for feeder_info in feeder_infos])
+    feeder_values = []
+    for feeder_info, value in zip(feeder_infos, values):
+        _, precision, unit = _SLD_FEEDER_INFO_TYPES[feeder_info['componentType']]
+        if math.isnan(value):
+            label, direction = svg_params.get('undefinedValueSymbol', ''), None
+        else:
+            # the SLD's default ('en') number format
+            label = f'{value:,.{svg_params.get(precision, 0)}f}'
+            if svg_params.get(unit):
+                label += ' ' + svg_params[unit]
+            direction = 'OUT' if value > 0 else 'IN'
+        feeder_values.append({'id': feeder_info['id'], 'label': label, 'direction': direction})
+    return feeder_values
+
+def get_map_branch_states(terminal_values: pd.DataFrame) -> List[dict]:
+    """
+    Returns the branch states refreshing the active power flows and connection status of a network map's lines and tie lines.
+    """
+    side1 = terminal_values.xs('ONE', level='side')
+    side2 = terminal_values.xs('TWO', level='side').reindex(side1.index)
+    valid = side1['connected'].notna() & side2['connected'].notna()
+    side1 = side1[valid]
+    side2 = side2[valid]
+    return [{'branchId': branch_id, 'value1': _to_json_value(p1), 'value2': _to_json_value(p2),
+             'connected1': bool(connected1), 'connected2': bool(connected2)}
+            for branch_id, p1, p2, connected1, connected2 in zip(side1.index, side1['p'], side2['p'], side1['connected'], side2['connected'])]
+
+class BackgroundLoadFlow:
+    """
+    Runs AC load flows on a worker thread, so that the notebook stays responsive during long computations
+    (pypowsybl releases the GIL while computing).
+
+    Args:
+        network: the network, whose working variant is updated by the load flows
+        parameters: the load flows parameters. None uses the default ones.
+        scheduler: when not None, the load flows (and their post-processing) run as write accesses of this network
+            scheduler, instead of on a dedicated worker thread: they wait for, and then block, the other accesses to the network.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, network: Network, parameters: lf.Parameters = None, scheduler: NetworkScheduler = None):
+        self.network = network
+        self.parameters = parameters
+        self.scheduler = scheduler
+        self._future: Future = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pypowsybl-jupyter-loadflow')
+            return cls._executor
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def run(self, on_done: Callable[[Future], None], post_process: Callable[[], Dict] = None) -> Future:
+        """
+        Starts a load flow. Once it ends, on_done is called with the future of the (load flow results, post_process result)
+        tuple; on_done is called from the running event loop (e.g., the jupyter kernel's), where the widgets can be updated,
+        or directly when there is no running event loop. post_process, if not None, is run on the worker thread, after the load flow.
+        """
+        if self.running:
+            raise RuntimeError('A load flow is already running')
+
+        def compute():
+            results = lf.run_ac(self.network, self.parameters)
+            return results, post_process() if post_process is not None else None
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self.scheduler is not None:
+            self._future = self.scheduler.submit_write(compute, priority=Priority.NORMAL)
+        else:
+            self._future = self._get_executor().submit(compute)
+        if loop is None:
+            # no event loop running (e.g., outside a jupyter kernel): nothing to keep responsive
+            wait([self._future])
+            on_done(self._future)
+        else:
+            self._future.add_done_callback(lambda future: loop.call_soon_threadsafe(on_done, future))
+        return self._future
@@ -0,0 +1,268 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Static HTML export of the explorers' diagrams: a single self-contained file, viewable in a browser without a Jupyter kernel.
+The diagrams, the map data, the hover data and the widgets' code are embedded as compressed chunks, that the page
+(see js/staticexport.ts) decodes only when they are viewed.
+"""
+
+import base64
+import gzip
+import html
+import json
+import pathlib
+from typing import Callable, Dict, List, Tuple, Union
+
+import pandas as pd
+from pypowsybl import PyPowsyblError
+from pypowsybl.network import Network, NadParameters, SldParameters, NadLayoutType
+
+from .batchexport import _RenderSld, _create_progress, _render_diagrams, ProgressType
+from .networksnapshot import get_network_snapshot
+from .util import _get_widget_state
+
+OnHoverFuncType = Callable[[str, str], str]
+
+_STATIC_PATH = pathlib.Path(__file__).parent / "static"
+
+WIDGETS_BUNDLES = {'sld': 'sldwidget', 'nad': 'nadwidget', 'map': 'networkmapwidget'}
+
+# hover types of the SLD components and NAD edges, when they differ from the types expected by the hovering functions
+SLD_HOVER_TYPES = {'BOUNDARY_LINE': 'DANGLING_LINE'}
+NAD_HOVER_TYPES = {
+    'LineEdge': 'LINE',
+    'TwoWtEdge': 'TWO_WINDINGS_TRANSFORMER',
+    'PstEdge': 'PHASE_SHIFT_TRANSFORMER',
+    'ThreeWtEdge': 'THREE_WINDINGS_TRANSFORMER',
+    'TieLineEdge': 'TIE_LINE',
+    'DanglingLineEdge': 'DANGLING_LINE',
+    'BoundaryLineEdge': 'DANGLING_LINE',
+    'HvdcLineLccEdge': 'HVDC_LINE',
+    'HvdcLineVscEdge': 'HVDC_LINE',
+}
+
+class _CachedNetworkTables:
+    """
+    Wraps a network so that its dataframes getters fetch each table only once, the rows requested
+    with an id filter being then selected from the cached table: the default hovering function
+    fetches the rows of the equipments one by one, for all the exported diagrams.
+    """
+
+    def __init__(self, network: Network):
+        self._network = network
+        self._tables = {}
+
+    def __getattr__(self, name):
+        attribute = getattr(self._network, name)
+        if not name.startswith('get_'):
+            return attribute
+
+        def get(*args, **kwargs):
+            if args or set(kwargs) - {'id'}:
+                return attribute(*args, **kwargs)
+            if name not in self._tables:
+                self._tables[name] = attribute()
+            table = self._tables[name]
+            if 'id' in kwargs:
+                ids = kwargs['id']
+                missing = [equipment_id for equipment_id in ids if equipment_id not in table.index]
+                if missing:
+                    raise PyPowsyblError(f'{missing} not found')
+                return table.loc[ids]
+            return table
+
+        return get
+
+class _ChunksWriter:
+    def __init__(self):
+        self.chunks: List[str] = []
+
+    def add(self, data: str) -> int:
+        self.chunks.append(base64.b64encode(gzip.compress(data.encode('utf-8'))).decode('ascii'))
+        return len(self.chunks) - 1
+
+    def add_json(self, data) -> int:
+        return self.add(json.dumps(data, default=float))
+
+class _HoverInfo:
+    """
+    Computes the hover information of the diagrams' equipments, once per equipment: an equipment is often displayed in several diagrams.
+    """
+
+    def __init__(self, hovering_function: OnHoverFuncType):
+        self.hovering_function = hovering_function
+        self._infos: Dict[Tuple[str, str], str] = {}
+
+    def get_info(self, equipment_id: str, equipment_type: str) -> str:
+        key = (equipment_id, equipment_type)
+        if key not in self._infos:
+            try:
+                self._infos[key] = self.hovering_function(equipment_id, equipment_type)
+            except Exception:
+                self._infos[key] = ''
+        return self._infos[key]
+
+    def get_infos(self, equipments: Dict[str, str]) -> Dict[str, str]:
+        infos = {}
+        if self.hovering_function is None:
+            return infos
+        for equipment_id, equipment_type in equipments.items():
+            info = self.get_info(equipment_id, equipment_type)
+            if info:
+                infos[equipment_id] = info
+        return infos
+
+def _get_sld_equipments(metadata: str) -> Dict[str, str]:
+    nodes = json.loads(metadata)['nodes'] if metadata else []
+    return {node['equipmentId']: SLD_HOVER_TYPES.get(node['componentType'], node['componentType'])
+            for node in nodes if node.get('equipmentId')}
+
+def _get_nad_equipments(metadata: str) -> Dict[str, str]:
+    edges = json.loads(metadata)['edges'] if metadata else []
+    return {edge['equipmentId']: NAD_HOVER_TYPES[edge['type']] for edge in edges if edge.get('equipmentId') and edge['type'] in NAD_HOVER_TYPES}
+
+def _get_map_state(network: Network, use_name: bool, use_line_geodata: bool) -> dict:
+    from .networkmapwidget import NetworkMapWidget
+
+    map_widget = NetworkMapWidget(network, use_name=use_name, use_line_geodata=use_line_geodata)
+    state = _get_widget_state(map_widget)
+    map_widget.close()
+    return state
+
+def _read_static(name: str) -> str:
+    path = _STATIC_PATH / name
+    if not path.exists():
+        raise ValueError(f'{path} does not exist: the frontend code must be built first (npm run build).')
+    return path.read_text(encoding='utf-8')
+
+def _escape_script(text: str) -> str:
+    # an inline script ends at the first '</script' sequence
+    return text.replace('</script', '<\\/script')
+
+def export_explorer_html(network: Network, output: Union[str, pathlib.Path], voltage_level_ids: List[str] = None, vl_id: str = None,
+                         use_name: bool = True, depth: int = 1, nad_voltage_level_ids: List[str] = None, display_nad: bool = True,
+                         display_map: bool = True, nad_parameters: NadParameters = None, sld_parameters: SldParameters = None,
+                         use_line_geodata: bool = False, on_hover: bool = True, on_hover_func: OnHoverFuncType = None,
+                         title: str = None, max_workers: int = None, progress: ProgressType = True):
+    """
+    Exports the network's diagrams to a self-contained HTML file, to be shared with people without a Jupyter kernel.
+    The page displays, like the network explorer, a NAD, the SLDs of the exported voltage levels and the network map,
+    with pan, zoom, hovering, and navigation between the diagrams (voltage levels list, NAD nodes, SLD arrows, map substations).
+
+    The diagrams are rendered during the export, compressed and embedded in the file; the page decodes a diagram only
+    when it is displayed, so that it opens fast even when it embeds thousands of diagrams.
+
+    Args:
+        network: the input network
+        output: the HTML file path
+        voltage_level_ids: the voltage levels whose SLD is exported. None exports the SLDs of all the network's voltage levels.
+        vl_id: the voltage level initially displayed. If None, the first of voltage_level_ids.
+        use_name: when available, display VLs names instead of their ids (default is to use names)
+        depth: the NAD depth around nad_voltage_level_ids
+        nad_voltage_level_ids: the voltage levels at the center of the NAD. If None, vl_id.
+        display_nad: when False, no NAD is exported
+        display_map: when False, the network map is not exported
+        nad_parameters: layout properties to adjust the svg rendering for the NAD
+        sld_parameters: layout properties to adjust the svg rendering for the SLDs
+        use_line_geodata: When False (default) the network map does not use the network's line geodata extensions; Each line is drawn as a straight line connecting two substations.
+        on_hover: when True, the hover information of the diagrams' equipments is exported too
+        on_hover_func: the function computing the hover information, as in network_explorer. None displays all the attributes available in the equipment's dataframe.
+        title: the page title. None uses the network's name.
+        max_workers: the number of worker processes rendering the SLDs (see export_slds). None uses the number of CPUs.
+        progress: True (default) displays a progress bar of the SLDs rendering; a function is called with the number of rendered SLDs and their total; False disables the progress reporting.
+
+    Examples:
+
+        .. code-block:: python
+
+            export_explorer_html(network, 'network.html', voltage_level_ids=['VL1', 'VL2', 'VL3'])
+    """
+    from .networkexplorer import get_hovering_equipment_info
+
+    output = pathlib.Path(output)
+    vls = get_network_snapshot(network).get_voltage_levels()
+    sld_vl_ids = list(voltage_level_ids) if voltage_level_ids is not None else list(vls.index)
+    if vl_id is None and len(sld_vl_ids) > 0:
+        vl_id = sld_vl_ids[0]
+
+    hovering_function = None
+    if on_hover:
+        if on_hover_func is not None:
+            hovering_function = on_hover_func
+        else:
+            tables = _CachedNetworkTables(network)
+            hovering_function = lambda equipment_id, equipment_type: get_hovering_equipment_info(tables, equipment_id, equipment_type)
+    hover_info = _HoverInfo(hovering_function)
+
+    chunks = _ChunksWriter()
+    widgets = {}
+    def add_widget(name):
+        bundle = WIDGETS_BUNDLES[name]
+        widgets[name] = {'esm': chunks.add(_read_static(bundle + '.js')), 'css': chunks.add(_read_static(bundle + '.css'))}
+
+    add_widget('sld')
+    spars = sld_parameters if sld_parameters is not None else SldParameters(use_name=use_name, nodes_infos=True)
+    slds = {}
+    report_progress = _create_progress(progress, len(sld_vl_ids))
+    for name, svg, metadata, error in _render_diagrams(network, [(vl, vl) for vl in sld_vl_ids], _RenderSld(spars), max_workers):
+        if error is None:
+            slds[name] = chunks.add_json({'svg': svg, 'metadata': metadata, 'hover': hover_info.get_infos(_get_sld_equipments(metadata))})
+        report_progress(len(slds), len(sld_vl_ids))
+
+    nad = None
+    nad_vl_ids = nad_voltage_level_ids if nad_voltage_level_ids is not None else ([vl_id] if vl_id is not None else None)
+    if display_nad and nad_vl_ids is not None:
+        add_widget('nad')
+        npars = nad_parameters if nad_parameters is not None else NadParameters(edge_name_displayed=False,
+            id_displayed=not use_name,
+            edge_info_along_edge=True,
+            power_value_precision=1,
+            angle_value_precision=0,
+            current_value_precision=1,
+            voltage_value_precision=0,
+            bus_legend=True,
+            substation_description_displayed=True,
+            layout_type=NadLayoutType.FORCE_LAYOUT
+            )
+        nad_svg = network.get_network_area_diagram(voltage_level_ids=nad_vl_ids, depth=depth, nad_parameters=npars)
+        nad = chunks.add_json({'svg': nad_svg._content, 'metadata': nad_svg._metadata,
+                               'hover': hover_info.get_infos(_get_nad_equipments(nad_svg._metadata))})
+
+    map_chunk = None
+    map_hover = None
+    if display_map:
+        add_widget('map')
+        map_state = _get_map_state(network, use_name, use_line_geodata)
+        map_state['hover_enabled'] = hovering_function is not None
+        map_chunk = chunks.add_json(map_state)
+        if hovering_function is not None:
+            lines_ids = [line['id'] for line in json.loads(map_state['lmap'])]
+            map_hover = chunks.add_json(hover_info.get_infos({line_id: 'LINE' for line_id in lines_ids}))
+
+    names = vls['name'] if use_name else pd.Series(dtype=str)
+    manifest = {
+        'title': title if title is not None else network.name or network.id,
+        'vls': [[vl, names.get(vl) or vl] for vl in sld_vl_ids if vl in slds],
+        'vl_id': vl_id,
+        'slds': slds,
+        'nad': nad,
+        'map': map_chunk,
+        'map_hover': map_hover,
+        'hover_enabled': hovering_function is not None,
+        'widgets': widgets,
+    }
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        file.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n')
+        file.write(f'<title>{html.escape(manifest["title"])}</title>\n')
+        file.write(f'<style>\n{_read_static("staticexport.css")}\n</style>\n</head>\n<body>\n<div id="pj-root"></div>\n')
+        file.write(f'<script type="application/json" id="pj-manifest">{_escape_script(json.dumps(manifest))}</script>\n')
+        for index, chunk in enumerate(chunks.chunks):
+            file.write(f'<script type="application/octet-stream" id="pj-chunk-{index}">{chunk}</script>\n')
+        file.write(f'<script type="module">\n{_escape_script(_read_static("staticexport.js"))}\n</script>\n</body>\n</html>\n')
@@ -0,0 +1,119 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Hierarchical clustering of the network map's substations, displayed instead of the substations and lines at the low
+zoom levels: the substations are grouped by the cells of a grid of the Web Mercator projection whose cells have a
+constant size on screen, and the lines between two clusters are aggregated into a bundle. A cell of a zoom level is
+split into four cells at the next zoom level, so that each cluster is the union of clusters of the next zoom level.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+#: the size, in screen pixels, of the grid cells grouping the substations
+CLUSTER_CELL_SIZE = 64
+
+# the size, in pixels, of the map of the world at zoom level 0
+_WORLD_SIZE = 256
+
+# the Web Mercator projection's latitude bounds
+_MAX_LATITUDE = 85.05112878
+
+def _to_web_mercator(latitudes: np.ndarray, longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # the coordinates in the projected world, in [0, 1)
+    latitudes = np.radians(np.clip(latitudes, -_MAX_LATITUDE, _MAX_LATITUDE))
+    x = (longitudes + 180) / 360
+    y = (1 - np.log(np.tan(latitudes) + 1 / np.cos(latitudes)) / np.pi) / 2
+    upper_bound = np.nextafter(1, 0)
+    return np.clip(x, 0, upper_bound), np.clip(y, 0, upper_bound)
+
+def _get_cells(x: np.ndarray, y: np.ndarray, zoom: int, cell_size: int) -> np.ndarray:
+    # the cell of each position, as a single integer key
+    cells_count = _WORLD_SIZE * 2 ** zoom / cell_size
+    return (np.floor(x * cells_count).astype(np.int64) << 32) | np.floor(y * cells_count).astype(np.int64)
+
+def build_map_clusters(substations: pd.DataFrame, branches: pd.DataFrame, zoom_threshold: int,
+                       cell_size: int = CLUSTER_CELL_SIZE) -> List[dict]:
+    """
+    Clusters the substations, and bundles the branches between the clusters, for each zoom level below zoom_threshold.
+
+    Args:
+        substations: the substations, indexed by id, with name, latitude, longitude and nominal_v (their highest nominal voltage) columns
+        branches: the branches (lines, tie lines, HVDC lines), with substation1_id, substation2_id, p1 and connected columns
+        zoom_threshold: the zoom level from which the substations are displayed instead of the clusters
+        cell_size: the size, in screen pixels, of the grid cells grouping the substations
+
+    Returns:
+        for each zoom level (from 0), a dict with the zoom, the clusters (id, name, lat, lon, count of substations, nominalV)
+        and the bundles (id, name, cluster1, cluster2, count of branches, connected count, p, the sum of the branches'
+        active power flows from cluster1 to cluster2)
+    """
+    levels = []
+    if substations.empty or zoom_threshold <= 0:
+        return levels
+    latitudes = substations['latitude'].to_numpy(dtype=float)
+    longitudes = substations['longitude'].to_numpy(dtype=float)
+    nominal_voltages = substations['nominal_v'].to_numpy(dtype=float)
+    names = substations['name'].fillna('').to_numpy(dtype=object)
+    x, y = _to_web_mercator(latitudes, longitudes)
+
+    substation1 = substations.index.get_indexer(branches['substation1_id'])
+    substation2 = substations.index.get_indexer(branches['substation2_id'])
+    with_positions = (substation1 >= 0) & (substation2 >= 0)
+    substation1 = substation1[with_positions]
+    substation2 = substation2[with_positions]
+    flows = np.nan_to_num(branches['p1'].to_numpy(dtype=float)[with_positions])
+    connected = branches['connected'].to_numpy(dtype=bool)[with_positions]
+
+    # the cells of the deepest zoom level: the cells of a zoom level are the halved coordinates of the next one's
+    cells = _get_cells(x, y, zoom_threshold - 1, cell_size)
+    for zoom in range(zoom_threshold - 1, -1, -1):
+        cell_keys, first_substations, clusters, counts = np.unique(cells, return_index=True, return_inverse=True, return_counts=True)
+        clusters_count = len(cell_keys)
+        cluster_ids = np.char.add(f'cluster-{zoom}-', np.arange(clusters_count).astype(str))
+        cluster_nominal_voltages = np.full(clusters_count, -np.inf)
+        np.maximum.at(cluster_nominal_voltages, clusters, nominal_voltages)
+        clusters_df = pd.DataFrame({
+            'id': cluster_ids,
+            # a cluster of a single substation is named after it
+            'name': np.where(counts == 1, names[first_substations], np.char.add(counts.astype(str), ' substations')),
+            'lat': np.bincount(clusters, weights=latitudes) / counts,
+            'lon': np.bincount(clusters, weights=longitudes) / counts,
+            'count': counts,
+            'nominalV': cluster_nominal_voltages,
+        })
+
+        cluster1 = clusters[substation1]
+        cluster2 = clusters[substation2]
+        between_clusters = cluster1 != cluster2
+        cluster1 = cluster1[between_clusters]
+        cluster2 = cluster2[between_clusters]
+        # the bundles are not oriented: the flows are counted from the lower to the higher cluster index
+        swapped = cluster1 > cluster2
+        lower = np.where(swapped, cluster2, cluster1)
+        higher = np.where(swapped, cluster1, cluster2)
+        oriented_flows = np.where(swapped, -flows[between_clusters], flows[between_clusters])
+        bundle_keys, bundles = np.unique(lower.astype(np.int64) * clusters_count + higher, return_inverse=True)
+        bundles_count = len(bundle_keys)
+        bundle_sizes = np.bincount(bundles, minlength=bundles_count)
+        bundles_df = pd.DataFrame({
+            'id': np.char.add(f'bundle-{zoom}-', np.arange(bundles_count).astype(str)),
+            'name': np.where(bundle_sizes == 1, '1 line', np.char.add(bundle_sizes.astype(str), ' lines')),
+            'cluster1': cluster_ids[bundle_keys // clusters_count],
+            'cluster2': cluster_ids[bundle_keys % clusters_count],
+            'count': bundle_sizes,
+            'connected': np.bincount(bundles, weights=connected[between_clusters], minlength=bundles_count).astype(int),
+            'p': np.bincount(bundles, weights=oriented_flows, minlength=bundles_count),
+        })
+
+        levels.append({'zoom': zoom, 'clusters': clusters_df.to_dict(orient='records'), 'bundles': bundles_df.to_dict(orient='records')})
+        cells = ((cells >> 33) << 32) | ((cells & 0xFFFFFFFF) >> 1)
+    levels.reverse()
+    return levels
@@ -0,0 +1,276 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Spatial index of the network map's substations and lines, answering the rectangle, polygon (lasso) and radius queries,
+and the nearest substations queries, without scanning all the equipments: the positions are projected on a local plane
+(in km) and bucketed in a uniform grid, whose cells are stored contiguously (sorted by cell); a query only tests the
+equipments of the cells it overlaps. The lines are split into pieces no longer than a cell, bucketed by their middle.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# the length of a degree of latitude, in km
+_KM_PER_DEGREE = 6371.0088 * np.pi / 180
+
+class _GridIndex:
+    # a uniform grid of planar points: the points of a cell are contiguous in the points sorted by cell
+    def __init__(self, x: np.ndarray, y: np.ndarray, cell_size: float):
+        self.cell_size = cell_size
+        self.x0 = x.min() if len(x) > 0 else 0.0
+        self.y0 = y.min() if len(y) > 0 else 0.0
+        cells_x = ((x - self.x0) // cell_size).astype(np.int64)
+        cells_y = ((y - self.y0) // cell_size).astype(np.int64)
+        self.columns_count = int(cells_x.max()) + 1 if len(x) > 0 else 0
+        self.rows_count = int(cells_y.max()) + 1 if len(y) > 0 else 0
+        keys = cells_x * self.rows_count + cells_y
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+
+    def query(self, x_min: float, y_min: float, x_max: float, y_max: float) -> np.ndarray:
+        # the points of the cells overlapping the box: a superset of the points in the box
+        column_min = max(int((x_min - self.x0) // self.cell_size), 0)
+        column_max = min(int((x_max - self.x0) // self.cell_size), self.columns_count - 1)
+        row_min = max(int((y_min - self.y0) // self.cell_size), 0)
+        row_max = min(int((y_max - self.y0) // self.cell_size), self.rows_count - 1)
+        if column_min > column_max or row_min > row_max:
+            return np.empty(0, dtype=np.int64)
+        # one contiguous range of sorted points per column
+        columns = np.arange(column_min, column_max + 1, dtype=np.int64) * self.rows_count
+        starts = np.searchsorted(self._keys, columns + row_min, side='left')
+        lengths = np.searchsorted(self._keys, columns + row_max, side='right') - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(lengths.sum()) - np.repeat(offsets, lengths) + np.repeat(starts, lengths)
+        return self._order[positions]
+
+def _points_in_polygon(x: np.ndarray, y: np.ndarray, polygon_x: np.ndarray, polygon_y: np.ndarray) -> np.ndarray:
+    # ray casting, vectorized over the points
+    inside = np.zeros(len(x), dtype=bool)
+    previous_x, previous_y = polygon_x[-1], polygon_y[-1]
+    for vertex_x, vertex_y in zip(polygon_x, polygon_y):
+        crossing = (vertex_y > y) != (previous_y > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = (previous_x - vertex_x) * (y - vertex_y) / (previous_y - vertex_y) + vertex_x
+        inside ^= crossing & (x < crossing_x)
+        previous_x, previous_y = vertex_x, vertex_y
+    return inside
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> np.ndarray:
+    # whether the segments [a, b] and [c, d] intersect, vectorized over the segments
+    def orientation(px, py, qx, qy, rx, ry):
+        return np.sign((qx - px) * (ry - py) - (qy - py) * (rx - px))
+    return ((orientation(ax, ay, bx, by, cx, cy) != orientation(ax, ay, bx, by, dx, dy))
+            & (orientation(cx, cy, dx, dy, ax, ay) != orientation(cx, cy, dx, dy, bx, by)))
+
+def _segments_in_box(ax, ay, bx, by, x_min, y_min, x_max, y_max) -> np.ndarray:
+    # Liang-Barsky clipping, vectorized over the segments
+    dx = bx - ax
+    dy = by - ay
+    t_min = np.zeros(len(ax))
+    t_max = np.ones(len(ax))
+    inside = np.ones(len(ax), dtype=bool)
+    for p, q in ((-dx, ax - x_min), (dx, x_max - ax), (-dy, ay - y_min), (dy, y_max - ay)):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = q / p
+        inside &= ~((p == 0) & (q < 0))
+        t_min = np.where(p < 0, np.maximum(t_min, t), t_min)
+        t_max = np.where(p > 0, np.minimum(t_max, t), t_max)
+    return inside & (t_min <= t_max)
+
+def _segments_distances(ax, ay, bx, by, x, y) -> np.ndarray:
+    # the distances from the point (x, y) to the segments
+    dx = bx - ax
+    dy = by - ay
+    squared_lengths = dx * dx + dy * dy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(squared_lengths > 0, ((x - ax) * dx + (y - ay) * dy) / squared_lengths, 0)
+    t = np.clip(t, 0, 1)
+    return np.hypot(ax + t * dx - x, ay + t * dy - y)
+
+class MapSpatialIndex:
+    """
+    A spatial index of substations and lines positions, answering the map's region queries without scanning all the
+    equipments. The distances are computed on a local projection of the positions (equirectangular, centered on the
+    substations' mean latitude), accurate at the scale of a country.
+
+    Args:
+        substations: the substations positions, indexed by substation id, with latitude and longitude columns
+        lines: the lines paths, with id, latitude and longitude columns: the successive points of each line's path, from its first end to its second end (the points of a line are consecutive rows)
+        cell_size: the size, in km, of the grid cells. None sizes the cells for a few substations per cell.
+
+    Examples:
+
+        .. code-block:: python
+
+            index = map_widget.get_spatial_index()
+            index.query_radius(48.85, 2.35, 50)
+            index.get_nearest_substations(48.85, 2.35, count=3)
+    """
+
+    def __init__(self, substations: pd.DataFrame, lines: pd.DataFrame = None, cell_size: float = None):
+        self._substation_ids = substations.index.to_numpy(dtype=object)
+        latitudes = substations['latitude'].to_numpy(dtype=float)
+        longitudes = substations['longitude'].to_numpy(dtype=float)
+        self._reference_latitude = float(np.mean(latitudes)) if len(latitudes) > 0 else 0.0
+        self._x, self._y = self._project(latitudes, longitudes)
+        if cell_size is None:
+            cell_size = self._get_default_cell_size()
+        self.cell_size = cell_size
+        self._substations_grid = _GridIndex(self._x, self._y, cell_size)
+        self._build_lines_index(lines if lines is not None else pd.DataFrame(columns=['id', 'latitude', 'longitude']))
+
+    def _project(self, latitudes, longitudes) -> Tuple[np.ndarray, np.ndarray]:
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        return (longitudes * _KM_PER_DEGREE * np.cos(np.radians(self._reference_latitude)),
+                latitudes * _KM_PER_DEGREE)
+
+    def _get_default_cell_size(self) -> float:
+        # about 4 substations per occupied cell, for uniformly spread substations
+        count = len(self._x)
+        if count == 0:
+            return 1.0
+        width = np.ptp(self._x)
+        height = np.ptp(self._y)
+        if width > 0 and height > 0:
+            return max(2 * np.sqrt(width * height / count), 1e-3)
+        return max(width, height, 1.0) / max(np.sqrt(count), 1.0)
+
+    def _build_lines_index(self, lines: pd.DataFrame):
+        ids = lines['id'].to_numpy(dtype=object)
+        x, y = self._project(lines['latitude'].to_numpy(dtype=float), lines['longitude'].to_numpy(dtype=float))
+        self._line_ids, line_indices = np.unique(ids, return_inverse=True) if len(ids) > 0 else (np.empty(0, dtype=object), np.empty(0, dtype=np.int64))
+        # the segments between the successive points of a line's path
+        same_line = line_indices[:-1] == line_indices[1:]
+        segment_lines = line_indices[:-1][same_line]
+        start_x, start_y = x[:-1][same_line], y[:-1][same_line]
+        end_x, end_y = x[1:][same_line], y[1:][same_line]
+        # the segments are split into pieces no longer than a cell: a piece is within half a cell of its middle
+        pieces_counts = np.maximum(np.ceil(np.hypot(end_x - start_x, end_y - start_y) / self.cell_size), 1).astype(np.int64)
+        segments = np.repeat(np.arange(len(segment_lines)), pieces_counts)
+        steps = np.arange(len(segments)) - np.repeat(np.cumsum(pieces_counts) - pieces_counts, pieces_counts)
+        t_start = steps / pieces_counts[segments]
+        t_end = (steps + 1) / pieces_counts[segments]
+        delta_x = (end_x - start_x)[segments]
+        delta_y = (end_y - start_y)[segments]
+        self._pieces_lines = segment_lines[segments]
+        self._pieces_ax = start_x[segments] + t_start * delta_x
+        self._pieces_ay = start_y[segments] + t_start * delta_y
+        self._pieces_bx = start_x[segments] + t_end * delta_x
+        self._pieces_by = start_y[segments] + t_end * delta_y
+        self._pieces_grid = _GridIndex((self._pieces_ax + self._pieces_bx) / 2, (self._pieces_ay + self._pieces_by) / 2, self.cell_size)
+
+    def _get_candidate_pieces(self, x_min, y_min, x_max, y_max) -> np.ndarray:
+        margin = self.cell_size / 2
+        return self._pieces_grid.query(x_min - margin, y_min - margin, x_max + margin, y_max + margin)
+
+    def _to_lines_ids(self, pieces: np.ndarray) -> List[str]:
+        return self._line_ids[np.unique(self._pieces_lines[pieces])].tolist()
+
+    def query_rectangle(self, south: float, west: float, north: float, east: float) -> dict:
+        """
+        Returns the ids of the substations inside a rectangle, and of the lines crossing it.
+
+        Args:
+            south: the rectangle's lowest latitude
+            west: the rectangle's lowest longitude
+            north: the rectangle's highest latitude
+            east: the rectangle's highest longitude
+
+        Returns:
+            a dict with the substations and lines ids lists
+        """
+        (x_min, x_max), (y_min, y_max) = self._project([south, north], [west, east])
+        candidates = self._substations_grid.query(x_min, y_min, x_max, y_max)
+        inside = ((self._x[candidates] >= x_min) & (self._x[candidates] <= x_max)
+                  & (self._y[candidates] >= y_min) & (self._y[candidates] <= y_max))
+        pieces = self._get_candidate_pieces(x_min, y_min, x_max, y_max)
+        crossing = _segments_in_box(self._pieces_ax[pieces], self._pieces_ay[pieces], self._pieces_bx[pieces], self._pieces_by[pieces],
+                                    x_min, y_min, x_max, y_max)
+        return {'substations': self._substation_ids[candidates[inside]].tolist(), 'lines': self._to_lines_ids(pieces[crossing])}
+
+    def query_polygon(self, coordinates: Sequence[Tuple[float, float]]) -> dict:
+        """
+        Returns the ids of the substations inside a polygon (e.g., a lasso selection), and of the lines crossing it.
+
+        Args:
+            coordinates: the polygon's vertices, as (latitude, longitude) pairs
+
+        Returns:
+            a dict with the substations and lines ids lists
+        """
+        vertices = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        if len(vertices) < 3:
+            return {'substations': [], 'lines': []}
+        polygon_x, polygon_y = self._project(vertices[:, 0], vertices[:, 1])
+        x_min, x_max, y_min, y_max = polygon_x.min(), polygon_x.max(), polygon_y.min(), polygon_y.max()
+        candidates = self._substations_grid.query(x_min, y_min, x_max, y_max)
+        inside = _points_in_polygon(self._x[candidates], self._y[candidates], polygon_x, polygon_y)
+
+        pieces = self._get_candidate_pieces(x_min, y_min, x_max, y_max)
+        ax, ay, bx, by = self._pieces_ax[pieces], self._pieces_ay[pieces], self._pieces_bx[pieces], self._pieces_by[pieces]
+        crossing = _points_in_polygon(ax, ay, polygon_x, polygon_y)
+        for i in range(len(polygon_x)):
+            crossing |= _segments_cross(ax, ay, bx, by, polygon_x[i - 1], polygon_y[i - 1], polygon_x[i], polygon_y[i])
+        return {'substations': self._substation_ids[candidates[inside]].tolist(), 'lines': self._to_lines_ids(pieces[crossing])}
+
+    def query_radius(self, latitude: float, longitude: float, radius: float) -> dict:
+        """
+        Returns the ids of the substations, sorted by distance, and of the lines, within a distance of a point.
+
+        Args:
+            latitude: the point's latitude
+            longitude: the point's longitude
+            radius: the distance, in km
+
+        Returns:
+            a dict with the substations and lines ids lists
+        """
+        x, y = self._project(latitude, longitude)
+        substations = self._get_substations_distances(x, y, radius)
+        pieces = self._get_candidate_pieces(x - radius, y - radius, x + radius, y + radius)
+        near = _segments_distances(self._pieces_ax[pieces], self._pieces_ay[pieces], self._pieces_bx[pieces], self._pieces_by[pieces], x, y) <= radius
+        return {'substations': substations.index.tolist(), 'lines': self._to_lines_ids(pieces[near])}
+
+    def _get_substations_distances(self, x, y, radius) -> pd.Series:
+        candidates = self._substations_grid.query(x - radius, y - radius, x + radius, y + radius)
+        distances = np.hypot(self._x[candidates] - x, self._y[candidates] - y)
+        near = distances <= radius
+        return pd.Series(distances[near], index=pd.Index(self._substation_ids[candidates[near]], name='id'),
+                         name='distance').sort_values(kind='stable')
+
+    def get_nearest_substations(self, latitude: float, longitude: float, count: int = 1, max_distance: float = None) -> pd.Series:
+        """
+        Returns the substations nearest to a point.
+
+        Args:
+            latitude: the point's latitude
+            longitude: the point's longitude
+            count: the number of substations
+            max_distance: when not None, the maximum distance, in km, of the substations
+
+        Returns:
+            the distances, in km, of the nearest substations (at most count), indexed by substation id, from the nearest
+        """
+        x, y = self._project(latitude, longitude)
+        count = min(count, len(self._x))
+        if count <= 0:
+            return self._get_substations_distances(x, y, -1.0)
+        # the search radius grows until it contains enough substations: the substations outside are farther.
+        # It is bounded by the distance to the farthest corner of the substations' bounding box
+        extent = np.hypot(max(abs(x - self._x.min()), abs(x - self._x.max())), max(abs(y - self._y.min()), abs(y - self._y.max())))
+        radius = self.cell_size
+        while True:
+            if max_distance is not None and radius >= max_distance:
+                return self._get_substations_distances(x, y, max_distance).iloc[:count]
+            distances = self._get_substations_distances(x, y, radius)
+            if len(distances) >= count or radius > extent:
+                return distances.iloc[:count]
+            radius *= 2
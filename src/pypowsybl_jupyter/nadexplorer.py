@@ -5,31 +5,88 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 
+from functools import partial
+
 import ipywidgets as widgets
 import pandas as pd
 from pandas import DataFrame
 from pypowsybl.network import Network, NadParameters
 
 from .nadwidget import display_nad, update_nad
+from .eventcoalescer import EventCoalescer
+from .profiler import get_profiler
+from .networksnapshot import get_network_snapshot
+from .vlgraph import get_voltage_level_graph, format_voltage_levels_counts
+from .overview import NetworkOverview
+from .scheduler import NetworkScheduler, get_network_scheduler
+from .diagramcache import DiagramCache, NetworkChecksum
+from .timeseries import TimeSeriesType, get_time_series_source, compute_branch_aggregates, to_branch_states
+
+def prepare_branch_states(time_series_data: pd.DataFrame, time_step):
+    """
+    Prepare branch states data for the selected time step.
+    This function extracts the branch data for the given time step and formats it
+    for the network-viewer API.
+    """
+    time_step_data = time_series_data[time_series_data['timestamp'] == time_step]
+    if 'branch_id' not in time_step_data:
+        print("Warning: 'branch_id' column not found")
+        return []
+
+    branch_states = to_branch_states(time_step_data)
+
+    if not branch_states:
+        print(f"Warning: No branch states found for time step {time_step}")
+
+    return branch_states
+
+def prepare_aggregate_branch_states(aggregates: pd.DataFrame, aggregate: str):
+    """
+    Prepare branch states data displaying one of the aggregates computed by compute_branch_aggregates on both sides of the branches
+    (the peak_timestamp aggregate is displayed as text).
+    """
+    # the branches without any value in the time series are skipped
+    values = aggregates.loc[aggregates['count'] > 0, aggregate]
+    if aggregate == 'peak_timestamp':
+        values = values.astype(str)
+    else:
+        values = values.astype(float)
+    return pd.DataFrame({
+        'branchId': values.index.to_numpy(dtype=object),
+        'value1': values.to_numpy(dtype=object),
+        'value2': values.to_numpy(dtype=object),
+        'connected1': True,
+        'connected2': True,
+    }).to_dict('records')
 
 def nad_explorer(network: Network, voltage_level_ids: list = None, depth: int = 1,
-                 time_series_data: pd.DataFrame = None, low_nominal_voltage_bound: float = -1,
+                 time_series_data: TimeSeriesType = None, low_nominal_voltage_bound: float = -1,
                  high_nominal_voltage_bound: float = -1, parameters: NadParameters = None,
-                 fixed_nad_positions: DataFrame = None):
+                 fixed_nad_positions: DataFrame = None, event_coalescer: EventCoalescer = None,
+                 overview_max_nodes: int = 100, overview_clustering: list = None,
+                 aggregates_percentile: float = 95, aggregates_threshold: float = None, scheduler: NetworkScheduler = None,
+                 diagram_cache: DiagramCache = None):
     """
     Creates a basic nad explorer widget for a network, built with the nad widget.
 
     Args:
         network: the input network
-        voltage_level_ids: the starting list of VL to display. None displays all the network's VLs
+        voltage_level_ids: the starting list of VL to display. None displays all the network's VLs or, when the network has more than overview_max_nodes VLs, an overview of the network
         depth: the diagram depth around the voltage level, controls the size of the sub network
-        time_series_data: a DataFrame containing time series data for the network.
+        time_series_data: time series data for the network: a DataFrame, the path of Parquet, Arrow IPC or Feather files (read out-of-core, requires pyarrow), a pyarrow dataset, or a TimeSeriesSource.
                          Must contain columns: 'timestamp', 'branch_id', 'value1', 'value2',
                          'connected1', 'connected2'
         low_nominal_voltage_bound: low bound to filter voltage level according to nominal voltage
         high_nominal_voltage_bound: high bound to filter voltage level according to nominal voltage
         parameters: layout properties to adjust the svg rendering for the nad
         fixed_nad_positions: positions dataframe to layout the voltage levels in the diagram
+        event_coalescer: coalesces the bursts of events (VLs selections, depth and time slider changes) so that only the latest one triggers a diagram update. None, the default, uses a coalescer with a 0.1s time window.
+        overview_max_nodes: the maximum number of nodes of the overview diagram, and the number of VLs above which the overview is displayed instead of the whole network (when voltage_level_ids is None)
+        overview_clustering: the attributes used to cluster the VLs in the overview, in order of preference: 'country', 'nominal_v', 'substation'. None, the default, uses them all in this order.
+        aggregates_percentile: the percentile of the branches loading displayed by the time series 'percentile' display mode
+        aggregates_threshold: when not None, enables the time series display mode showing, for each branch, the number of time steps where its loading is above this threshold
+        scheduler: the scheduler of the accesses to the network: the diagrams generations read the network, so that they never run concurrently with a write (e.g., a switching or a load flow of a network explorer). None, the default, uses the network's shared scheduler (get_network_scheduler).
+        diagram_cache: when not None, the NADs are fetched from this shared on-disk cache when already rendered, e.g., by another session displaying the same network, and stored in it otherwise.
 
     Examples:
 
@@ -38,20 +95,45 @@ def nad_explorer(network: Network, voltage_level_ids: list = None, depth: int =
             nad_explorer(pp.network.create_four_substations_node_breaker_network())
     """
 
-    vls = network.get_voltage_levels(attributes=[])
+    vls = get_network_snapshot(network).get_voltage_levels()
     nad_widget=None
 
-    selected_vl = list(vls.index) if voltage_level_ids  is None else voltage_level_ids
-    if len(selected_vl)==0:
+    coalescer = event_coalescer if event_coalescer is not None else EventCoalescer()
+
+    profiler = get_profiler()
+
+    network_scheduler = scheduler if scheduler is not None else get_network_scheduler(network)
+    network_checksum = NetworkChecksum(network, network_scheduler) if diagram_cache is not None else None
+
+    overview_enabled = voltage_level_ids is None and len(vls) > overview_max_nodes
+
+    selected_vl = ([] if overview_enabled else list(vls.index)) if voltage_level_ids  is None else voltage_level_ids
+    if len(selected_vl)==0 and not overview_enabled:
         raise ValueError("At least one VL must be selected in the voltage_level_ids list")
 
-    if time_series_data is not None:
-        time_steps = sorted(time_series_data['timestamp'].unique())
+    # the overviews, from the whole network's one to the currently displayed cluster's one, with their labels
+    overviews = []
+    overview_displayed = overview_enabled
+    cluster_label = None
+
+    time_series = get_time_series_source(time_series_data) if time_series_data is not None else None
+    if time_series is not None:
+        time_steps = list(time_series.time_steps)
         if len(time_steps) == 0:
             raise ValueError("time_series_data must contain at least one timestamp")
 
         selected_time_step = time_steps[0]
 
+        # the time series display modes: the selected time step, or an aggregate over all the time steps
+        display_modes = [('Time step', None), ('Max loading', 'max'), ('Mean loading', 'mean'),
+                         (f'P{aggregates_percentile:g} loading', f'p{aggregates_percentile:g}')]
+        if aggregates_threshold is not None:
+            display_modes.append((f'Time steps above {aggregates_threshold:g}', 'above_threshold'))
+        display_modes.append(('Peak loading time', 'peak_timestamp'))
+        selected_aggregate = None
+        # computed, in a single pass over the time series, when an aggregate is first displayed
+        aggregates = None
+
 
     selected_depth=depth
 
@@ -65,64 +147,128 @@ def nad_explorer(network: Network, voltage_level_ids: list = None, depth: int =
         bus_legend=True,
         substation_description_displayed=True)
 
-    def prepare_branch_states(time_step):
-        """
-        Prepare branch states data for the selected time step.
-        This function extracts the branch data for the given time step and formats it
-        for the network-viewer API.
-        """
-        time_step_data = time_series_data[time_series_data['timestamp'] == time_step]
-
-        branch_states = []
-        for _, row in time_step_data.iterrows():
-            if 'branch_id' not in row:
-                print(f"Warning: 'branch_id' not found in row: {row}")
-                continue
+    OVERVIEW_MENU_ITEMS = ['Expand']
 
-            branch_id = row['branch_id']
-
-            branch_state = {
-                'branchId': branch_id,
-                'value1': float(row.get('value1', 0)),
-                'value2': float(row.get('value2', 0)),
-                'connected1': bool(row.get('connected1', True)),
-                'connected2': bool(row.get('connected2', True)),
-            }
-            branch_states.append(branch_state)
-
-        if not branch_states:
-            print(f"Warning: No branch states found for time step {time_step}")
-
-        return branch_states
+    def display_diagram(diagram_data, popup_menu_items):
+        nonlocal nad_widget
+        if nad_widget == None:
+            nad_widget = display_nad(diagram_data, drag_enabled=True, popup_menu_items=popup_menu_items, event_coalescer=coalescer)
+            nad_widget.on_select_menu(lambda event : expand_cluster(event.selected_menu['equipment_id']))
+        else:
+            nad_widget.popup_menu_items = popup_menu_items
+            update_nad(nad_widget, diagram_data, drag_enabled=True)
 
     def update_diagram():
-        nonlocal nad_widget
+        if overview_displayed:
+            return
         if len(selected_vl) > 0:
-            new_diagram_data = network.get_network_area_diagram(voltage_level_ids=selected_vl, depth=selected_depth,
-                                                                high_nominal_voltage_bound=high_nominal_voltage_bound,
-                                                                low_nominal_voltage_bound=low_nominal_voltage_bound,
-                                                                nad_parameters=npars, fixed_positions=fixed_nad_positions)
-            if nad_widget == None:
-                nad_widget = display_nad(new_diagram_data, drag_enabled=True)
-            else:
-                update_nad(nad_widget, new_diagram_data, drag_enabled=True)
+            with profiler.measure('nad_explorer', 'nad_generation'), network_scheduler.reading():
+                render_nad = network.get_network_area_diagram if diagram_cache is None else partial(diagram_cache.get_network_area_diagram, network, checksum=network_checksum.get())
+                new_diagram_data = render_nad(voltage_level_ids=selected_vl, depth=selected_depth,
+                                              high_nominal_voltage_bound=high_nominal_voltage_bound,
+                                              low_nominal_voltage_bound=low_nominal_voltage_bound,
+                                              nad_parameters=npars, fixed_positions=fixed_nad_positions)
+            display_diagram(new_diagram_data, [])
 
             if time_series_data is not None:
-                branch_states = prepare_branch_states(selected_time_step)
-                if branch_states:
-                    nad_widget.set_branch_states(branch_states)
-
+                update_branch_states()
+
+    def display_overview():
+        nonlocal overview_displayed, cluster_label
+        overview_displayed = True
+        cluster_label = None
+        with profiler.measure('nad_explorer', 'overview_generation'):
+            diagram_data = overviews[-1][1].get_network_area_diagram()
+        display_diagram(diagram_data, OVERVIEW_MENU_ITEMS)
+        update_overview_controls()
+
+    def create_overview(vl_ids=None):
+        with profiler.measure('nad_explorer', 'overview_clustering'), network_scheduler.reading():
+            return NetworkOverview(network, vl_ids, overview_max_nodes, overview_clustering)
+
+    def expand_cluster(cluster_id):
+        nonlocal selected_vl, overview_displayed, cluster_label
+        overview = overviews[-1][1]
+        if not overview_displayed or not overview.is_cluster(cluster_id):
+            return
+        members = overview.get_members(cluster_id)
+        label = overview.get_label(cluster_id)
+        if len(members) > overview_max_nodes:
+            cluster_overview = create_overview(members)
+            # a cluster that cannot be split further is displayed in detail
+            if len(cluster_overview.members) > 1:
+                overviews.append((label, cluster_overview))
+                display_overview()
+                return
+        overview_displayed = False
+        cluster_label = label
+        selected_vl = members
+        select_found_vls(members)
+        update_depth_counts()
+        update_overview_controls()
+        update_diagram()
 
+    def back_to_overview(_):
+        nonlocal selected_vl
+        if overview_displayed and len(overviews) > 1:
+            overviews.pop()
+        selected_vl = []
+        select_found_vls([])
+        update_depth_counts()
+        display_overview()
+
+    overview_back_button = widgets.Button(description='Back to overview', icon='arrow-up',
+                                          layout=widgets.Layout(display='' if overview_enabled else 'none'))
+    overview_back_button.on_click(back_to_overview)
+    overview_path_label = widgets.Label()
+
+    def update_overview_controls():
+        labels = [label for label, _ in overviews]
+        if not overview_displayed and cluster_label is not None:
+            labels.append(cluster_label)
+        overview_path_label.value = ' > '.join(labels) if overview_enabled else ''
+        overview_back_button.disabled = overview_displayed and len(overviews) <= 1
+
+    def update_branch_states():
+        if overview_displayed:
+            return
+        if selected_aggregate is not None:
+            branch_states = prepare_aggregates_branch_states()
+        else:
+            with profiler.measure('nad_explorer', 'time_step_read'):
+                time_step_data = time_series.get_time_step(selected_time_step)
+            with profiler.measure('nad_explorer', 'prepare_branch_states'):
+                branch_states = prepare_branch_states(time_step_data, selected_time_step)
+        if branch_states:
+            nad_widget.set_branch_states(branch_states)
+
+
+    def prepare_aggregates_branch_states():
+        nonlocal aggregates
+        if aggregates is None:
+            with profiler.measure('nad_explorer', 'compute_aggregates'):
+                aggregates = compute_branch_aggregates(time_series, aggregates_percentile, aggregates_threshold)
+        with profiler.measure('nad_explorer', 'prepare_branch_states'):
+            return prepare_aggregate_branch_states(aggregates, selected_aggregate)
 
     nadslider = widgets.IntSlider(value=selected_depth, min=0, max=20, step=1, description='depth:', disabled=False, continuous_update=False, orientation='horizontal', readout=True, readout_format='d')
 
     def on_nadslider_changed(d):
         nonlocal selected_depth
         selected_depth=d['new']
-        update_diagram()
+        coalescer.submit('update_diagram', update_diagram)
 
     nadslider.observe(on_nadslider_changed, names='value')
 
+    depth_counts_label = widgets.Label()
+
+    def update_depth_counts():
+        if len(selected_vl) > 0:
+            counts = get_voltage_level_graph(network).get_voltage_levels_counts(list(selected_vl), nadslider.max)
+            depth_counts_label.value = format_voltage_levels_counts(counts)
+        else:
+            depth_counts_label.value = ''
+
     vl_input = widgets.Text(
         value='',
         placeholder='Voltage level ID',
@@ -148,10 +294,22 @@ def nad_explorer(network: Network, voltage_level_ids: list = None, depth: int =
     )
 
     def on_selected(d):
-        nonlocal selected_vl
+        nonlocal selected_vl, overview_displayed, cluster_label
         if d['new'] != None:
             selected_vl=d['new']
-            update_diagram()
+            update_depth_counts()
+            if overview_displayed and len(selected_vl) > 0:
+                overview_displayed = False
+                cluster_label = None
+                update_overview_controls()
+            coalescer.submit('update_diagram', update_diagram)
+
+    def select_found_vls(vl_ids):
+        found.unobserve(on_selected, names='value')
+        try:
+            found.value = [vl_id for vl_id in vl_ids if vl_id in found.options]
+        finally:
+            found.observe(on_selected, names='value')
 
     if time_series_data is not None :
         time_slider = widgets.SelectionSlider(
@@ -168,21 +326,37 @@ def nad_explorer(network: Network, voltage_level_ids: list = None, depth: int =
         def on_time_slider_changed(d):
             nonlocal selected_time_step
             selected_time_step = d['new']
-            branch_states = prepare_branch_states(selected_time_step)
-            if branch_states:
-                nad_widget.set_branch_states(branch_states)
+            coalescer.submit('time_slider', update_branch_states)
 
         time_slider.observe(on_time_slider_changed, names='value')
 
+        display_mode_dropdown = widgets.Dropdown(options=display_modes, value=None, description='display:')
+
+        def on_display_mode_changed(d):
+            nonlocal selected_aggregate
+            selected_aggregate = d['new']
+            time_slider.disabled = selected_aggregate is not None
+            coalescer.submit('time_slider', update_branch_states)
+
+        display_mode_dropdown.observe(on_display_mode_changed, names='value')
+
     found.observe(on_selected, names='value')
 
-    update_diagram()
+    update_depth_counts()
+    if overview_enabled:
+        overviews.append(('Overview', create_overview()))
+        display_overview()
+    else:
+        update_diagram()
 
     left_panel = widgets.VBox([widgets.Label('Voltage levels'), vl_input, found])
+    top_section = [widgets.HBox([nadslider, depth_counts_label])]
+    if overview_enabled:
+        top_section.append(widgets.HBox([overview_back_button, overview_path_label]))
     if time_series_data is not None:
-        right_panel = widgets.VBox([nadslider, time_slider, nad_widget])
+        right_panel = widgets.VBox(top_section + [widgets.HBox([time_slider, display_mode_dropdown]), nad_widget])
     else :
-        right_panel = widgets.VBox([nadslider, nad_widget])
+        right_panel = widgets.VBox(top_section + [nad_widget])
     hbox = widgets.HBox([left_panel, right_panel])
     hbox.layout.align_items='flex-end'
 
@@ -9,6 +9,7 @@
 Simple widget which enables to pan and zoom on a NAD's SVG
 """
 
+import asyncio
 import pathlib
 
 import anywidget
@@ -19,14 +20,17 @@ from ipywidgets import (
     CallbackDispatcher
 )
 
-from .util import _get_svg_string, _get_svg_metadata
-from typing import List, Callable
+from .util import _get_svg_string, _get_svg_metadata, _get_payload_size, _load_static_assets
+from .eventcoalescer import EventCoalescer
+from .profiler import get_profiler
+from .streaming import BranchStatesBatch, BranchStatesStream, start_branch_states_stream, BRANCH_STATES_ACK_EVENT
+from typing import AsyncIterable, List, Callable
 
 OnHoverFuncType = Callable[[str, str], str]
 
+_STATIC_PATH = pathlib.Path(__file__).parent / "static"
+
 class NadWidget(anywidget.AnyWidget):
-    _esm = pathlib.Path(__file__).parent / "static" / "nadwidget.js"
-    _css = pathlib.Path(__file__).parent / "static" / "nadwidget.css"
 
     diagram_data  = traitlets.Dict().tag(sync=True)
     selected_node = traitlets.Dict().tag(sync=True)
@@ -36,9 +40,14 @@ class NadWidget(anywidget.AnyWidget):
     current_nad_metadata = traitlets.Unicode().tag(sync=True)
     popup_menu_items = traitlets.List(trait=traitlets.Unicode(), default_value=[]).tag(sync=True)
     hover_enabled = traitlets.Bool().tag(sync=True)
+    hover_version = traitlets.Int(0).tag(sync=True)
     branch_states = traitlets.List().tag(sync=True)
+    voltage_level_states = traitlets.List().tag(sync=True)
+    invalid_lf = traitlets.Bool(False).tag(sync=True)
+    profiling_enabled = traitlets.Bool().tag(sync=True)
 
-    def __init__(self, on_hover_func: OnHoverFuncType, **kwargs):
+    def __init__(self, on_hover_func: OnHoverFuncType, event_coalescer: EventCoalescer = None, **kwargs):
+        _load_static_assets(NadWidget, _STATIC_PATH / "nadwidget.js", _STATIC_PATH / "nadwidget.css")
         super().__init__(**kwargs)
         self._on_select_node_handler = CallbackDispatcher()
         self._on_move_node_handler = CallbackDispatcher()
@@ -47,16 +56,25 @@ class NadWidget(anywidget.AnyWidget):
         super().on_msg(self._handle_nadwidget_msgs)
         self._on_hover_func = on_hover_func
         self.hover_enabled = on_hover_func is not None
+        self._event_coalescer = event_coalescer if event_coalescer is not None else EventCoalescer(window=0)
+        self.profiling_enabled = get_profiler().enabled
+        self._branch_states_stream = None
+        self._branch_states_task = None
 
     def _handle_nadwidget_msgs(self, _, content, buffers):
         if content.get('event', '') == 'select_node':
             self.on_select_node_msg()
         elif content.get('event', '') == 'move_node':
-            self.on_move_node_msg()
+            self._event_coalescer.submit('move_node', self.on_move_node_msg)
         elif content.get('event', '') == 'move_text_node':
-            self.on_move_text_node_msg()
+            self._event_coalescer.submit('move_text_node', self.on_move_text_node_msg)
         elif content.get('event', '') == 'select_menu':
             self.on_select_menu_msg()
+        elif content.get('event', '') == 'profiling':
+            get_profiler().record('nad', content.get('stage'), content.get('duration', 0) / 1000)
+        elif content.get('event', '') == BRANCH_STATES_ACK_EVENT:
+            if self._branch_states_stream is not None:
+                self._branch_states_stream.acknowledge(content.get('seq'))
 
     # select node
     def on_select_node_msg(self):
@@ -89,20 +107,99 @@ class NadWidget(anywidget.AnyWidget):
     def set_branch_states(self, branch_states_data):
         self.branch_states = branch_states_data
 
+    def set_voltage_level_states(self, voltage_level_states_data):
+        """
+        Updates the buses voltage and angle legends of the displayed diagram, without rendering it again
+        (network-viewer's voltage level states format: voltageLevelId and busValue, a list of busId, voltage and angle).
+        """
+        self.voltage_level_states = voltage_level_states_data
+
+    def set_invalid_lf(self, invalid_lf: bool):
+        """
+        Dims the displayed values (as the diagram's invalid_lf does), without rendering the diagram again, e.g., while a load flow runs.
+        """
+        self.invalid_lf = invalid_lf
+
+    def stream_branch_states(self, batches: AsyncIterable[BranchStatesBatch], fps: float = 10, ack_timeout: float = 1.0) -> asyncio.Task:
+        """
+        Streams live branch states (e.g., telemetry) to the diagram, in the background.
+
+        The batches are coalesced into frames sent at most fps times per second; each frame only carries the branches
+        whose state changed since the previous frame, and is sent only once the browser has applied the previous one
+        (or after ack_timeout seconds). When the stream ends, the branch_states trait is set to the merged states, so that
+        they survive a diagram refresh. Starting a new stream cancels the current one.
+
+        Args:
+            batches: an async iterator of measurement batches: lists of branch states (dicts with branchId, value1, value2, connected1 and connected2 keys),
+                or dataframes with the time series columns (branch_id, value1, value2, connected1 and connected2)
+            fps: the target frame rate
+            ack_timeout: the maximum time, in seconds, waited for the browser to apply a frame
+
+        Returns:
+            The background task; its result is the stream statistics (batches and states received, frames and states sent, acknowledgement timeouts).
+
+        Examples:
+
+            .. code-block:: python
+
+                async def telemetry():
+                    while True:
+                        yield await read_measurements()
+
+                task = nad_widget.stream_branch_states(telemetry(), fps=5)
+                ...
+                task.cancel()
+        """
+        previous_stream = self._branch_states_stream
+        self.stop_branch_states_stream()
+        stream = BranchStatesStream(self, 'nad', fps, ack_timeout)
+        stream.on_end = lambda states: self._end_branch_states_stream(stream, states)
+        # the states already displayed: only the changes are sent
+        if previous_stream is not None:
+            stream.states = dict(previous_stream.states)
+        else:
+            stream.states = {state['branchId']: state for state in self.branch_states}
+        self._branch_states_stream = stream
+        self._branch_states_task = start_branch_states_stream(stream, batches)
+        return self._branch_states_task
+
+    def stop_branch_states_stream(self):
+        """
+        Cancels the current branch states stream, if any.
+        """
+        if self._branch_states_task is not None and not self._branch_states_task.done():
+            self._branch_states_task.cancel()
+        self._branch_states_task = None
+
+    def _end_branch_states_stream(self, stream, states):
+        # a cancelled stream, replaced by a new one, ends after the new one has started
+        if self._branch_states_stream is stream:
+            self._branch_states_stream = None
+            self.branch_states = list(states.values())
+
     def trigger_update_metadata(self):
         self.send({'type': 'triggerRetrieveMetadata'})
 
+    def invalidate_hover_cache(self):
+        """
+        Discards the hover infos cached by the browser, e.g., after the network has been modified.
+        """
+        self.hover_version += 1
+
     @anywidget.experimental.command
     def _get_on_hover_info(self, msg, buffers):
         retval = ''
         if self._on_hover_func is not None:
-            try:
-                retval = self._on_hover_func(msg['id'], msg['type'])
-            except Exception as err:
-                retval = f'ERROR {repr(err)}'
+            with get_profiler().measure('nad', 'hover_info') as info:
+                try:
+                    retval = self._on_hover_func(msg['id'], msg['type'])
+                except Exception as err:
+                    retval = f'ERROR {repr(err)}'
+                info['payload_size'] = len(retval)
         return retval, buffers
 
-def display_nad(svg, invalid_lf: bool = False, drag_enabled: bool = False, grayout:  bool = False, popup_menu_items: List[str] = [], on_hover_func: OnHoverFuncType = None) -> NadWidget:
+def display_nad(svg, invalid_lf: bool = False, drag_enabled: bool = False, grayout:  bool = False, popup_menu_items: List[str] = [], on_hover_func: OnHoverFuncType = None,
+                event_coalescer: EventCoalescer = None) -> NadWidget:
     """
     Displays a NAD's SVG with support for panning and zooming.
 
@@ -114,6 +211,7 @@ def display_nad(svg, invalid_lf: bool = False, drag_enabled: bool = False, grayo
         popup_menu_items: list of str. When not empty enables a right-click popup menu on the NAD's VL nodes.
         on_hover_func: a callback function that is invoked when hovering on equipments. The function parameters are the equipment id and type; It must return an HTML string. Currently, the NAD viewer component supports lines, HVDC lines and two winding transformers. None disables the hovering feature.
         on_hover_func: a callback function that is invoked when hovering on equipments. The function parameters are the equipment id and type; It must return an HTML string. None disables the hovering feature. Note that currently the NAD viewer component supports hovering on lines, HVDC lines and two winding transformers.
+        event_coalescer: if not None, the bursts of move node and move text node events are coalesced through it: only the latest event, in the coalescer's time window, triggers the registered callbacks. None (default) dispatches every event.
 
     Returns:
         A jupyter widget allowing to zoom and pan the SVG.
@@ -124,10 +222,14 @@ def display_nad(svg, invalid_lf: bool = False, drag_enabled: bool = False, grayo
 
             display_nad(network.get_network_area_diagram())
     """
-    svg_value=_get_svg_string(svg)
-    svg_metadata = _get_svg_metadata(svg)
-    return NadWidget(diagram_data= {"svg_data": svg_value, "metadata": svg_metadata, "invalid_lf": invalid_lf, "drag_enabled": drag_enabled, "grayout": grayout},
-                     popup_menu_items=popup_menu_items, on_hover_func = on_hover_func)
+    profiler = get_profiler()
+    with profiler.measure('nad', 'svg_extraction'):
+        svg_value=_get_svg_string(svg)
+        svg_metadata = _get_svg_metadata(svg)
+    with profiler.measure('nad', 'widget_creation') as info:
+        info['payload_size'] = _get_payload_size(svg_value, svg_metadata)
+        return NadWidget(diagram_data= {"svg_data": svg_value, "metadata": svg_metadata, "invalid_lf": invalid_lf, "drag_enabled": drag_enabled, "grayout": grayout},
+                         popup_menu_items=popup_menu_items, on_hover_func = on_hover_func, event_coalescer=event_coalescer)
 
 def update_nad(nadwidget, svg, invalid_lf: bool = False, drag_enabled: bool = False, grayout:  bool = False, keep_viewbox: bool = False):
     """
@@ -148,6 +250,12 @@ def update_nad(nadwidget, svg, invalid_lf: bool = False, drag_enabled: bool = Fa
             update_nad(existing_nad_widget, network.get_network_area_diagram())
     """    
 
-    svg_value=_get_svg_string(svg)
-    svg_metadata = _get_svg_metadata(svg)
-    nadwidget.diagram_data= {"svg_data": svg_value, "metadata": svg_metadata, "invalid_lf": invalid_lf, "drag_enabled": drag_enabled, "grayout": grayout, "keep_viewbox": keep_viewbox}
+    profiler = get_profiler()
+    with profiler.measure('nad', 'svg_extraction'):
+        svg_value=_get_svg_string(svg)
+        svg_metadata = _get_svg_metadata(svg)
+    with profiler.measure('nad', 'comm_send') as info:
+        info['payload_size'] = _get_payload_size(svg_value, svg_metadata)
+        nadwidget.diagram_data= {"svg_data": svg_value, "metadata": svg_metadata, "invalid_lf": invalid_lf, "drag_enabled": drag_enabled, "grayout": grayout, "keep_viewbox": keep_viewbox}
+    # the new diagram may reflect a modified network: the hover infos cached by the browser are outdated
+    nadwidget.invalidate_hover_cache()
@@ -5,28 +5,130 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 
+import pypowsybl.loadflow as lf
+from pypowsybl import PyPowsyblError
 from pypowsybl.network import Network, NadParameters, SldParameters, NadLayoutType, NadProfile
 from .nadwidget import display_nad, update_nad
 from .sldwidget import display_sld, update_sld
 from .networkmapwidget import NetworkMapWidget
 from .selectcontext import SelectContext
 from .assets import EMPTY_SVG, PROGRESS_BAR_SVG, PROGRESS_EMPTY_SVG
+from .eventcoalescer import EventCoalescer
+from .profiler import get_profiler
+from .networksnapshot import invalidate_network_snapshot
+from .vlgraph import get_voltage_level_graph, format_voltage_levels_counts
+from .switchbatch import SwitchBatch
+from .scheduler import NetworkScheduler, Priority, get_network_scheduler
+from .diagramcache import DiagramCache, NetworkChecksum
+from .flowsrefresh import (
+    BackgroundLoadFlow, get_terminal_values, get_bus_values, get_nad_branch_states, get_nad_voltage_level_states,
+    get_sld_feeder_values, get_map_branch_states
+)
 
 from IPython.display import display
 import ipywidgets as widgets
+import asyncio
+import html
 import json
+import time
+import numpy as np
 import pandas as pd
+from functools import partial
 from typing import Callable
 from pandas import DataFrame
 
 OnHoverFuncType = Callable[[str, str], str]
 
+# how long, in seconds, the widgets' events wait for a read access to the network, e.g., while a load flow runs
+READ_TIMEOUT = 0.05
+
+NETWORK_BUSY_HOVER_INFO = '<i>The network is being modified (e.g., by a load flow): hover again once done.</i>'
+
+HOVER_TABLE_STYLE = (
+    '<style type="text/css">\n'
+    '.pypowsybl-hover-table caption {caption-side: top; font-weight: bold; background-color: #f8f8f8; border-bottom: 1px solid #ddd; width: fit-content; white-space: nowrap;}\n'
+    '.pypowsybl-hover-table th {text-align: left; font-weight: bold; background-color: #f8f8f8;}\n'
+    '.pypowsybl-hover-table td {text-align: left;}\n'
+    '</style>\n'
+)
+
+# swaps the python's thousands and decimal separators (',' and '.') for the displayed ones ('.' and ',')
+_SEPARATORS = str.maketrans({',': '.', '.': ','})
+
+def _format_value(value) -> str:
+    # same formatting as pandas' Styler.format(precision=3, thousands=".", decimal=",")
+    if isinstance(value, (bool, np.bool_)):
+        return str(value)
+    if isinstance(value, (float, np.floating)):
+        return f'{value:,.3f}'.translate(_SEPARATORS)
+    if isinstance(value, (int, np.integer)):
+        return f'{value:,}'.translate(_SEPARATORS)
+    return html.escape(str(value))
+
+def format_to_html_table(row, id, type):
+    rows = ''.join(f'<tr><th>{html.escape(str(name))}</th><td>{_format_value(value)}</td></tr>\n'
+                   for name, value in zip(row.index, row.array))
+    return (f'{HOVER_TABLE_STYLE}<table class="pypowsybl-hover-table" border="0">\n'
+            f'<caption>{html.escape(f"{type}: {id}")}</caption>\n<tbody>\n{rows}</tbody>\n</table>\n')
+
+# hovered equipment type -> network's dataframe getter
+HOVER_TABLES = {
+    'LINE': 'get_lines',
+    'PHASE_SHIFT_TRANSFORMER': 'get_2_windings_transformers',
+    'TWO_WINDINGS_TRANSFORMER': 'get_2_windings_transformers',
+    'LOAD': 'get_loads',
+    'GENERATOR': 'get_generators',
+    'CAPACITOR': 'get_shunt_compensators',
+    'INDUCTOR': 'get_shunt_compensators',
+    'SHUNT_COMPENSATOR_INDUCTOR': 'get_shunt_compensators',
+    'SHUNT_COMPENSATOR_CAPACITOR': 'get_shunt_compensators',
+    'THREE_WINDINGS_TRANSFORMER': 'get_3_windings_transformers',
+    'THREE_WINDINGS_TRANSFORMER_LEG': 'get_3_windings_transformers',
+    'STATIC_VAR_COMPENSATOR': 'get_static_var_compensators',
+    'DISCONNECTOR': 'get_switches',
+    'BREAKER': 'get_switches',
+    'LOAD_BREAK_SWITCH': 'get_switches',
+    'GROUND_DISCONNECTION': 'get_switches',
+    'TIE_LINE': 'get_tie_lines',
+    'DANGLING_LINE': 'get_dangling_lines',
+    'LCC_CONVERTER_STATION': 'get_hvdc_lines',
+    'VSC_CONVERTER_STATION': 'get_hvdc_lines',
+    'HVDC_LINE': 'get_hvdc_lines',
+    'BATTERY': 'get_batteries',
+    'GROUND': 'get_grounds',
+}
+
+def _get_equipment_row(network: Network, getter: str, id: str):
+    # only the hovered equipment's row is fetched from the network
+    return getattr(network, getter)(id=[id]).iloc[0]
+
+def get_hovering_equipment_info(network: Network, id: str, type: str) -> str:
+    # for LCC and VSC converter station the id is the HVDC line's id, not the converter's id 
+    # (since we cannot retrieve the converterar, we are displaying the HVDC line's details)
+    if type in [ 'LCC_CONVERTER_STATION', 'VSC_CONVERTER_STATION' ]:
+        return format_to_html_table(_get_equipment_row(network, HOVER_TABLES[type], id), id, 'HDVC_LINE (' + type + ')')
+    elif type in HOVER_TABLES:
+        return format_to_html_table(_get_equipment_row(network, HOVER_TABLES[type], id), id, type)
+    elif type == 'BUSBAR_SECTION':
+        for getter, caption_type in (('get_busbar_sections', type), ('get_bus_breaker_view_buses', f'{type} (bus breaker view)')):
+            try:
+                return format_to_html_table(_get_equipment_row(network, getter, id), id, caption_type)
+            except PyPowsyblError:
+                pass
+    # we don't show tooltips for VOLTAGE_LEVELs and TEXT_NODEs
+    elif type in [ 'VOLTAGE_LEVEL', 'TEXT_NODE' ]:
+        return ''
+    return f"Equipment of type '{type}' with id '{id}'"
+
 def network_explorer(network: Network, vl_id : str = None, use_name:bool = True, depth: int = 1,
                      high_nominal_voltage_bound: float = -1, low_nominal_voltage_bound: float = -1,
                      nominal_voltages_top_tiers_filter:int = -1,
                      nad_parameters: NadParameters = None, sld_parameters: SldParameters = None,
                      use_line_geodata:bool = False, nad_profile: NadProfile = None, on_hover:bool = True, on_hover_func: OnHoverFuncType = None,
-                     fixed_nad_positions: DataFrame = None):
+                     fixed_nad_positions: DataFrame = None, event_coalescer: EventCoalescer = None,
+                     load_nominal_voltages_on_demand: bool = False, batch_switching: bool = False,
+                     loadflow_action: bool = False, loadflow_parameters: lf.Parameters = None,
+                     scheduler: NetworkScheduler = None, diagram_cache: DiagramCache = None):
     """
     Creates a combined NAD and SLD explorer widget for the network. Diagrams are displayed on two different tabs.
     A third tab, 'Network map' displays the network's substations and lines on a map.
@@ -46,6 +148,13 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
         on_hover: when True, the hovering is enabled
         on_hover_func: a callback function that is invoked when hovering on equipments in the NAD, SLD and the network-map tabs. The function parameters (OnHoverFuncType = Callable[[str, str], str]) are the equipment id and type. It must return an HTML string. None, the default, will display in the popup all the attributes available in the edquipment's dataframe. Note that, depending on the specific viewer component (the NAD, the SLD and the network-map), not all the equipments are currently hoverable; more details in their detailed documentation. Please read what are the equipment types supported by the different diagram widget (the NAD, the SLD and the network-map), in their detailed documentation.
         fixed_nad_positions: positions dataframe to layout the voltage levels in the NAD
+        event_coalescer: coalesces the bursts of events (VL selections, depth slider changes, nodes dragging) so that only the latest one triggers a diagrams update. None, the default, uses a coalescer with a 0.1s time window.
+        load_nominal_voltages_on_demand: when True, the network map tab initially receives only the equipments of the nominal voltages selected by nominal_voltages_top_tiers_filter; the other nominal voltages are loaded when enabled in the map's nominal voltages filter.
+        batch_switching: initial state of the SLD tab's batch switching mode. When enabled, the clicked switches are queued (and displayed with their requested status) instead of being applied one by one: the 'Apply' button applies them all at once, followed by a single diagrams refresh.
+        loadflow_action: when True, a 'Run load flow' button runs an AC load flow on the network's working variant, on a worker thread: the displayed values are dimmed while it runs (and after a switching, until the next load flow), then the NAD, SLD and map values are updated in place, without generating the diagrams again.
+        loadflow_parameters: the parameters of the load flows run by the 'Run load flow' button. None uses the default ones.
+        scheduler: the scheduler of the accesses to the network: the diagrams generations and the hovering read the network, the switchings and the load flows write it, so that they never run concurrently with a write. None, the default, uses the network's shared scheduler (get_network_scheduler), also used by the other explorers of the network.
+        diagram_cache: when not None, the SLDs and NADs are fetched from this shared on-disk cache when already rendered, e.g., by another session displaying the same network, and stored in it otherwise.
 
     Examples:
 
@@ -56,6 +165,41 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
 
     sel_ctx=SelectContext(network, vl_id, use_name, history_max_length = 10)
 
+    network_scheduler = scheduler if scheduler is not None else get_network_scheduler(network)
+
+    # the diagrams are cached for the network's content, modified by the explorer through the scheduler
+    network_checksum = NetworkChecksum(network, network_scheduler) if diagram_cache is not None else None
+
+    coalescer = event_coalescer if event_coalescer is not None else EventCoalescer()
+
+    profiler = get_profiler()
+
+    # the widgets' events are handled on the kernel's thread: while the network is written (e.g., by a load flow), their
+    # reads do not wait for the write to end, so that the kernel stays responsive
+    def when_readable(action):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop running (e.g., outside a jupyter kernel): nothing to keep responsive
+            with network_scheduler.reading():
+                pass
+            action()
+            return
+        future = network_scheduler.submit_read(lambda: None, priority=Priority.INTERACTIVE)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(action))
+
+    def read_or_defer(key, action):
+        # runs the action in a read access or, if not granted in time, through the coalescer once the write ends
+        granted = False
+        try:
+            with network_scheduler.reading(timeout=READ_TIMEOUT):
+                granted = True
+                action()
+        except TimeoutError:
+            if granted:
+                raise
+            when_readable(lambda: coalescer.submit(key, lambda: read_or_defer(key, action)))
+
     nad_widget=None
     sld_widget=None
     map_widget=None
@@ -84,20 +228,120 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
             sel_ctx.set_selected(arrow_vl, add_to_history=True)
             update_select_widget(history, sel_ctx.get_selected(), sel_ctx.get_history_as_list(), on_selected_history)
             update_select_widget(found, sel_ctx.get_selected() if sel_ctx.is_selected_in_filtered_vls() else None, None, on_selected)
-            update_explorer()
+            coalescer.submit('update_explorer', lambda: read_or_defer('update_explorer', update_explorer))
         history.focus()
 
     nad_displayed_vl_id=None
 
-    def toggle_switch(event: any):
+    switch_batch = SwitchBatch()
+
+    def refresh_after_switching():
         nonlocal nad_displayed_vl_id
-        idswitch = event.clicked_switch.get('id')
-        statusswitch = event.clicked_switch.get('switch_status')
-        network.update_switches(id=idswitch, open=statusswitch)
-        update_sld_diagram(sel_ctx.get_selected(), True)
+        invalidate_network_snapshot(network)
+        if loadflow_action:
+            # the displayed flows are the ones before the switching, until the next load flow
+            set_flows_invalid(True)
+        if map_widget is not None:
+            map_widget.invalidate_hover_cache()
+        read_or_defer('update_sld', lambda: update_sld_diagram(sel_ctx.get_selected(), True))
         # force a NAD update, as soon as the NAD tab is selected
         nad_displayed_vl_id=None
 
+    def update_pending_switches():
+        count = len(switch_batch)
+        sld_widget.set_pending_switches(switch_batch.pending)
+        pending_switches_label.value = f'{count} pending switch operation(s)' if count > 0 else ''
+        apply_switches_button.disabled = count == 0
+        discard_switches_button.disabled = count == 0
+
+    def apply_pending_switches(_=None):
+        if is_loadflow_running():
+            return
+        with profiler.measure('network_explorer', 'switches_update'), network_scheduler.writing():
+            applied = switch_batch.commit(network)
+        if applied > 0:
+            refresh_after_switching()
+        # cleared once the refreshed SLD displays the new switches status
+        update_pending_switches()
+
+    def discard_pending_switches(_=None):
+        switch_batch.discard()
+        update_pending_switches()
+
+    def toggle_switch(event: any):
+        idswitch = event.clicked_switch.get('id')
+        statusswitch = event.clicked_switch.get('switch_status')
+        if batch_switching_toggle.value:
+            switch_batch.toggle(idswitch, statusswitch)
+            update_pending_switches()
+        elif not is_loadflow_running():
+            with network_scheduler.writing():
+                network.update_switches(id=idswitch, open=statusswitch)
+            refresh_after_switching()
+
+    background_loadflow = BackgroundLoadFlow(network, loadflow_parameters, network_scheduler)
+
+    def is_loadflow_running():
+        # the network must not be modified while the load flow computes its values
+        if background_loadflow.running:
+            loadflow_status_label.value = 'Load flow running: the network cannot be modified until it ends'
+            return True
+        return False
+
+    def set_flows_invalid(invalid: bool):
+        for widget in (nad_widget, sld_widget, map_widget):
+            if widget is not None:
+                widget.set_invalid_lf(invalid)
+
+    def compute_flows():
+        # runs on the scheduler's worker thread, in the load flow's write access: the values are ready when the load
+        # flow ends
+        return get_terminal_values(network), get_bus_values(network)
+
+    def run_loadflow(_=None):
+        if background_loadflow.running:
+            return
+        loadflow_button.disabled = True
+        loadflow_status_label.value = 'Load flow running...'
+        set_flows_invalid(True)
+        sld_vl_id = sel_ctx.get_selected()
+        start = time.perf_counter()
+        background_loadflow.run(lambda future: on_loadflow_done(future, sld_vl_id, time.perf_counter() - start),
+                                post_process=compute_flows)
+
+    def on_loadflow_done(future, sld_vl_id, duration):
+        nonlocal current_sld_feeder_values
+        loadflow_button.disabled = False
+        profiler.record('network_explorer', 'loadflow', duration)
+        try:
+            results, (terminal_values, bus_values) = future.result()
+        except Exception as err:
+            # the displayed values stay dimmed
+            loadflow_status_label.value = f'Load flow failed: {err}'
+            return
+        with profiler.measure('network_explorer', 'flows_refresh'):
+            invalidate_network_snapshot(network)
+            if nad_widget is not None and current_nad_metadata:
+                nad_widget.set_branch_states(get_nad_branch_states(current_nad_metadata, terminal_values))
+                nad_widget.set_voltage_level_states(get_nad_voltage_level_states(current_nad_metadata, bus_values))
+                nad_widget.invalidate_hover_cache()
+            if sld_vl_id == sel_ctx.get_selected():
+                if sld_vl_id is not None:
+                    # a load flow does not change the diagram's layout: only its values are updated, from the
+                    # displayed diagram's metadata
+                    current_sld_feeder_values = get_sld_feeder_values(current_sld_data.metadata, terminal_values)
+                    sld_widget.set_feeder_values(current_sld_feeder_values)
+                    sld_widget.invalidate_hover_cache()
+            else:
+                # another voltage level has been selected while the load flow was running
+                read_or_defer('update_sld', lambda: update_sld_diagram(sel_ctx.get_selected(), True))
+            if map_widget is not None:
+                map_widget.set_branch_states(get_map_branch_states(terminal_values))
+                map_widget.invalidate_hover_cache()
+            set_flows_invalid(False)
+        status = results[0].status.name if len(results) > 0 else 'NO COMPONENT'
+        loadflow_status_label.value = f'Load flow: {status} ({duration:.1f}s)'
+
     def select_vl_and_activate_sld_tab(vl_id: str):
         # first, switch to the SLD tab
         tabs_diagrams.selected_index=1
@@ -107,13 +351,20 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
             sel_ctx.set_selected(vl_id, add_to_history=True)
             update_select_widget(history, sel_ctx.get_selected(), sel_ctx.get_history_as_list(), on_selected_history)
             update_select_widget(found, sel_ctx.get_selected() if sel_ctx.is_selected_in_filtered_vls() else None, None, on_selected)
-            update_explorer()
+            coalescer.submit('update_explorer', lambda: read_or_defer('update_explorer', update_explorer))
         history.focus()
 
     def go_to_vl_from_map(event: any):
         vl_id= str(event.selected_vl)
         select_vl_and_activate_sld_tab(vl_id)
 
+    def open_region_from_map(event: any):
+        # the voltage levels of the region drawn on the map are displayed in the NAD tab
+        vl_ids = [vl_id for vl_id in event.selected_region['voltage_levels'] if vl_id in sel_ctx.vls.index]
+        if len(vl_ids) > 0:
+            read_or_defer('update_nad', lambda: update_nad_diagram(sel_ctx.get_selected(), vl_action=vl_ids, action=3))
+            tabs_diagrams.selected_index=NAD_TAB_INDEX
+
     def select_nad_menu(event: any):
         nonlocal current_nad_metadata
         vl_id= str(event.selected_menu['equipment_id'])
@@ -125,120 +376,97 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
             else:
                 if nad_widget.current_nad_metadata != '':
                     current_nad_metadata=nad_widget.current_nad_metadata
-                if selected_action == 1:
-                    update_nad_diagram(sel_ctx.get_selected(), vl_action=vl_id, action=1)
-                elif selected_action == 2:
-                    update_nad_diagram(sel_ctx.get_selected(), vl_action=vl_id, action=2)
-
-    def format_to_html_table(row, id, type):
-        table = (
-            row.to_frame()
-            .style.set_caption(f"{type}: {id}")
-            .set_table_styles(
-                [
-                    {
-                        "selector": "caption",
-                        "props": "caption-side: top; font-weight: bold; background-color: #f8f8f8; border-bottom: 1px solid #ddd; width: fit-content; white-space: nowrap;",
-                    },
-                    {
-                        "selector": "th",
-                        "props": "text-align: left; font-weight: bold; background-color: #f8f8f8;",
-                    },
-                    {
-                        "selector": "td",
-                        "props": "text-align: left;",
-                    },
-                ]
-            )
-            .format(precision=3, thousands=".", decimal=",")
-            .set_table_attributes('border="0"')
-            .hide(axis="columns")
-            .to_html()
-        )
-        return table
-
-    def get_hovering_equipment_info(id, type):
-        if type == 'LINE':
-            return format_to_html_table(network.get_lines().loc[id], id, type)
-        elif type in [ 'PHASE_SHIFT_TRANSFORMER', 'TWO_WINDINGS_TRANSFORMER']:
-            return format_to_html_table(network.get_2_windings_transformers().loc[id], id, type)
-        elif type == 'LOAD':
-            return format_to_html_table(network.get_loads().loc[id], id, type)
-        elif type == 'GENERATOR':
-            return format_to_html_table(network.get_generators().loc[id], id, type)
-        elif type in [ 'CAPACITOR', 'INDUCTOR', 'SHUNT_COMPENSATOR_INDUCTOR', 'SHUNT_COMPENSATOR_CAPACITOR']:
-            return format_to_html_table(network.get_shunt_compensators().loc[id], id, type)
-        elif type in [ 'THREE_WINDINGS_TRANSFORMER', 'THREE_WINDINGS_TRANSFORMER_LEG']:
-            return format_to_html_table(network.get_3_windings_transformers().loc[id], id, type)
-        elif type == 'STATIC_VAR_COMPENSATOR':
-            return format_to_html_table(network.get_static_var_compensators().loc[id], id, type)
-        elif type in [ 'DISCONNECTOR', 'BREAKER', 'LOAD_BREAK_SWITCH', 'GROUND_DISCONNECTION' ]:
-            return format_to_html_table(network.get_switches().loc[id], id, type)
-        elif type == 'TIE_LINE':
-            return format_to_html_table(network.get_tie_lines().loc[id], id, type)
-        elif type == 'DANGLING_LINE':
-            return format_to_html_table(network.get_dangling_lines().loc[id], id, type)
-        # for LCC and VSC converter station the id is the HVDC line's id, not the converter's id 
-        # (since we cannot retrieve the converterar, we are displaying the HVDC line's details)
-        elif type in [ 'LCC_CONVERTER_STATION', 'VSC_CONVERTER_STATION' ]:
-            return format_to_html_table(network.get_hvdc_lines().loc[id], id, 'HDVC_LINE (' + type + ')')
-        elif type == 'HVDC_LINE':
-            return format_to_html_table(network.get_hvdc_lines().loc[id], id, type)
-        elif type == 'BATTERY':
-            return format_to_html_table(network.get_batteries().loc[id], id, type)
-        elif type == 'GROUND':
-            return format_to_html_table(network.get_grounds().loc[id], id, type)
-        elif type == 'BUSBAR_SECTION':
-            bsections=network.get_busbar_sections()
-            if not bsections.empty and id in bsections.index:
-                return format_to_html_table(bsections.loc[id], id, type)    
-            else:
-                bbvb=network.get_bus_breaker_view_buses()
-                if not bbvb.empty and id in bbvb.index:
-                    return format_to_html_table(bbvb.loc[id], id, f'{type} (bus breaker view)')
-        # we don't show tooltips for VOLTAGE_LEVELs and TEXT_NODEs
-        elif type in [ 'VOLTAGE_LEVEL', 'TEXT_NODE' ]:
-            return ''
-        return f"Equipment of type '{type}' with id '{id}'"        
+                if selected_action in (1, 2):
+                    read_or_defer('update_nad', lambda: update_nad_diagram(sel_ctx.get_selected(), vl_action=vl_id, action=selected_action))
 
     hovering_function = None
     if on_hover == True:
-        hovering_function = on_hover_func if on_hover_func is not None else get_hovering_equipment_info
+        hovering_info_function = on_hover_func if on_hover_func is not None else lambda id, type: get_hovering_equipment_info(network, id, type)
+
+        def hovering_function(id, type):
+            granted = False
+            try:
+                with network_scheduler.reading(timeout=READ_TIMEOUT):
+                    granted = True
+                    return hovering_info_function(id, type)
+            except TimeoutError:
+                if granted:
+                    raise
+                # the note is cached by the browser until the write ends
+                when_readable(invalidate_hover_caches)
+                return NETWORK_BUSY_HOVER_INFO
+
+    def invalidate_hover_caches():
+        for widget in (nad_widget, sld_widget, map_widget):
+            if widget is not None:
+                widget.invalidate_hover_cache()
 
     def compute_sld_data(el):
         if el is not None:
-            sld_data=network.get_single_line_diagram(el, spars)
+            with profiler.measure('network_explorer', 'sld_generation'), network_scheduler.reading():
+                if diagram_cache is not None:
+                    sld_data=diagram_cache.get_single_line_diagram(network, el, spars, checksum=network_checksum.get())
+                else:
+                    sld_data=network.get_single_line_diagram(el, spars)
         else:
             sld_data=EMPTY_SVG
         return sld_data
 
     current_sld_data = compute_sld_data(None)
+    # the feeder values written by the load flows in the displayed SLD, generated before them
+    current_sld_feeder_values = []
 
     def update_sld_widget(sld_diagram_data, kv: bool = False, enable_callbacks=True):
         nonlocal sld_widget
         if sld_widget==None:
-            sld_widget=display_sld(sld_diagram_data, enable_callbacks=enable_callbacks, on_hover_func=hovering_function)
+            sld_widget=display_sld(sld_diagram_data, enable_callbacks=enable_callbacks, on_hover_func=hovering_function, lazy_metadata=True)
             sld_widget.on_nextvl(lambda event: go_to_vl(event))
             sld_widget.on_switch(lambda event: toggle_switch(event))
 
         else:
-            update_sld(sld_widget, sld_diagram_data, keep_viewbox=kv, enable_callbacks=enable_callbacks)
+            update_sld(sld_widget, sld_diagram_data, keep_viewbox=kv, enable_callbacks=enable_callbacks, lazy_metadata=True)
+            if sld_diagram_data is current_sld_data and current_sld_feeder_values:
+                # reset by update_sld
+                sld_widget.set_feeder_values(current_sld_feeder_values)
 
     def update_sld_diagram(el, kv: bool = False):
-        nonlocal current_sld_data
+        nonlocal current_sld_data, current_sld_feeder_values
         current_sld_data=compute_sld_data(el)
+        current_sld_feeder_values = []
         update_sld_widget(current_sld_data, kv, enable_callbacks=True)
 
     def update_map(el):
         nonlocal map_widget
         if el is not None:
             if map_widget==None:
-                map_widget=NetworkMapWidget(network, use_name=use_name, nominal_voltages_top_tiers_filter = nominal_voltages_top_tiers_filter,
-                                            on_hover_func=None if hovering_function is None else lambda x: hovering_function(x, 'LINE'))
+                with network_scheduler.reading():
+                    map_widget=NetworkMapWidget(network, use_name=use_name, nominal_voltages_top_tiers_filter = nominal_voltages_top_tiers_filter,
+                                                load_nominal_voltages_on_demand=load_nominal_voltages_on_demand,
+                                                on_hover_func=None if hovering_function is None else lambda x: hovering_function(x, 'LINE'))
                 map_widget.on_selectvl(lambda event : go_to_vl_from_map(event))
+                map_widget.on_select_region(lambda event : open_region_from_map(event))
             else:
                 map_widget.center_on_voltage_level(el)
 
+    batch_switching_toggle = widgets.ToggleButton(value=batch_switching, description='Batch switching',
+                                                  tooltip='Queue the clicked switches, and apply them all at once')
+    apply_switches_button = widgets.Button(description='Apply', disabled=True)
+    discard_switches_button = widgets.Button(description='Discard', disabled=True)
+    pending_switches_label = widgets.Label()
+
+    def on_batch_switching_changed(d):
+        # leaving the batch mode applies the pending switch operations
+        if not d['new']:
+            apply_pending_switches()
+
+    batch_switching_toggle.observe(on_batch_switching_changed, names='value')
+    apply_switches_button.on_click(apply_pending_switches)
+    discard_switches_button.on_click(discard_pending_switches)
+
+    loadflow_button = widgets.Button(description='Run load flow', tooltip='Run an AC load flow, and refresh the displayed values')
+    loadflow_button.on_click(run_loadflow)
+    loadflow_status_label = widgets.Label()
+
     nadslider = widgets.IntSlider(value=selected_depth, min=0, max=20, step=1, description='depth:', disabled=False, 
                                   continuous_update=False, orientation='horizontal', readout=True, readout_format='d',
                                   style={'description_width': 'initial'})
@@ -246,10 +474,20 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
     def on_nadslider_changed(d):
         nonlocal selected_depth
         selected_depth=d['new']
-        update_nad_diagram(sel_ctx.get_selected())
+        coalescer.submit('nadslider', lambda: read_or_defer('nadslider', lambda: update_nad_diagram(sel_ctx.get_selected())))
 
     nadslider.observe(on_nadslider_changed, names='value')
 
+    depth_counts_label = widgets.Label()
+
+    def update_depth_counts(el):
+        if el is None:
+            # no selected voltage level
+            depth_counts_label.value = ''
+            return
+        counts = get_voltage_level_graph(network).get_voltage_levels_counts([el], nadslider.max)
+        depth_counts_label.value = format_voltage_levels_counts(counts)
+
     vl_input = widgets.Text(
         value='',
         placeholder='Voltage level Name' if use_name else 'Voltage level Id',
@@ -294,7 +532,7 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
         if d['new'] != None:
             sel_ctx.set_selected(d['new'], add_to_history=True)
             update_select_widget(history, None, sel_ctx.get_history_as_list(), on_selected_history)
-            update_explorer()
+            coalescer.submit('update_explorer', lambda: read_or_defer('update_explorer', update_explorer))
 
     found.observe(on_selected, names='value')
 
@@ -310,7 +548,7 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
         if d['new'] != None:
             sel_ctx.set_selected(d['new'], add_to_history=False)
             update_select_widget(found, sel_ctx.get_selected() if sel_ctx.is_selected_in_filtered_vls() else None, None, on_selected)
-            update_explorer()
+            coalescer.submit('update_explorer', lambda: read_or_defer('update_explorer', update_explorer))
 
     history.observe(on_selected_history, names='value')
 
@@ -325,7 +563,7 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
 
     # adds to a VL list the list of nodes centered on the node to be expanded (with the same depth)
     def expand_on_vl_node(network, vl_list, vl_to_expand_from, depth):
-        vls_centered_on_selected_node = network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=vl_to_expand_from, depth=depth)
+        vls_centered_on_selected_node = get_voltage_level_graph(network).get_voltage_levels([vl_to_expand_from], depth)
         new_list=list(set(vl_list) | set(vls_centered_on_selected_node))
         return new_list
 
@@ -344,6 +582,10 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
         return None if json_nad_metadata == None  else extract_positions_dataframe_from_nad_metadata(json.loads(json_nad_metadata))
 
     def compute_nad_vl_list(el, depth=0, vllist=None, vl_action=None, action=0):
+        with profiler.measure('network_explorer', 'nad_vl_list'):
+            return _compute_nad_vl_list(el, depth, vllist, vl_action, action)
+
+    def _compute_nad_vl_list(el, depth=0, vllist=None, vl_action=None, action=0):
         new_vllist=None
         if el is not None:
             if action == 1:
@@ -352,8 +594,11 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
                 new_vllist=remove_vl_node(vllist, vl_action)
                 if len(new_vllist) == 0:
                     new_vllist=vllist
+            elif action == 3:
+                # a region selected on the map: vl_action is its voltage levels list
+                new_vllist=list(vl_action)
             else:
-                new_vllist=network.get_network_area_diagram_displayed_voltage_levels(voltage_level_ids=el, depth=depth)
+                new_vllist=get_voltage_level_graph(network).get_voltage_levels([el], depth)
         return new_vllist
 
     def compute_nad_data(vllist=None, fixed_positions=None, metadata=None):
@@ -362,12 +607,14 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
                 nm = fixed_positions
             else:
                 nm = extract_positions_dataframe_from_nad_metadata_json(metadata)
-            nad_data=network.get_network_area_diagram(voltage_level_ids=vllist, 
-                                                      high_nominal_voltage_bound=high_nominal_voltage_bound, 
-                                                      low_nominal_voltage_bound=low_nominal_voltage_bound, 
-                                                      nad_parameters=npars,
-                                                      fixed_positions=nm,
-                                                      nad_profile=nad_profile)
+            with profiler.measure('network_explorer', 'nad_generation'), network_scheduler.reading():
+                render_nad = network.get_network_area_diagram if diagram_cache is None else partial(diagram_cache.get_network_area_diagram, network, checksum=network_checksum.get())
+                nad_data=render_nad(voltage_level_ids=vllist, 
+                                    high_nominal_voltage_bound=high_nominal_voltage_bound, 
+                                    low_nominal_voltage_bound=low_nominal_voltage_bound, 
+                                    nad_parameters=npars,
+                                    fixed_positions=nm,
+                                    nad_profile=nad_profile)
         else:
             nad_data=EMPTY_SVG
         return nad_data
@@ -385,6 +632,7 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
                 grayout=grayout,
                 popup_menu_items=["Open in SLD tab", "Expand", "Remove"],
                 on_hover_func=hovering_function,
+                event_coalescer=coalescer,
             )
             nad_widget.on_select_menu(lambda event : select_nad_menu(event))
             nad_widget.on_move_node(lambda event : nad_widget.trigger_update_metadata())
@@ -432,7 +680,7 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
                 map_widget.set_enable_callbacks(False)
                 display(map_widget)
         try:
-            if action == 0:
+            if action == 0 or action == 3:
                 if fixed_nad_positions is not None and not fixed_nad_positions.empty:
                     current_nad_data=compute_nad_data(new_nad_vl_list, fixed_nad_positions)
                 else:
@@ -443,6 +691,10 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
                 current_nad_data=compute_nad_data(new_nad_vl_list, None, current_nad_metadata)
             current_nad_metadata=current_nad_data.metadata
             current_nad_vl_list=new_nad_vl_list    
+            if nad_widget != None:
+                # the new diagram displays the network's current values
+                nad_widget.set_branch_states([])
+                nad_widget.set_voltage_level_states([])
             update_nad_widget(current_nad_data, drag_enabled=True, grayout=False)
             nad_displayed_vl_id=el
         finally:
@@ -453,7 +705,12 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
             disable_in_progress()
 
     def update_explorer(force_update=False):
+        with profiler.measure('network_explorer', 'update_explorer'):
+            _update_explorer(force_update)
+
+    def _update_explorer(force_update=False):
         sel=sel_ctx.get_selected()
+        update_depth_counts(sel)
         if force_update or tabs_diagrams.selected_index==NAD_TAB_INDEX:
             update_nad_diagram(sel)
         update_sld_diagram(sel)
@@ -468,9 +725,10 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
     left_panel = widgets.VBox([vl_input, found, history], 
                               layout=widgets.Layout(width='100%', height='100%', display='flex', flex_flow='column'))
 
-    nad_top_section = widgets.HBox([nadslider, in_progress_widget],layout=widgets.Layout(justify_content='space-between')) 
+    nad_top_section = widgets.HBox([nadslider, depth_counts_label, in_progress_widget],layout=widgets.Layout(justify_content='space-between')) 
     right_panel_nad = widgets.VBox([nad_top_section, nad_widget])
-    right_panel_sld = widgets.VBox([spacer_label,sld_widget])
+    sld_top_section = widgets.HBox([batch_switching_toggle, apply_switches_button, discard_switches_button, pending_switches_label])
+    right_panel_sld = widgets.VBox([sld_top_section, sld_widget])
     right_panel_map = widgets.VBox([spacer_label, map_widget])
 
     tabs_diagrams = widgets.Tab()
@@ -482,12 +740,13 @@ def network_explorer(network: Network, vl_id : str = None, use_name:bool = True,
         tab_idx = widget['new']
         sel = sel_ctx.get_selected()
         if tab_idx==NAD_TAB_INDEX and nad_displayed_vl_id != sel:
-            update_nad_diagram(sel)
+            read_or_defer('update_nad', lambda: update_nad_diagram(sel_ctx.get_selected()))
 
     tabs_diagrams.observe(on_select_tab, names='selected_index')    
 
     left_vbox = widgets.VBox([voltage_levels_label, left_panel])
-    right_vbox = widgets.VBox([spacer_label, tabs_diagrams])
+    loadflow_section = widgets.HBox([loadflow_button, loadflow_status_label]) if loadflow_action else spacer_label
+    right_vbox = widgets.VBox([loadflow_section, tabs_diagrams])
 
     hbox = widgets.HBox([left_vbox, right_vbox])
 
@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: MPL-2.0
 #
 
+import asyncio
 import pathlib
 
 import anywidget
@@ -16,14 +17,24 @@ from ipywidgets import (
     CallbackDispatcher
 )
 
+import numpy as np
 import pandas as pd
 
-from pypowsybl.network import Network, get_extensions_names
+from pypowsybl.network import Network
 
-from typing import Callable
+from typing import AsyncIterable, Callable
+
+from .profiler import get_profiler
+from .streaming import BranchStatesBatch, BranchStatesStream, start_branch_states_stream, BRANCH_STATES_ACK_EVENT
+from .util import _load_static_assets
+from .networksnapshot import get_network_snapshot
+from .mapclustering import build_map_clusters
+from .mapindex import MapSpatialIndex
 
 OnHoverFuncType = Callable[[str], str]
 
+_STATIC_PATH = pathlib.Path(__file__).parent / "static"
+
 class NetworkMapWidget(anywidget.AnyWidget):
     """
     Creates a Network map widget, displaying substations and lines for a network. The widget allows zooming and panning the map, and filtering based on nominal voltages.
@@ -37,6 +48,8 @@ class NetworkMapWidget(anywidget.AnyWidget):
         nominal_voltages_top_tiers_filter: filters the elements in the map based on the network's top nominal voltages. N displays the top n nominal voltages; -1 (default) displays all.
         dark_mode: When True, sets the widget's display theme to dark (default is False).
         on_hover_func: a callback function that is invoked when hovering on the network equipments. The function parameters is the line id; It must return an HTML string. None disables the hovering feature. Note that currently the map viewer component supports hovering on lines.
+        load_nominal_voltages_on_demand: When True, only the equipments of the nominal voltages selected by nominal_voltages_top_tiers_filter are initially sent to the map; the equipments of the other nominal voltages are loaded when they are enabled in the nominal voltages filter. When False (default), all the equipments are sent.
+        cluster_zoom_threshold: when not -1 (default), below this zoom level the map displays clusters of substations, and bundles of the lines between them, instead of the substations and lines.
 
     Returns:
         A jupyter widget with the network map, allowing to zoom and pan the map, and filtering based on nominal voltages.
@@ -48,8 +61,6 @@ class NetworkMapWidget(anywidget.AnyWidget):
             NetworkMapWidget(network)
     """
 
-    _esm = pathlib.Path(__file__).parent / "static" / "networkmapwidget.js"
-    _css = pathlib.Path(__file__).parent / "static" / "networkmapwidget.css"
     
     spos = traitlets.Unicode().tag(sync=True)
     lpos = traitlets.Unicode().tag(sync=True)
@@ -62,6 +73,9 @@ class NetworkMapWidget(anywidget.AnyWidget):
 
     nvls  = traitlets.List().tag(sync=True)
 
+    # all the network's nominal voltages, when the payload is limited to the nvls (empty otherwise)
+    all_nvls = traitlets.List().tag(sync=True)
+
     params  = traitlets.Dict().tag(sync=True)
     
     selected_vl = traitlets.Unicode().tag(sync=True)
@@ -72,35 +86,88 @@ class NetworkMapWidget(anywidget.AnyWidget):
 
     hover_enabled = traitlets.Bool().tag(sync=True)
 
+    hover_version = traitlets.Int(0).tag(sync=True)
+
+    invalid_lf = traitlets.Bool(False).tag(sync=True)
+
+    branch_states = traitlets.List().tag(sync=True)
+
+    profiling_enabled = traitlets.Bool().tag(sync=True)
+
+    # the substations clusters and lines bundles of the zoom levels below cluster_zoom_threshold
+    clusters = traitlets.Unicode('[]').tag(sync=True)
+
+    cluster_zoom_threshold = traitlets.Int(-1).tag(sync=True)
+
     def __init__(self, network:Network, sub_id:str = None, use_name:bool = True, display_lines:bool = True, use_line_geodata:bool = False, nominal_voltages_top_tiers_filter = -1, 
-                 dark_mode:bool = False, on_hover_func: OnHoverFuncType = None, **kwargs):
+                 dark_mode:bool = False, on_hover_func: OnHoverFuncType = None, load_nominal_voltages_on_demand:bool = False,
+                 cluster_zoom_threshold:int = -1, **kwargs):
+        _load_static_assets(NetworkMapWidget, _STATIC_PATH / "networkmapwidget.js", _STATIC_PATH / "networkmapwidget.css")
         super().__init__(**kwargs)
 
-        (lmap, lpos, smap, spos, vl_subs, sub_vls, subs_ids, tlmap, hlmap) = self.extract_map_data(network, display_lines, use_line_geodata)
-        self.lmap=json.dumps(lmap)
-        self.lpos=json.dumps(lpos)
-        self.smap=json.dumps(smap)
-        self.spos=json.dumps(spos)
-        self.tlmap=json.dumps(tlmap)
-        self.hlmap=json.dumps(hlmap)
+        profiler = get_profiler()
+        self.profiling_enabled = profiler.enabled
+
+        self._network = network
+        self._display_lines = display_lines
+        self._use_line_geodata = use_line_geodata
+
+        with profiler.measure('map', 'extract_nominal_voltage_list'):
+            nvls = self.extract_nominal_voltage_list(network, nominal_voltages_top_tiers_filter)
+        payload_nvls = None
+        if load_nominal_voltages_on_demand and nominal_voltages_top_tiers_filter != -1:
+            payload_nvls = nvls
+            self.all_nvls = self.extract_nominal_voltage_list(network, -1)
+
+        with profiler.measure('map', 'extract_map_data'):
+            (lmap, lpos, smap, spos, vl_subs, sub_vls, subs_ids, tlmap, hlmap) = self.extract_map_data(network, display_lines, use_line_geodata, payload_nvls)
+        with profiler.measure('map', 'json_serialization') as info:
+            lmap_json, lpos_json, smap_json, spos_json, tlmap_json, hlmap_json = (json.dumps(data) for data in (lmap, lpos, smap, spos, tlmap, hlmap))
+            info['payload_size'] = sum(len(data) for data in (lmap_json, lpos_json, smap_json, spos_json, tlmap_json, hlmap_json))
+        with profiler.measure('map', 'comm_send') as info:
+            info['payload_size'] = sum(len(data) for data in (lmap_json, lpos_json, smap_json, spos_json, tlmap_json, hlmap_json))
+            self.lmap=lmap_json
+            self.lpos=lpos_json
+            self.smap=smap_json
+            self.spos=spos_json
+            self.tlmap=tlmap_json
+            self.hlmap=hlmap_json
+        if cluster_zoom_threshold > 0:
+            with profiler.measure('map', 'clustering') as info:
+                clusters_json = json.dumps(self.extract_clusters_data(network, display_lines, cluster_zoom_threshold))
+                info['payload_size'] = len(clusters_json)
+            self.clusters = clusters_json
+            self.cluster_zoom_threshold = cluster_zoom_threshold
         self.use_name=use_name
         self.params={"subId":  sub_id}
         self.vl_subs=vl_subs
         self.sub_vls=sub_vls
         self.subs_ids=subs_ids
-        self.nvls=self.extract_nominal_voltage_list(network, nominal_voltages_top_tiers_filter)
+        self.nvls=nvls
         self.enable_callbacks=True
         self.dark_mode=dark_mode
 
         self._on_selectvl_handlers = CallbackDispatcher()
+        self._on_select_region_handlers = CallbackDispatcher()
+        self.selected_region = {}
+        self._spatial_index = None
+        self._branches_vls = None
         super().on_msg(self._handle_pw_msg)
 
         self._on_hover_func = on_hover_func
         self.hover_enabled = on_hover_func is not None        
 
+        self._branch_states_stream = None
+        self._branch_states_task = None
+
     def _handle_pw_msg(self, _, content, buffers):
         if content.get('event', '') == 'select_vl':
             self.selectvl()
+        elif content.get('event', '') == 'profiling':
+            get_profiler().record('map', content.get('stage'), content.get('duration', 0) / 1000)
+        elif content.get('event', '') == BRANCH_STATES_ACK_EVENT:
+            if self._branch_states_stream is not None:
+                self._branch_states_stream.acknowledge(content.get('seq'))
 
     def selectvl(self):
         self._on_selectvl_handlers(self)
@@ -108,6 +175,17 @@ class NetworkMapWidget(anywidget.AnyWidget):
     def on_selectvl(self, callback, remove=False):
         self._on_selectvl_handlers.register_callback(callback, remove=remove)
 
+    def selectregion(self):
+        self._on_select_region_handlers(self)
+
+    def on_select_region(self, callback, remove=False):
+        """
+        Registers a callback invoked when a region is selected on the map (a polygon drawn with the map's polygon tool):
+        its selected_region attribute is then a dict with the region's substations, voltage levels and lines ids lists
+        (limited to the nominal voltages displayed by the map).
+        """
+        self._on_select_region_handlers.register_callback(callback, remove=remove)
+
     def get_substation_id(self, vl_id):
         return self.vl_subs.get(vl_id, None)
 
@@ -129,9 +207,79 @@ class NetworkMapWidget(anywidget.AnyWidget):
     def set_dark_mode(self, dark_mode=False):
         self.dark_mode = dark_mode
 
+    def set_invalid_lf(self, invalid_lf: bool):
+        """
+        Dims the displayed flows, e.g., while a load flow runs.
+        """
+        self.invalid_lf = invalid_lf
+
+    def set_branch_states(self, branch_states_data):
+        """
+        Updates the flows and connection status of the displayed lines and tie lines in a single frame (same format as
+        stream_branch_states' batches), without sending the map data again. The states are kept by the widget's branch_states
+        trait: they are also applied by the maps displayed afterwards.
+        """
+        with get_profiler().measure('map', 'branch_states_send') as info:
+            info['payload_size'] = len(branch_states_data)
+            self.branch_states = list(branch_states_data)
+
+    def invalidate_hover_cache(self):
+        """
+        Discards the hover infos cached by the browser, e.g., after the network has been modified.
+        """
+        self.hover_version += 1
+
+    def stream_branch_states(self, batches: AsyncIterable[BranchStatesBatch], fps: float = 10, ack_timeout: float = 1.0) -> asyncio.Task:
+        """
+        Streams live lines and tie lines states (e.g., telemetry) to the map, in the background: value1 and value2 are
+        displayed as the active power flows at both line ends, connected1 and connected2 as the terminals connection status.
+
+        The batches are coalesced into frames sent at most fps times per second; each frame only carries the lines whose
+        state changed since the previous frame, and is sent only once the browser has applied the previous one (or after
+        ack_timeout seconds). The streamed states are kept by the displayed map only: a new display of the widget shows
+        the network's flows. Starting a new stream cancels the current one.
+
+        Args:
+            batches: an async iterator of measurement batches: lists of branch states (dicts with branchId, value1, value2, connected1 and connected2 keys),
+                or dataframes with the time series columns (branch_id, value1, value2, connected1 and connected2)
+            fps: the target frame rate
+            ack_timeout: the maximum time, in seconds, waited for the browser to apply a frame
+
+        Returns:
+            The background task; its result is the stream statistics (batches and states received, frames and states sent, acknowledgement timeouts).
+
+        Examples:
+
+            .. code-block:: python
+
+                task = map_widget.stream_branch_states(telemetry(), fps=5)
+        """
+        previous_stream = self._branch_states_stream
+        self.stop_branch_states_stream()
+        stream = BranchStatesStream(self, 'map', fps, ack_timeout)
+        stream.on_end = lambda states: self._end_branch_states_stream(stream)
+        if previous_stream is not None:
+            stream.states = dict(previous_stream.states)
+        self._branch_states_stream = stream
+        self._branch_states_task = start_branch_states_stream(stream, batches)
+        return self._branch_states_task
+
+    def stop_branch_states_stream(self):
+        """
+        Cancels the current branch states stream, if any.
+        """
+        if self._branch_states_task is not None and not self._branch_states_task.done():
+            self._branch_states_task.cancel()
+        self._branch_states_task = None
+
+    def _end_branch_states_stream(self, stream):
+        if self._branch_states_stream is stream:
+            self._branch_states_stream = None
+
     def get_tie_lines_info(self, network, vls_with_coords):
-        ties_df=network.get_tie_lines().reset_index()[['id', 'name', 'dangling_line1_id', 'dangling_line2_id']]
-        danglings_df=network.get_dangling_lines().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id', 'connected']]
+        snapshot = get_network_snapshot(network)
+        ties_df=snapshot.get_tie_lines().reset_index()[['id', 'name', 'dangling_line1_id', 'dangling_line2_id']]
+        danglings_df=snapshot.get_dangling_lines().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id', 'connected']]
         tie_lines_info=[]
         if not(ties_df.empty or danglings_df.empty):
             tie_d_1 = pd.merge(ties_df, danglings_df, left_on='dangling_line1_id', right_on='id', suffixes=('', '_d1'))
@@ -145,9 +293,10 @@ class NetworkMapWidget(anywidget.AnyWidget):
         return tie_lines_info
 
     def get_hvdc_lines_info(self, network, vls_with_coords):
-        hvdc_lines_df = network.get_hvdc_lines().reset_index()[['id', 'name', 'converters_mode', 'converter_station1_id', 'converter_station2_id', 'connected1', 'connected2']]	
-        lcc_stations_df = network.get_lcc_converter_stations().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id']]
-        vsc_stations_df = network.get_vsc_converter_stations().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id']]
+        snapshot = get_network_snapshot(network)
+        hvdc_lines_df = snapshot.get_hvdc_lines().reset_index()[['id', 'name', 'converters_mode', 'converter_station1_id', 'converter_station2_id', 'connected1', 'connected2']]
+        lcc_stations_df = snapshot.get_lcc_converter_stations().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id']]
+        vsc_stations_df = snapshot.get_vsc_converter_stations().reset_index()[['id', 'name', 'p', 'i', 'voltage_level_id']]
         stations_df = pd.concat([lcc_stations_df, vsc_stations_df])
         hvdc_lines_info = []
         if not(hvdc_lines_df.empty or stations_df.empty):
@@ -164,7 +313,7 @@ class NetworkMapWidget(anywidget.AnyWidget):
     def filter_invalid_coordinates(self, df, lat_attr='latitude', lon_attr='longitude'):
         return df[df[lat_attr].between(-90, 90) & df[lon_attr].between(-180, 180)]        
 
-    def extract_map_data(self, network, display_lines, use_line_geodata):
+    def extract_map_data(self, network, display_lines, use_line_geodata, nominal_voltages=None):
         lmap = []
         lpos = []
         smap = []
@@ -176,20 +325,26 @@ class NetworkMapWidget(anywidget.AnyWidget):
         sub_vls = dict()
         subs_ids = set()
 
+        snapshot = get_network_snapshot(network)
+
         # substationPosition extension is available only in PyPowSyBl starting from v1.5.0
-        subs_positions_df = pd.DataFrame() if 'substationPosition' not in get_extensions_names() else network.get_extensions('substationPosition') 
+        subs_positions_df = snapshot.get_extension('substationPosition')
         if not subs_positions_df.empty:
 
-            subs_df = network.get_substations()
+            subs_df = snapshot.get_substations()
 
             subs_positions_df = subs_df.merge(subs_positions_df, left_on='id', right_on='id')[['name','latitude','longitude']]
             subs_positions_df = self.filter_invalid_coordinates(subs_positions_df)
             
-            vls_df = network.get_voltage_levels().reset_index()
+            vls_df = snapshot.get_voltage_levels().reset_index()
             vls_subs_df = vls_df.merge(subs_positions_df, left_on='substation_id', right_on='id')[['id','name_x','substation_id','name_y','nominal_v','latitude','longitude']]
+            if nominal_voltages is not None:
+                # drops the equipments of the other nominal voltages, before any serialization
+                vls_subs_df = vls_subs_df[vls_subs_df['nominal_v'].isin(nominal_voltages)]
+                subs_positions_df = subs_positions_df[subs_positions_df.index.isin(vls_subs_df['substation_id'])]
 
             if display_lines:
-                lines_df = network.get_lines().reset_index()[['id','name','voltage_level1_id','voltage_level2_id','connected1','connected2','p1','p2','i1','i2']]
+                lines_df = snapshot.get_lines().reset_index()[['id','name','voltage_level1_id','voltage_level2_id','connected1','connected2','p1','p2','i1','i2']]
                 lines_positions_df = lines_df.merge(vls_subs_df[['id', 'latitude', 'longitude']], how='left', left_on='voltage_level1_id', right_on='id')
                 lines_positions_df = lines_positions_df.rename(columns={'latitude': 'v1_latitude', 'longitude': 'v1_longitude', 'id_x': 'id'})
                 lines_positions_df = lines_positions_df.drop(columns=['id_y'])
@@ -209,7 +364,7 @@ class NetworkMapWidget(anywidget.AnyWidget):
                 }).to_dict(orient='records')
 
                 if use_line_geodata:
-                    lines_positions_from_extensions_df=network.get_extensions('linePosition').reset_index()
+                    lines_positions_from_extensions_df=snapshot.get_extension('linePosition').reset_index()
                     lines_positions_from_extensions_df = self.filter_invalid_coordinates(lines_positions_from_extensions_df)
                     lines_positions_from_extensions_sorted_df = lines_positions_from_extensions_df.sort_values(by=['id', 'num'])
                     lines_positions_from_extensions_grouped_df = lines_positions_from_extensions_sorted_df.groupby('id').apply(lambda x: x[['latitude', 'longitude']].to_dict('records'), include_groups=False).to_dict()
@@ -254,23 +409,225 @@ class NetworkMapWidget(anywidget.AnyWidget):
 
             vl_subs = vls_df.set_index('id')['substation_id'].to_dict()
             sub_vls = vls_df.groupby('substation_id')['id'].apply(list).to_dict()
-            subs_ids = set(network.get_substations().reset_index()['id'])
+            subs_ids = set(subs_df.index)
 
         return (lmap, lpos, smap, spos, vl_subs, sub_vls, subs_ids, tlmap, hlmap)
 
+    def extract_branches_ends(self, network):
+        """
+        Returns the lines, tie lines and HVDC lines ends, indexed by id: their voltage levels and substations, the active
+        power flow at their first end, and whether both ends are connected.
+        """
+        snapshot = get_network_snapshot(network)
+        vl_subs = snapshot.get_voltage_levels()['substation_id']
+        lines_df = snapshot.get_lines()
+        branches = [pd.DataFrame({
+            'voltage_level1_id': lines_df['voltage_level1_id'],
+            'voltage_level2_id': lines_df['voltage_level2_id'],
+            'p1': lines_df['p1'],
+            'connected': lines_df['connected1'] & lines_df['connected2'],
+        })]
+        ties_df = snapshot.get_tie_lines()
+        if not ties_df.empty:
+            danglings_df = snapshot.get_dangling_lines()
+            dangling1_df = danglings_df.loc[ties_df['dangling_line1_id']]
+            dangling2_df = danglings_df.loc[ties_df['dangling_line2_id']]
+            branches.append(pd.DataFrame({
+                'voltage_level1_id': dangling1_df['voltage_level_id'].to_numpy(),
+                'voltage_level2_id': dangling2_df['voltage_level_id'].to_numpy(),
+                'p1': dangling1_df['p'].to_numpy(),
+                'connected': dangling1_df['connected'].to_numpy() & dangling2_df['connected'].to_numpy(),
+            }, index=ties_df.index))
+        hvdc_lines_df = snapshot.get_hvdc_lines()
+        if not hvdc_lines_df.empty:
+            stations_df = pd.concat([snapshot.get_lcc_converter_stations()[['voltage_level_id', 'p']],
+                                     snapshot.get_vsc_converter_stations()[['voltage_level_id', 'p']]])
+            station1_df = stations_df.loc[hvdc_lines_df['converter_station1_id']]
+            station2_df = stations_df.loc[hvdc_lines_df['converter_station2_id']]
+            branches.append(pd.DataFrame({
+                'voltage_level1_id': station1_df['voltage_level_id'].to_numpy(),
+                'voltage_level2_id': station2_df['voltage_level_id'].to_numpy(),
+                'p1': station1_df['p'].to_numpy(),
+                'connected': (hvdc_lines_df['connected1'] & hvdc_lines_df['connected2']).to_numpy(),
+            }, index=hvdc_lines_df.index))
+        branches_df = pd.concat(branches)
+        branches_df.index.name = 'id'
+        branches_df['substation1_id'] = branches_df['voltage_level1_id'].map(vl_subs)
+        branches_df['substation2_id'] = branches_df['voltage_level2_id'].map(vl_subs)
+        return branches_df
+
+    def extract_substations_positions(self, network):
+        """
+        Returns the valid positions of the substations, indexed by id.
+        """
+        subs_positions_df = get_network_snapshot(network).get_extension('substationPosition')
+        if subs_positions_df.empty:
+            return pd.DataFrame(columns=['latitude', 'longitude'], index=pd.Index([], name='id'))
+        return self.filter_invalid_coordinates(subs_positions_df[['latitude', 'longitude']])
+
+    def extract_clusters_data(self, network, display_lines, zoom_threshold):
+        """
+        Returns the substations clusters and lines bundles of the zoom levels below zoom_threshold: the clusters group all
+        the substations having a position, whatever their nominal voltages.
+        """
+        snapshot = get_network_snapshot(network)
+        subs_positions_df = self.extract_substations_positions(network)
+        if subs_positions_df.empty:
+            return []
+        subs_df = snapshot.get_substations()[['name']].join(subs_positions_df, how='inner')
+        subs_df = subs_df.join(snapshot.get_voltage_levels().groupby('substation_id')['nominal_v'].max(), how='inner')
+        if display_lines:
+            branches_df = self.extract_branches_ends(network)
+        else:
+            branches_df = pd.DataFrame(columns=['substation1_id', 'substation2_id', 'p1', 'connected'])
+        return build_map_clusters(subs_df, branches_df, zoom_threshold)
+
+    def get_spatial_index(self) -> MapSpatialIndex:
+        """
+        Returns the spatial index of the map's substations and lines (of all the nominal voltages), built on the first call.
+        """
+        if self._spatial_index is None:
+            with get_profiler().measure('map', 'spatial_index_build'):
+                self._spatial_index, self._branches_vls = self.extract_spatial_index(self._network, self._display_lines, self._use_line_geodata)
+        return self._spatial_index
+
+    def extract_spatial_index(self, network, display_lines, use_line_geodata):
+        """
+        Returns the spatial index of the substations and lines displayed by the map, and the lines' voltage levels.
+        The lines are indexed along the path drawn by the map: their line geodata when used, or a straight segment.
+        """
+        subs_df = self.extract_substations_positions(network)
+        subs_df = subs_df[subs_df.index.isin(get_network_snapshot(network).get_voltage_levels()['substation_id'])]
+        paths_df = None
+        branches_df = pd.DataFrame(columns=['voltage_level1_id', 'voltage_level2_id'], index=pd.Index([], name='id'))
+        if display_lines:
+            branches_df = self.extract_branches_ends(network)
+            # the lines paths: their first end, their line geodata points (if any), their second end
+            ends = []
+            for side, order in ((1, -1), (2, np.inf)):
+                end_df = subs_df.reindex(branches_df[f'substation{side}_id'])
+                ends.append(pd.DataFrame({'id': branches_df.index, 'order': order,
+                                          'latitude': end_df['latitude'].to_numpy(), 'longitude': end_df['longitude'].to_numpy()}))
+            paths = [ends[0], ends[1]]
+            if use_line_geodata:
+                points_df = get_network_snapshot(network).get_extension('linePosition').reset_index()
+                points_df = self.filter_invalid_coordinates(points_df)
+                paths.append(points_df[['id', 'num', 'latitude', 'longitude']].rename(columns={'num': 'order'}))
+            paths_df = pd.concat(paths, ignore_index=True)
+            # the lines without the position of an end are not displayed
+            displayed = ends[0]['latitude'].notna().to_numpy() & ends[1]['latitude'].notna().to_numpy()
+            branches_df = branches_df[displayed]
+            paths_df = paths_df[paths_df['id'].isin(branches_df.index)].sort_values(['id', 'order'], kind='stable')
+        return MapSpatialIndex(subs_df, paths_df), branches_df[['voltage_level1_id', 'voltage_level2_id']]
+
+    def get_region_equipments(self, region: dict, nominal_voltages=None) -> dict:
+        """
+        Completes the substations and lines of a spatial index query with the substations' voltage levels, keeping only
+        the voltage levels at the given nominal voltages (all of them when None), their substations, and the lines with
+        an end at these voltage levels.
+        """
+        self.get_spatial_index()
+        vl_ids = [vl_id for sub_id in region['substations'] for vl_id in self.sub_vls.get(sub_id, [])]
+        line_ids = region['lines']
+        if nominal_voltages is not None:
+            vls_nominal_v = get_network_snapshot(self._network).get_voltage_levels()['nominal_v']
+            nominal_voltages = set(nominal_voltages)
+            vl_ids = [vl_id for vl_id, nominal_v in zip(vl_ids, vls_nominal_v.reindex(vl_ids)) if nominal_v in nominal_voltages]
+            lines_vls = self._branches_vls.reindex(line_ids)
+            lines_nominal_v1 = lines_vls['voltage_level1_id'].map(vls_nominal_v)
+            lines_nominal_v2 = lines_vls['voltage_level2_id'].map(vls_nominal_v)
+            line_ids = lines_vls.index[lines_nominal_v1.isin(nominal_voltages) | lines_nominal_v2.isin(nominal_voltages)].tolist()
+        sub_ids = list(dict.fromkeys(self.vl_subs[vl_id] for vl_id in vl_ids))
+        return {'substations': sub_ids, 'voltage_levels': vl_ids, 'lines': line_ids}
+
+    def query_region(self, shape: str, **kwargs) -> dict:
+        """
+        Returns the substations and lines of a region of the map, using the spatial index:
+        'rectangle' (south, west, north, east), 'polygon' (coordinates: (latitude, longitude) pairs) or
+        'radius' (latitude, longitude, radius in km).
+        """
+        index = self.get_spatial_index()
+        if shape == 'rectangle':
+            return index.query_rectangle(kwargs['south'], kwargs['west'], kwargs['north'], kwargs['east'])
+        if shape == 'polygon':
+            return index.query_polygon(kwargs['coordinates'])
+        if shape == 'radius':
+            return index.query_radius(kwargs['latitude'], kwargs['longitude'], kwargs['radius'])
+        raise ValueError(f'Unknown region shape: {shape}')
+
+    @anywidget.experimental.command
+    def _query_region(self, msg, buffers):
+        with get_profiler().measure('map', 'region_query') as info:
+            arguments = dict(msg.get('region', {}))
+            if arguments.get('shape') == 'polygon':
+                # GeoJSON coordinates: (longitude, latitude)
+                arguments['coordinates'] = [(latitude, longitude) for longitude, latitude in arguments['coordinates']]
+            region = self.get_region_equipments(self.query_region(**arguments), msg.get('nominal_voltages'))
+            data = json.dumps(region)
+            info['payload_size'] = len(data)
+        if msg.get('select', False):
+            self.selected_region = region
+            self.selectregion()
+        return data, buffers
+
+    @anywidget.experimental.command
+    def _get_nearest_substations(self, msg, buffers):
+        with get_profiler().measure('map', 'nearest_substations_query'):
+            distances = self.get_spatial_index().get_nearest_substations(msg['latitude'], msg['longitude'], msg.get('count', 1), msg.get('max_distance'))
+        return json.dumps([{'id': sub_id, 'distance': distance} for sub_id, distance in distances.items()]), buffers
+
     def extract_nominal_voltage_list(self, network, nvls_top_tiers):
         nvls_filtered = []
-        nvls_filtered = sorted(network.get_voltage_levels()['nominal_v'].unique(), reverse=True)
+        nvls_filtered = sorted(get_network_snapshot(network).get_voltage_levels()['nominal_v'].unique(), reverse=True)
         if nvls_top_tiers != -1  :
             nvls_filtered = nvls_filtered[:nvls_top_tiers]
         return nvls_filtered
     
+    def extract_nominal_voltages_data(self, loaded_nominal_voltages, requested_nominal_voltages):
+        """
+        Returns the map data to be added to a map already displaying the loaded nominal voltages, for displaying also the requested ones:
+        the substations having a voltage level at a requested nominal voltage (with all their displayed voltage levels), and the lines, tie lines
+        and HVDC lines having at least one end at a requested nominal voltage.
+        """
+        requested = set(requested_nominal_voltages)
+        nominal_voltages = set(loaded_nominal_voltages) | requested
+        (lmap, lpos, smap, spos, _, _, _, tlmap, hlmap) = self.extract_map_data(self._network, self._display_lines, self._use_line_geodata, nominal_voltages)
+
+        vls_nominal_v = get_network_snapshot(self._network).get_voltage_levels()['nominal_v']
+        requested_vls = set(vls_nominal_v[vls_nominal_v.isin(requested)].index)
+
+        def has_requested_end(branch):
+            return branch['voltageLevelId1'] in requested_vls or branch['voltageLevelId2'] in requested_vls
+
+        smap = [sub for sub in smap if any(vl['id'] in requested_vls for vl in sub['voltageLevels'])]
+        # the positions of the substations already displayed have already been sent
+        new_subs_ids = set(sub['id'] for sub in smap if all(vl['id'] in requested_vls for vl in sub['voltageLevels']))
+        lmap = [line for line in lmap if has_requested_end(line)]
+        lines_ids = set(line['id'] for line in lmap)
+        return {
+            'smap': smap,
+            'spos': [pos for pos in spos if pos['id'] in new_subs_ids],
+            'lmap': lmap,
+            'lpos': [pos for pos in lpos if pos['id'] in lines_ids],
+            'tlmap': [line for line in tlmap if has_requested_end(line)],
+            'hlmap': [line for line in hlmap if has_requested_end(line)],
+        }
+
+    @anywidget.experimental.command
+    def _load_nominal_voltages(self, msg, buffers):
+        with get_profiler().measure('map', 'load_nominal_voltages') as info:
+            data = json.dumps(self.extract_nominal_voltages_data(msg.get('loaded', []), msg.get('requested', [])))
+            info['payload_size'] = len(data)
+        return data, buffers
+
     @anywidget.experimental.command
     def _get_on_hover_info(self, msg, buffers):
         retval = ''
         if self._on_hover_func is not None:
-            try:
-                retval = self._on_hover_func(msg['id'])
-            except Exception as err:
-                retval = f'ERROR {repr(err)}'
+            with get_profiler().measure('map', 'hover_info') as info:
+                try:
+                    retval = self._on_hover_func(msg['id'])
+                except Exception as err:
+                    retval = f'ERROR {repr(err)}'
+                info['payload_size'] = len(retval)
         return retval, buffers
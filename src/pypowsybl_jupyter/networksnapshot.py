@@ -0,0 +1,194 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Lazily populated snapshot of the network tables used by the widgets: the static attributes of each table (names,
+containment, nominal voltages, positions) are fetched from the network at most once, with only the attributes the
+widgets need, and shared by all the widgets built from the same network and variant. The state attributes (flows,
+currents, connection status) change with load flows and switchings: they are read from the network on each access.
+"""
+
+import weakref
+from typing import Any, Callable, Dict
+
+import pandas as pd
+from pypowsybl.network import Network, get_extensions_names
+
+from .scheduler import get_network_scheduler
+
+# table name -> (network getter, static attributes needed by the widgets, state attributes needed by the widgets)
+SNAPSHOT_TABLES = {
+    'substations': ('get_substations', ['name', 'country'], []),
+    'voltage_levels': ('get_voltage_levels', ['name', 'substation_id', 'nominal_v'], []),
+    'lines': ('get_lines', ['name', 'voltage_level1_id', 'voltage_level2_id'], ['connected1', 'connected2', 'p1', 'p2', 'i1', 'i2']),
+    '2_windings_transformers': ('get_2_windings_transformers', ['voltage_level1_id', 'voltage_level2_id'], []),
+    '3_windings_transformers': ('get_3_windings_transformers', ['voltage_level1_id', 'voltage_level2_id', 'voltage_level3_id'], []),
+    'tie_lines': ('get_tie_lines', ['name', 'dangling_line1_id', 'dangling_line2_id'], []),
+    'dangling_lines': ('get_dangling_lines', ['name', 'voltage_level_id'], ['p', 'i', 'connected']),
+    'hvdc_lines': ('get_hvdc_lines', ['name', 'converter_station1_id', 'converter_station2_id'], ['converters_mode', 'connected1', 'connected2']),
+    'lcc_converter_stations': ('get_lcc_converter_stations', ['name', 'voltage_level_id'], ['p', 'i']),
+    'vsc_converter_stations': ('get_vsc_converter_stations', ['name', 'voltage_level_id'], ['p', 'i']),
+}
+
+class NetworkSnapshot:
+    """
+    The network tables needed by the widgets, for a network's variant. The static attributes are fetched on first access
+    and then cached, the state attributes (flows, currents, connection status) are read on each access: the returned
+    dataframes are shared and must not be modified in place.
+
+    The cached attributes do not follow the network's structural changes (e.g., added or removed equipments, renamings,
+    new positions extensions): use :func:`invalidate_network_snapshot` to discard them after such changes.
+
+    Args:
+        network: the input network
+        variant_id: the variant the tables are fetched from. None uses the network's working variant.
+    """
+
+    def __init__(self, network: Network, variant_id: str = None):
+        self._network_ref = weakref.ref(network)
+        self.variant_id = variant_id if variant_id is not None else network.get_working_variant_id()
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._derived: Dict[str, Any] = {}
+
+    @property
+    def network(self) -> Network:
+        network = self._network_ref()
+        if network is None:
+            raise ValueError('The network of this snapshot no longer exists.')
+        return network
+
+    def _read(self, fetch_func) -> pd.DataFrame:
+        network = self.network
+        # granted by the network's scheduler, so that the read does not run concurrently with a write (e.g., a load flow)
+        with get_network_scheduler(network).reading(variant_id=self.variant_id):
+            working_variant_id = network.get_working_variant_id()
+            if working_variant_id == self.variant_id:
+                return fetch_func(network)
+            # nested in an access of another variant by the calling thread
+            network.set_working_variant(self.variant_id)
+            try:
+                return fetch_func(network)
+            finally:
+                network.set_working_variant(working_variant_id)
+
+    def _fetch(self, key: str, fetch_func) -> pd.DataFrame:
+        if key not in self._tables:
+            self._tables[key] = self._read(fetch_func)
+        return self._tables[key]
+
+    def get_table(self, name: str, state: bool = True) -> pd.DataFrame:
+        """
+        Returns one of the SNAPSHOT_TABLES, indexed by id.
+
+        Args:
+            name: the table name
+            state: when True, the table also contains its state attributes, read from the network
+        """
+        getter, attributes, state_attributes = SNAPSHOT_TABLES[name]
+        if not state or not state_attributes:
+            return self._fetch(name, lambda network: getattr(network, getter)(attributes=attributes))
+        if name not in self._tables:
+            # first access: the static and state attributes are read together
+            table = self._read(lambda network: getattr(network, getter)(attributes=attributes + state_attributes))
+            self._tables[name] = table[attributes]
+            return table
+        state_table = self._read(lambda network: getattr(network, getter)(attributes=state_attributes))
+        return pd.concat([self._tables[name], state_table], axis=1)
+
+    def get_extension(self, name: str) -> pd.DataFrame:
+        """
+        Returns an extension's dataframe; empty if the extension is not available in this PyPowSyBl version.
+        """
+        return self._fetch('extension:' + name,
+                           lambda network: network.get_extensions(name) if name in get_extensions_names() else pd.DataFrame())
+
+    def get_substations(self) -> pd.DataFrame:
+        return self.get_table('substations')
+
+    def get_voltage_levels(self) -> pd.DataFrame:
+        return self.get_table('voltage_levels')
+
+    def get_lines(self, state: bool = True) -> pd.DataFrame:
+        return self.get_table('lines', state)
+
+    def get_2_windings_transformers(self) -> pd.DataFrame:
+        return self.get_table('2_windings_transformers')
+
+    def get_3_windings_transformers(self) -> pd.DataFrame:
+        return self.get_table('3_windings_transformers')
+
+    def get_tie_lines(self) -> pd.DataFrame:
+        return self.get_table('tie_lines')
+
+    def get_dangling_lines(self, state: bool = True) -> pd.DataFrame:
+        return self.get_table('dangling_lines', state)
+
+    def get_hvdc_lines(self, state: bool = True) -> pd.DataFrame:
+        return self.get_table('hvdc_lines', state)
+
+    def get_lcc_converter_stations(self, state: bool = True) -> pd.DataFrame:
+        return self.get_table('lcc_converter_stations', state)
+
+    def get_vsc_converter_stations(self, state: bool = True) -> pd.DataFrame:
+        return self.get_table('vsc_converter_stations', state)
+
+    def get_derived(self, name: str, build_func: Callable[[], Any]) -> Any:
+        """
+        Returns a structure computed from the snapshot's static attributes (e.g., the voltage levels graph), built on first access.
+        """
+        if name not in self._derived:
+            self._derived[name] = build_func()
+        return self._derived[name]
+
+    def is_fetched(self, name: str) -> bool:
+        return name in self._tables
+
+    def invalidate(self):
+        self._tables.clear()
+        self._derived.clear()
+
+
+_snapshots: 'weakref.WeakKeyDictionary[Network, Dict[str, NetworkSnapshot]]' = weakref.WeakKeyDictionary()
+
+def get_network_snapshot(network: Network, variant_id: str = None) -> NetworkSnapshot:
+    """
+    Returns the snapshot shared by the widgets built from the network's variant (by default, the working variant).
+
+    Examples:
+
+        .. code-block:: python
+
+            snapshot = get_network_snapshot(network)
+            snapshot.get_voltage_levels()
+    """
+    variant = variant_id if variant_id is not None else network.get_working_variant_id()
+    network_snapshots = _snapshots.setdefault(network, {})
+    snapshot = network_snapshots.get(variant)
+    if snapshot is None:
+        snapshot = NetworkSnapshot(network, variant)
+        network_snapshots[variant] = snapshot
+    return snapshot
+
+def invalidate_network_snapshot(network: Network, variant_id: str = None):
+    """
+    Discards the cached tables of the network (all of its variants, or only the given one), so that the next widgets
+    built from it fetch up-to-date data. To be called after structural changes of the network, e.g., after creating
+    equipments; the state attributes (flows, connection status) are always read from the network.
+
+    Examples:
+
+        .. code-block:: python
+
+            network.create_lines(lines_df)
+            invalidate_network_snapshot(network)
+            NetworkMapWidget(network)
+    """
+    network_snapshots = _snapshots.get(network, {})
+    snapshots = list(network_snapshots.values()) if variant_id is None else [network_snapshots.get(variant_id)]
+    for snapshot in snapshots:
+        if snapshot is not None:
+            snapshot.invalidate()
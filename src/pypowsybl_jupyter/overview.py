@@ -0,0 +1,160 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Aggregated overview of large networks: voltage levels are clustered (by country, nominal voltage, substation, ...)
+into a bounded number of super-nodes, displayed as a network area diagram of a small network built from the clusters,
+where each line stands for all the branches connecting two clusters.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pypowsybl.network as pn
+from pypowsybl.network import Network, NadParameters
+
+from .networksnapshot import get_network_snapshot
+from .vlgraph import VoltageLevelGraph, get_voltage_level_graph
+
+OVERVIEW_CLUSTERING = ['country', 'nominal_v', 'substation']
+
+# clustering of the voltage levels by groups of neighbouring substations, used when no other clustering is bounded enough
+NEIGHBOURHOOD_CLUSTERING = 'neighbourhood'
+
+CLUSTER_ID_PREFIX = 'OVERVIEW_CLUSTER_'
+
+def get_overview_voltage_levels(network: Network) -> pd.DataFrame:
+    """
+    Returns the network's voltage levels, with the attributes used for clustering them: country, nominal_v and substation.
+    """
+    snapshot = get_network_snapshot(network)
+    vls = snapshot.get_voltage_levels()
+    substations = snapshot.get_substations()
+    return pd.DataFrame({
+        'country': vls['substation_id'].map(substations['country']).replace('', pd.NA).fillna('?').to_numpy(),
+        'nominal_v': vls['nominal_v'].to_numpy(),
+        'substation': vls['substation_id'].to_numpy(),
+    }, index=vls.index)
+
+def _get_neighbourhood_keys(vls: pd.DataFrame, graph: VoltageLevelGraph, max_nodes: int) -> pd.Series:
+    # substations ordered by their distance to the first one, then split in max_nodes buckets of neighbouring substations
+    depths = pd.Series(graph.get_depths([vls.index[0]]), index=graph.vl_ids).reindex(vls.index)
+    depths = depths.where(depths >= 0, depths.max() + 1)
+    substations_depths = depths.groupby(vls['substation']).min().sort_values(kind='stable')
+    buckets = pd.Series(np.arange(len(substations_depths)) * max_nodes // len(substations_depths), index=substations_depths.index)
+    return vls['substation'].map(buckets)
+
+def cluster_voltage_levels(vls: pd.DataFrame, graph: VoltageLevelGraph, max_nodes: int,
+                           clustering: List[str] = None) -> Tuple[str, pd.Series]:
+    """
+    Clusters the voltage levels using the first clustering attribute grouping them in more than one and at most max_nodes clusters;
+    when none does, the voltage levels are grouped by neighbouring substations.
+
+    Returns:
+        the clustering attribute used, and the cluster key of each voltage level
+    """
+    for attribute in (clustering if clustering is not None else OVERVIEW_CLUSTERING):
+        keys = vls[attribute]
+        if 1 < keys.nunique() <= max_nodes:
+            return attribute, keys
+    return NEIGHBOURHOOD_CLUSTERING, _get_neighbourhood_keys(vls, graph, max_nodes)
+
+def _get_cluster_label(attribute: str, key, substations_names: pd.Series) -> str:
+    if attribute == 'nominal_v':
+        return f'{key:g} kV'
+    if attribute == 'substation':
+        name = substations_names.get(key, '')
+        return name if isinstance(name, str) and name != '' else str(key)
+    if attribute == NEIGHBOURHOOD_CLUSTERING:
+        return f'Area {key + 1}'
+    return str(key)
+
+def _get_clusters_edges(keys: pd.Series, codes: np.ndarray, graph: VoltageLevelGraph) -> pd.DataFrame:
+    # cluster code of each graph's voltage level, -1 for the voltage levels out of the clustered ones
+    vl_codes = np.full(len(graph.vl_ids), -1, dtype=np.int64)
+    vl_codes[graph.vl_ids.get_indexer(keys.index)] = codes
+    sources = np.repeat(np.arange(len(graph.vl_ids)), np.diff(graph.indptr))
+    code1 = vl_codes[sources]
+    code2 = vl_codes[graph.indices]
+    # each branch is stored in both directions in the graph: only one is kept
+    mask = (code1 >= 0) & (code2 >= 0) & (code1 < code2)
+    pairs, counts = np.unique(np.column_stack([code1[mask], code2[mask]]), axis=0, return_counts=True)
+    return pd.DataFrame({'cluster1': pairs[:, 0], 'cluster2': pairs[:, 1], 'count': counts})
+
+class NetworkOverview:
+    """
+    An aggregated view of a set of voltage levels: the clusters and the small network, built from them, that is displayed in a NAD.
+
+    Args:
+        network: the input network
+        vl_ids: the voltage levels to be clustered. None clusters all the network's voltage levels.
+        max_nodes: the maximum number of clusters
+        clustering: the clustering attributes, in order of preference (default is country, then nominal voltage, then substation)
+    """
+
+    def __init__(self, network: Network, vl_ids: List[str] = None, max_nodes: int = 100, clustering: List[str] = None):
+        vls = get_overview_voltage_levels(network)
+        if vl_ids is not None:
+            vls = vls.loc[vl_ids]
+        graph = get_voltage_level_graph(network)
+        self.attribute, keys = cluster_voltage_levels(vls, graph, max_nodes, clustering)
+
+        codes, uniques = pd.factorize(keys, sort=True)
+        substations_names = get_network_snapshot(network).get_substations()['name']
+        self.cluster_ids = [f'{CLUSTER_ID_PREFIX}{code}' for code in range(len(uniques))]
+        self.labels = [_get_cluster_label(self.attribute, key, substations_names) for key in uniques]
+        grouped = pd.Series(vls.index, index=codes).groupby(level=0)
+        self.members: Dict[str, List[str]] = {self.cluster_ids[code]: list(group) for code, group in grouped}
+        self.nominal_vs = vls['nominal_v'].groupby(codes).max()
+        self.edges = _get_clusters_edges(keys, codes, graph)
+
+    def get_members(self, cluster_id: str) -> List[str]:
+        return self.members.get(cluster_id, [])
+
+    def is_cluster(self, cluster_id: str) -> bool:
+        return cluster_id in self.members
+
+    def get_label(self, cluster_id: str) -> str:
+        return self.labels[self.cluster_ids.index(cluster_id)]
+
+    def create_network(self) -> Network:
+        """
+        Creates the network of the clusters: one voltage level per cluster, one line per pair of connected clusters.
+        """
+        ids = pd.Index(self.cluster_ids, name='id')
+        counts = [len(self.members[cluster_id]) for cluster_id in self.cluster_ids]
+        network = pn.create_empty('overview')
+        network.create_substations(pd.DataFrame(index=pd.Index(['S_' + cluster_id for cluster_id in ids], name='id'),
+                                                data={'name': self.labels}))
+        network.create_voltage_levels(pd.DataFrame(index=ids, data={
+            'substation_id': ['S_' + cluster_id for cluster_id in ids],
+            'topology_kind': 'BUS_BREAKER',
+            'nominal_v': self.nominal_vs.to_numpy(),
+            'name': [f'{label} ({count} VLs)' for label, count in zip(self.labels, counts)],
+        }))
+        network.create_buses(pd.DataFrame(index=pd.Index([cluster_id + '_BUS' for cluster_id in ids], name='id'),
+                                          data={'voltage_level_id': ids}))
+        if not self.edges.empty:
+            vl1_ids = ids[self.edges['cluster1']]
+            vl2_ids = ids[self.edges['cluster2']]
+            network.create_lines(pd.DataFrame(index=pd.Index([f'{vl1}-{vl2}' for vl1, vl2 in zip(vl1_ids, vl2_ids)], name='id'), data={
+                'voltage_level1_id': vl1_ids,
+                'bus1_id': vl1_ids + '_BUS',
+                'voltage_level2_id': vl2_ids,
+                'bus2_id': vl2_ids + '_BUS',
+                'r': 0.0, 'x': 1.0, 'g1': 0.0, 'b1': 0.0, 'g2': 0.0, 'b2': 0.0,
+                'name': [f'{count} branches' if count > 1 else '1 branch' for count in self.edges['count']],
+            }))
+        return network
+
+    def get_network_area_diagram(self):
+        return self.create_network().get_network_area_diagram(nad_parameters=NadParameters(edge_name_displayed=True,
+                                                                                        id_displayed=False,
+                                                                                        edge_info_along_edge=False,
+                                                                                        bus_legend=False,
+                                                                                        substation_description_displayed=False))
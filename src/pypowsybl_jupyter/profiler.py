@@ -0,0 +1,137 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Opt-in profiling of the widgets' hot paths: diagrams generation, data extraction, serialization,
+comm transfer and frontend rendering (as reported back by the browser).
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PROFILING_COLUMNS = ['timestamp', 'widget', 'stage', 'duration', 'payload_size']
+
+class WidgetProfiler:
+    """
+    Collects per-stage timings (in seconds) and payload sizes (in characters) of the widgets.
+    Nothing is recorded until the profiler is enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._records = []
+        self._listeners: List[Callable[[], None]] = []
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def record(self, widget: str, stage: str, duration: float, payload_size: int = None):
+        if not self.enabled:
+            return
+        self._records.append((time.time(), widget, stage, duration, payload_size))
+        for listener in self._listeners:
+            listener()
+
+    @contextmanager
+    def measure(self, widget: str, stage: str):
+        """
+        Times the enclosed block. The yielded dict can be used to set the block's 'payload_size'.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        info = {}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(widget, stage, time.perf_counter() - start, info.get('payload_size'))
+
+    def to_dataframe(self) -> 'pd.DataFrame':
+        import pandas as pd
+
+        df = pd.DataFrame(self._records, columns=PROFILING_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df
+
+    def summary(self) -> 'pd.DataFrame':
+        df = self.to_dataframe()
+        return df.groupby(['widget', 'stage']).agg(count=('duration', 'size'),
+                                                   total=('duration', 'sum'),
+                                                   mean=('duration', 'mean'),
+                                                   max=('duration', 'max'),
+                                                   mean_payload_size=('payload_size', 'mean'))
+
+    def reset(self):
+        self._records.clear()
+        for listener in self._listeners:
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+_profiler = WidgetProfiler()
+
+def get_profiler() -> WidgetProfiler:
+    return _profiler
+
+def enable_profiling(enabled: bool = True):
+    """
+    Enables (or disables) the recording of the widgets' timings. The frontend render times are
+    reported only by the widgets created after profiling has been enabled.
+
+    Examples:
+
+        .. code-block:: python
+
+            enable_profiling()
+            network_explorer(network)
+            ...
+            get_profiling_data()
+    """
+    _profiler.enable(enabled)
+
+def reset_profiling():
+    """
+    Clears the recorded timings.
+    """
+    _profiler.reset()
+
+def get_profiling_data() -> 'pd.DataFrame':
+    """
+    Returns the recorded timings, one row per measure, with columns: timestamp, widget, stage, duration (s), payload_size (characters).
+    """
+    return _profiler.to_dataframe()
+
+def get_profiling_summary() -> 'pd.DataFrame':
+    """
+    Returns the recorded timings aggregated by widget and stage: count, total, mean and max duration (s), mean payload size (characters).
+    """
+    return _profiler.summary()
+
+def profiling_stats_widget():
+    """
+    Returns a widget displaying the profiling summary, refreshed each time a new timing is recorded.
+    """
+    import ipywidgets as widgets
+
+    stats = widgets.HTML(value=_profiler.summary().to_html(float_format='{:.4f}'.format))
+
+    def refresh():
+        stats.value = _profiler.summary().to_html(float_format='{:.4f}'.format)
+
+    _profiler.add_listener(refresh)
+    return stats
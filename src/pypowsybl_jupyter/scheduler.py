@@ -0,0 +1,359 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Scheduling of the accesses to a network shared by the widgets' callbacks and their background work (load flows,
+diagrams generation, hovering): the reads of a variant run concurrently, the writes run alone, and the waiting
+accesses are granted by priority, so that the interactive work is not delayed by the background work.
+"""
+
+import itertools
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, List
+
+import pandas as pd
+from pypowsybl.network import Network
+
+from .profiler import get_profiler
+
+class Priority(IntEnum):
+    """
+    The priorities of the network accesses, from the highest to the lowest.
+    """
+    #: work the user waits for, e.g., the diagram of a selected voltage level
+    INTERACTIVE = 0
+    #: work started by the user, whose results are displayed once available, e.g., a load flow
+    NORMAL = 1
+    #: speculative work, e.g., diagrams prefetching
+    BACKGROUND = 2
+
+SCHEDULER_METRICS_COLUMNS = ['queued', 'running', 'completed', 'mean_wait', 'max_wait']
+
+class _Request:
+    __slots__ = ('priority', 'seq', 'write', 'variant_id', 'func', 'future', 'submit_time', 'admitted')
+
+    def __init__(self, priority: Priority, seq: int, write: bool, variant_id: str, func: Callable = None):
+        self.priority = priority
+        self.seq = seq
+        self.write = write
+        self.variant_id = variant_id
+        # None for the accesses of the calling thread (reading and writing)
+        self.func = func
+        self.future = Future() if func is not None else None
+        self.submit_time = time.perf_counter()
+        self.admitted = False
+
+    def conflicts(self, other: '_Request') -> bool:
+        # the network has a single working variant: the accesses to different variants cannot run concurrently
+        return self.write or other.write or self.variant_id != other.variant_id
+
+class NetworkScheduler:
+    """
+    Serializes the writes, and runs concurrently the reads, of a network's variants: a write waits for the running reads,
+    and a read for the running write, of its variant. As the network has a single working variant, the accesses to
+    another variant wait until the network is idle; the scheduler then switches the working variant, and restores it
+    once idle again.
+
+    The waiting accesses are granted by priority, then in submission order; an access is not granted before the
+    conflicting accesses submitted earlier with the same or a higher priority (e.g., a read waits for a previously
+    submitted write, so that it reads its result).
+
+    The work is either submitted to the scheduler's worker threads (submit_read, submit_write), or run by the calling
+    thread, e.g., a widget's callback on the kernel's thread (reading, writing).
+
+    Args:
+        network: the network
+        max_workers: the number of worker threads running the submitted work
+
+    Examples:
+
+        .. code-block:: python
+
+            scheduler = get_network_scheduler(network)
+            future = scheduler.submit_write(pp.loadflow.run_ac, network, priority=Priority.NORMAL)
+            with scheduler.reading():
+                svg = network.get_single_line_diagram('VL1')
+    """
+
+    def __init__(self, network: Network, max_workers: int = 4, idle_timeout: float = 10.0):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        # the scheduler does not keep the network alive
+        self._network_ref = weakref.ref(network)
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        # waiting requests, by (priority, seq)
+        self._pending: List[_Request] = []
+        # requests granted, waiting for a worker thread
+        self._ready = deque()
+        self._workers = 0
+        self._idle_workers = 0
+        self._readers = 0
+        self._writing = False
+        self._variant_id = None
+        self._restored_variant_id = None
+        self._write_count = 0
+        self._local = threading.local()
+        self._stats = {priority: {'running': 0, 'completed': 0, 'wait_total': 0.0, 'wait_max': 0.0} for priority in Priority}
+
+    @property
+    def network(self) -> Network:
+        network = self._network_ref()
+        if network is None:
+            raise RuntimeError('The network has been garbage collected')
+        return network
+
+    @property
+    def write_count(self) -> int:
+        """
+        The number of completed write accesses, e.g., to detect that the network has been modified since a computation.
+        """
+        with self._cond:
+            return self._write_count
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of accesses waiting to be granted, or granted and waiting for a worker thread.
+        """
+        with self._cond:
+            return len(self._pending) + len(self._ready)
+
+    def _get_default_variant_id(self) -> str:
+        # called with the condition held: the working variant may have been switched for a granted access
+        if self._restored_variant_id is not None:
+            return self._restored_variant_id
+        return self.network.get_working_variant_id()
+
+    def _is_idle(self) -> bool:
+        return self._readers == 0 and not self._writing
+
+    def _can_grant(self, request: _Request, blocked: List[_Request]) -> bool:
+        if any(request.conflicts(blocked_request) for blocked_request in blocked):
+            return False
+        if self._is_idle():
+            return True
+        return request.variant_id == self._variant_id and not request.write and not self._writing
+
+    def _grant(self, request: _Request):
+        if self._is_idle():
+            network = self.network
+            working_variant_id = network.get_working_variant_id()
+            if request.variant_id != working_variant_id:
+                if self._restored_variant_id is None:
+                    self._restored_variant_id = working_variant_id
+                network.set_working_variant(request.variant_id)
+            self._variant_id = request.variant_id
+        if request.write:
+            self._writing = True
+        else:
+            self._readers += 1
+        wait = time.perf_counter() - request.submit_time
+        stats = self._stats[request.priority]
+        stats['running'] += 1
+        stats['wait_total'] += wait
+        stats['wait_max'] = max(stats['wait_max'], wait)
+        get_profiler().record('scheduler', f'{request.priority.name.lower()}_wait', wait)
+
+    def _dispatch(self):
+        # called with the condition held, whenever a request is submitted or released
+        blocked = []
+        pending = []
+        available_workers = self._idle_workers - len(self._ready)
+        for request in self._pending:
+            if request.future is not None and request.future.cancelled():
+                continue
+            if (request.func is None or available_workers > 0) and self._can_grant(request, blocked):
+                if request.func is not None:
+                    if not request.future.set_running_or_notify_cancel():
+                        continue
+                    self._ready.append(request)
+                    available_workers -= 1
+                else:
+                    request.admitted = True
+                self._grant(request)
+            else:
+                pending.append(request)
+                blocked.append(request)
+        self._pending = pending
+        self._cond.notify_all()
+
+    def _release(self, request: _Request):
+        with self._cond:
+            if request.write:
+                self._writing = False
+                self._write_count += 1
+            else:
+                self._readers -= 1
+            stats = self._stats[request.priority]
+            stats['running'] -= 1
+            stats['completed'] += 1
+            if self._is_idle():
+                self._variant_id = None
+                if self._restored_variant_id is not None:
+                    network = self._network_ref()
+                    if network is not None:
+                        network.set_working_variant(self._restored_variant_id)
+                    self._restored_variant_id = None
+            self._dispatch()
+
+    def _enqueue(self, request: _Request):
+        # called with the condition held
+        self._pending.append(request)
+        self._pending.sort(key=lambda pending_request: (pending_request.priority, pending_request.seq))
+        if request.func is not None and self._idle_workers - len(self._ready) <= 0 and self._workers < self.max_workers:
+            self._workers += 1
+            threading.Thread(target=self._work, name=f'pypowsybl-jupyter-scheduler-{self._workers}', daemon=True).start()
+        self._dispatch()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._idle_workers += 1
+                self._dispatch()
+                if not self._ready:
+                    self._cond.wait_for(lambda: self._ready, self.idle_timeout)
+                self._idle_workers -= 1
+                if not self._ready:
+                    # idle for too long: started again by the next submission
+                    self._workers -= 1
+                    return
+                request = self._ready.popleft()
+            self._local.access = 'write' if request.write else 'read'
+            try:
+                result = request.func()
+            except BaseException as err:
+                request.future.set_exception(err)
+            else:
+                request.future.set_result(result)
+            finally:
+                self._local.access = None
+                self._release(request)
+
+    def _submit(self, write: bool, func: Callable, args, kwargs, priority: Priority, variant_id: str) -> Future:
+        with self._cond:
+            request = _Request(Priority(priority), next(self._seq), write,
+                               variant_id if variant_id is not None else self._get_default_variant_id(),
+                               lambda: func(*args, **kwargs))
+            self._enqueue(request)
+        return request.future
+
+    def submit_read(self, func: Callable, *args, priority: Priority = Priority.NORMAL, variant_id: str = None, **kwargs) -> Future:
+        """
+        Submits a function reading the network, run on a worker thread once granted.
+
+        Args:
+            func: the function, called with args and kwargs
+            priority: the access priority
+            variant_id: the variant read by the function. None uses the network's working variant (at submission time).
+
+        Returns:
+            the future of the function's result
+        """
+        return self._submit(False, func, args, kwargs, priority, variant_id)
+
+    def submit_write(self, func: Callable, *args, priority: Priority = Priority.NORMAL, variant_id: str = None, **kwargs) -> Future:
+        """
+        Submits a function modifying the network (e.g., a load flow), run on a worker thread once granted.
+        See submit_read.
+        """
+        return self._submit(True, func, args, kwargs, priority, variant_id)
+
+    @contextmanager
+    def _access(self, write: bool, priority: Priority, variant_id: str, timeout: float):
+        held_access = getattr(self._local, 'access', None)
+        if held_access is not None:
+            # nested in an access of the same thread, e.g., a diagram generation by a submitted function
+            if write and held_access != 'write':
+                raise RuntimeError('A read access of the network cannot be upgraded to a write access')
+            yield
+            return
+        with self._cond:
+            request = _Request(Priority(priority), next(self._seq), write,
+                               variant_id if variant_id is not None else self._get_default_variant_id())
+            self._enqueue(request)
+            try:
+                if not self._cond.wait_for(lambda: request.admitted, timeout):
+                    raise TimeoutError(f'The network access has not been granted within {timeout}s')
+            except BaseException:
+                # e.g., interrupted or timed out while waiting: the request must not block the next ones
+                if request.admitted:
+                    self._release(request)
+                else:
+                    self._pending.remove(request)
+                    self._dispatch()
+                raise
+        self._local.access = 'write' if write else 'read'
+        try:
+            yield
+        finally:
+            self._local.access = None
+            self._release(request)
+
+    def reading(self, priority: Priority = Priority.INTERACTIVE, variant_id: str = None, timeout: float = None):
+        """
+        Context manager granting the calling thread a read access to the network: blocks until granted.
+
+        Args:
+            priority: the access priority
+            variant_id: the variant read. None uses the network's working variant.
+            timeout: when not None, the maximum time, in seconds, to wait for the access (0 does not wait):
+                a TimeoutError is raised if it has not been granted by then, e.g., while a load flow runs.
+        """
+        return self._access(False, priority, variant_id, timeout)
+
+    def writing(self, priority: Priority = Priority.INTERACTIVE, variant_id: str = None, timeout: float = None):
+        """
+        Context manager granting the calling thread a write access to the network: blocks until granted.
+        See reading.
+        """
+        return self._access(True, priority, variant_id, timeout)
+
+    def get_metrics(self) -> pd.DataFrame:
+        """
+        Returns, for each priority: the number of queued accesses (waiting to be granted, or for a worker thread),
+        of running and completed accesses, and the mean and max time, in seconds, the accesses waited before being granted.
+        """
+        with self._cond:
+            queued = {priority: 0 for priority in Priority}
+            for request in itertools.chain(self._pending, self._ready):
+                queued[request.priority] += 1
+            rows = []
+            for priority, stats in self._stats.items():
+                granted = stats['running'] + stats['completed']
+                rows.append([queued[priority], stats['running'], stats['completed'],
+                             stats['wait_total'] / granted if granted > 0 else 0.0, stats['wait_max']])
+        return pd.DataFrame(rows, columns=SCHEDULER_METRICS_COLUMNS, index=pd.Index([priority.name for priority in Priority], name='priority'))
+
+_schedulers: 'weakref.WeakKeyDictionary[Network, NetworkScheduler]' = weakref.WeakKeyDictionary()
+_schedulers_lock = threading.Lock()
+
+def get_network_scheduler(network: Network) -> NetworkScheduler:
+    """
+    Returns the network's shared scheduler, used by the explorers and the background load flows accessing the network.
+
+    Examples:
+
+        .. code-block:: python
+
+            with get_network_scheduler(network).writing():
+                network.update_switches(id='BREAKER', open=True)
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(network)
+        if scheduler is None:
+            scheduler = NetworkScheduler(network)
+            _schedulers[network] = scheduler
+        return scheduler
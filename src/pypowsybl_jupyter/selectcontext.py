@@ -8,6 +8,7 @@
 import pandas as pd
 from collections import deque
 from pypowsybl.network import Network
+from .networksnapshot import get_network_snapshot
 
 class SelectContext:
 
@@ -16,7 +17,7 @@ class SelectContext:
         self.use_name = use_name
         self.display_attribute = 'name' if use_name else 'id'
 
-        self.vls = network.get_voltage_levels(attributes=['name'])
+        self.vls = get_network_snapshot(network).get_voltage_levels()[['name']].copy()
         self.vls['name'] = self.vls['name'].replace('', pd.NA).fillna(self.vls.index.to_series().astype(str))
         self.vls['id'] = self.vls.index
 
@@ -10,6 +10,7 @@ Simple widget which enables to pan and zoom on an SLD's SVG
 and create callbacks on: VL navigation arrows, switches and feeders elements
 """
 
+import itertools
 import pathlib
 
 import anywidget
@@ -20,14 +21,18 @@ from ipywidgets import (
     CallbackDispatcher
 )
 
-from .util import _get_svg_string, _get_svg_metadata
+from .util import _get_svg_string, _get_svg_metadata, _get_payload_size, _load_static_assets
+from .profiler import get_profiler
 from typing import Callable
 
 OnHoverFuncType = Callable[[str, str], str]
 
+_STATIC_PATH = pathlib.Path(__file__).parent / "static"
+
+# identifies the diagrams whose metadata are sent lazily, so that a frontend never receives the metadata of another diagram
+_lazy_metadata_tokens = itertools.count(1)
+
 class SldWidget(anywidget.AnyWidget):
-    _esm = pathlib.Path(__file__).parent / "static" / "sldwidget.js"
-    _css = pathlib.Path(__file__).parent / "static" / "sldwidget.css"
     
     diagram_data  = traitlets.Dict().tag(sync=True)
     clicked_nextvl = traitlets.Unicode().tag(sync=True)
@@ -35,8 +40,14 @@ class SldWidget(anywidget.AnyWidget):
     clicked_feeder = traitlets.Dict().tag(sync=True)
     clicked_bus = traitlets.Dict().tag(sync=True)
     hover_enabled = traitlets.Bool().tag(sync=True)
+    hover_version = traitlets.Int(0).tag(sync=True)
+    pending_switches = traitlets.Dict().tag(sync=True)
+    feeder_values = traitlets.List().tag(sync=True)
+    invalid_lf = traitlets.Bool(False).tag(sync=True)
+    profiling_enabled = traitlets.Bool().tag(sync=True)
     
-    def __init__(self, on_hover_func: OnHoverFuncType, **kwargs):
+    def __init__(self, on_hover_func: OnHoverFuncType, lazy_metadata: str = None, **kwargs):
+        _load_static_assets(SldWidget, _STATIC_PATH / "sldwidget.js", _STATIC_PATH / "sldwidget.css")
         super().__init__(**kwargs)
         self._on_nextvl_handlers = CallbackDispatcher()
         self._on_switch_handlers = CallbackDispatcher()
@@ -44,7 +55,9 @@ class SldWidget(anywidget.AnyWidget):
         self._on_bus_handlers = CallbackDispatcher()
         super().on_msg(self._handle_svgsld_msg)
         self._on_hover_func = on_hover_func
+        self._lazy_metadata = lazy_metadata
         self.hover_enabled = on_hover_func is not None
+        self.profiling_enabled = get_profiler().enabled
 
     def _handle_svgsld_msg(self, _, content, buffers):
         if content.get('event', '') == 'click_nextvl':
@@ -55,6 +68,8 @@ class SldWidget(anywidget.AnyWidget):
             self.on_feeder_msg()
         elif content.get('event', '') == 'click_bus':
             self.on_bus_msg()
+        elif content.get('event', '') == 'profiling':
+            get_profiler().record('sld', content.get('stage'), content.get('duration', 0) / 1000)
 
     #nextvl
     def nextvl(self):
@@ -84,17 +99,63 @@ class SldWidget(anywidget.AnyWidget):
     def on_bus(self, callback, remove=False):
         self._on_bus_handlers.register_callback(callback, remove=remove)
 
+    def set_pending_switches(self, pending_switches):
+        """
+        Displays switches as if their status was already changed (switch id -> open status), e.g., while switch operations are queued.
+        """
+        self.pending_switches = dict(pending_switches)
+
+    def set_feeder_values(self, feeder_values):
+        """
+        Updates the feeder infos labels and arrows of the displayed diagram, without rendering it again
+        (a list of dicts with the feeder info svg id, its label and its arrow direction: 'IN', 'OUT' or None).
+        The feeder values are reset when the diagram is updated.
+        """
+        self.feeder_values = list(feeder_values)
+
+    def set_invalid_lf(self, invalid_lf: bool):
+        """
+        Dims the displayed values (as the diagram's invalid_lf does), without rendering the diagram again, e.g., while a load flow runs.
+        """
+        self.invalid_lf = invalid_lf
+
+    def invalidate_hover_cache(self):
+        """
+        Discards the hover infos cached by the browser, e.g., after the network has been modified.
+        """
+        self.hover_version += 1
+
+    @anywidget.experimental.command
+    def _get_lazy_metadata(self, msg, buffers):
+        # None when the requested metadata are not the displayed diagram's ones
+        if msg.get('token') != self.diagram_data.get('lazy_metadata'):
+            return None, buffers
+        with get_profiler().measure('sld', 'lazy_metadata_send') as info:
+            info['payload_size'] = _get_payload_size(self._lazy_metadata)
+            return self._lazy_metadata, buffers
+
     @anywidget.experimental.command
     def _get_on_hover_info(self, msg, buffers):
         retval = ''
         if self._on_hover_func is not None:
-            try:
-                retval = self._on_hover_func(msg['id'], msg['type'])
-            except Exception as err:
-                retval = f'ERROR {repr(err)}'
+            with get_profiler().measure('sld', 'hover_info') as info:
+                try:
+                    retval = self._on_hover_func(msg['id'], msg['type'])
+                except Exception as err:
+                    retval = f'ERROR {repr(err)}'
+                info['payload_size'] = len(retval)
         return retval, buffers
 
-def display_sld(svg, enable_callbacks: bool = False, invalid_lf: bool = False, on_hover_func: OnHoverFuncType = None) -> SldWidget:
+def _get_diagram_data(svg, enable_callbacks: bool, invalid_lf: bool, lazy_metadata: bool):
+    # returns the diagram_data trait's value, and the metadata kept on the python side in lazy metadata mode
+    svg_metadata = _get_svg_metadata(svg) if enable_callbacks else ""
+    svg_value = _get_svg_string(svg)
+    if lazy_metadata and svg_metadata:
+        return {"value": svg_value, "value_meta": "", "invalid_lf": invalid_lf, "lazy_metadata": next(_lazy_metadata_tokens)}, svg_metadata
+    return {"value": svg_value, "value_meta": svg_metadata, "invalid_lf": invalid_lf}, None
+
+def display_sld(svg, enable_callbacks: bool = False, invalid_lf: bool = False, on_hover_func: OnHoverFuncType = None,
+                lazy_metadata: bool = False) -> SldWidget:
     """
     Displays an SLD's SVG with support for panning and zooming.
 
@@ -103,6 +164,7 @@ def display_sld(svg, enable_callbacks: bool = False, invalid_lf: bool = False, o
         enable_callbacks: if True, enable the callbacks for navigation arrows, feeders and switches.
         invalid_lf: when True the opacity style for some of the displayed info's (e.g., active and reactive power) is decreased, making them barely visible in the diagram.
         on_hover_func: a callback function that is invoked when hovering on equipments. The function parameters are the equipment id and type; It must return an HTML string. None disables the hovering feature. Note that currently the SLD viewer component supports hovering on lines and two winding transformers.
+        lazy_metadata: if True (and enable_callbacks is True), only the SVG is sent to the frontend at first: the diagram's metadata, needed for the callbacks and the hovering, are fetched when the pointer first enters the diagram.
 
     Returns:
         A jupyter widget allowing to zoom and pan the SVG.
@@ -114,11 +176,15 @@ def display_sld(svg, enable_callbacks: bool = False, invalid_lf: bool = False, o
             display_sld(network.get_single_line_diagram('SUB-ID'))
     """
 
-    svg_metadata = "" if not enable_callbacks else _get_svg_metadata(svg)
-    svg_value=_get_svg_string(svg)
-    return SldWidget(diagram_data= {"value": svg_value, "value_meta": svg_metadata, "invalid_lf": invalid_lf}, on_hover_func = on_hover_func)
+    profiler = get_profiler()
+    with profiler.measure('sld', 'svg_extraction'):
+        diagram_data, pending_metadata = _get_diagram_data(svg, enable_callbacks, invalid_lf, lazy_metadata)
+    with profiler.measure('sld', 'widget_creation') as info:
+        info['payload_size'] = _get_payload_size(diagram_data["value"], diagram_data["value_meta"])
+        return SldWidget(diagram_data=diagram_data, on_hover_func = on_hover_func, lazy_metadata=pending_metadata)
 
-def update_sld(sldwidget, svg, keep_viewbox: bool = False, enable_callbacks: bool = False, invalid_lf: bool = False):
+def update_sld(sldwidget, svg, keep_viewbox: bool = False, enable_callbacks: bool = False, invalid_lf: bool = False,
+               lazy_metadata: bool = False):
     """
     Updates an existing SLD widget with a new SVG content.
 
@@ -128,6 +194,7 @@ def update_sld(sldwidget, svg, keep_viewbox: bool = False, enable_callbacks: boo
         keep_viewbox: if True, keeps the current pan and zoom after the update.
         enable_callbacks: if True, enable the callbacks for navigation arrows, feeders and switches.
         invalid_lf: when True the opacity style for some of the displayed info's (e.g., active and reactive power) is decreased, making them barely visible in the diagram.
+        lazy_metadata: if True (and enable_callbacks is True), only the SVG is sent to the frontend at first: the diagram's metadata, needed for the callbacks and the hovering, are fetched when the pointer first enters the diagram.
 
     Examples:
 
@@ -136,6 +203,15 @@ def update_sld(sldwidget, svg, keep_viewbox: bool = False, enable_callbacks: boo
             update_sld(existing_sld_widget, network.get_single_line_diagram('SUB-ID'))
     """    
 
-    svg_metadata = "" if not enable_callbacks else _get_svg_metadata(svg)
-    svg_value=_get_svg_string(svg)
-    sldwidget.diagram_data= {"value": svg_value, "value_meta": svg_metadata, "keep_viewbox": keep_viewbox, "invalid_lf": invalid_lf}
+    profiler = get_profiler()
+    with profiler.measure('sld', 'svg_extraction'):
+        diagram_data, pending_metadata = _get_diagram_data(svg, enable_callbacks, invalid_lf, lazy_metadata)
+        diagram_data["keep_viewbox"] = keep_viewbox
+    with profiler.measure('sld', 'comm_send') as info:
+        info['payload_size'] = _get_payload_size(diagram_data["value"], diagram_data["value_meta"])
+        sldwidget._lazy_metadata = pending_metadata
+        # the feeder values were the previous diagram's ones
+        sldwidget.feeder_values = []
+        sldwidget.diagram_data = diagram_data
+    # the new diagram may reflect a modified network: the hover infos cached by the browser are outdated
+    sldwidget.invalidate_hover_cache()
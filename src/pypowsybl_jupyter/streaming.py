@@ -0,0 +1,137 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Streaming of live branch states (e.g., telemetry) to the NAD and network map widgets: the measurement batches are
+coalesced into frames, sent at a target frame rate, and each frame only carries the branches that changed since
+the previous one. A frame is sent only once the browser has acknowledged the previous one, so that a fast producer
+can neither flood the comm channel nor the browser.
+"""
+
+import asyncio
+from typing import AsyncIterable, Callable, Dict, List, Union
+
+import pandas as pd
+
+from .profiler import get_profiler
+from .timeseries import to_branch_states
+
+BranchStatesBatch = Union[pd.DataFrame, List[dict]]
+
+BRANCH_STATES_DELTA_MESSAGE = 'branchStatesDelta'
+BRANCH_STATES_ACK_EVENT = 'branch_states_ack'
+
+class BranchStatesStream:
+    """
+    A stream of branch states to a widget's frontend, see NadWidget.stream_branch_states and NetworkMapWidget.stream_branch_states.
+
+    Args:
+        widget: the widget the frames are sent to
+        kind: the widget kind, for the profiling ('nad' or 'map')
+        fps: the target frame rate, i.e., the maximum number of frames sent per second
+        ack_timeout: the maximum time, in seconds, to wait for the browser's acknowledgement of a frame before sending the next one
+            (e.g., when the widget is not displayed, nothing acknowledges the frames)
+        on_end: called with the merged branch states (branch id -> state) of the whole stream, once it ends
+    """
+
+    def __init__(self, widget, kind: str, fps: float = 10, ack_timeout: float = 1.0,
+                 on_end: Callable[[Dict[str, dict]], None] = None):
+        if fps <= 0:
+            raise ValueError('fps must be strictly positive')
+        self.widget = widget
+        self.kind = kind
+        self.fps = fps
+        self.ack_timeout = ack_timeout
+        self.on_end = on_end
+        self.states: Dict[str, dict] = {}
+        self.stats = {'batches': 0, 'states': 0, 'frames': 0, 'sent_states': 0, 'ack_timeouts': 0}
+        self._seq = 0
+        self._acked_seq = 0
+        self._loop = None
+        self._ack_event = None
+
+    def acknowledge(self, seq: int):
+        """
+        Called when the browser acknowledges a frame. Can be called from any thread.
+        """
+        if self._loop is not None and seq is not None:
+            self._loop.call_soon_threadsafe(self._on_ack, seq)
+
+    def _on_ack(self, seq: int):
+        if seq > self._acked_seq:
+            self._acked_seq = seq
+        if self._acked_seq >= self._seq:
+            self._ack_event.set()
+
+    async def _wait_ack(self):
+        if self._acked_seq >= self._seq:
+            return
+        try:
+            await asyncio.wait_for(self._ack_event.wait(), self.ack_timeout)
+        except asyncio.TimeoutError:
+            # the frame is given up on: the next one is not delayed by it anymore
+            self._acked_seq = self._seq
+            self.stats['ack_timeouts'] += 1
+
+    def _send_frame(self, changed: List[dict]):
+        self._seq += 1
+        self._ack_event.clear()
+        with get_profiler().measure(self.kind, 'stream_frame') as info:
+            self.widget.send({'type': BRANCH_STATES_DELTA_MESSAGE, 'seq': self._seq, 'states': changed})
+            info['payload_size'] = len(changed)
+        self.stats['frames'] += 1
+        self.stats['sent_states'] += len(changed)
+
+    async def run(self, batches: AsyncIterable[BranchStatesBatch]) -> dict:
+        """
+        Consumes the batches until the iterator is exhausted, then returns the stream statistics.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._ack_event = asyncio.Event()
+        pending: Dict[str, dict] = {}
+        period = 1 / self.fps
+
+        async def consume():
+            async for batch in batches:
+                states = to_branch_states(batch) if isinstance(batch, pd.DataFrame) else batch
+                for state in states:
+                    pending[state['branchId']] = state
+                self.stats['batches'] += 1
+                self.stats['states'] += len(states)
+                # gives the frames sender a chance to run, even when the producer never awaits
+                await asyncio.sleep(0)
+
+        consumer = asyncio.ensure_future(consume())
+        try:
+            while True:
+                frame_start = self._loop.time()
+                consumed = consumer.done()
+                # the browser is not sent anything before it has processed the previous frame: meanwhile, the
+                # batches keep being merged into the pending states
+                await self._wait_ack()
+                changed = [state for branch_id, state in pending.items() if self.states.get(branch_id) != state]
+                pending.clear()
+                if changed:
+                    self._send_frame(changed)
+                    self.states.update((state['branchId'], state) for state in changed)
+                if consumed:
+                    break
+                await asyncio.sleep(max(0.0, period - (self._loop.time() - frame_start)))
+            # raises the producer's exception, if any
+            consumer.result()
+        finally:
+            consumer.cancel()
+            if self.on_end is not None:
+                self.on_end(self.states)
+        return self.stats
+
+def start_branch_states_stream(stream: BranchStatesStream, batches: AsyncIterable[BranchStatesBatch]) -> asyncio.Task:
+    """
+    Runs the stream as a background task of the running event loop (e.g., the jupyter kernel's), so that the
+    browser's acknowledgements are received while the stream runs.
+    """
+    return asyncio.ensure_future(stream.run(batches))
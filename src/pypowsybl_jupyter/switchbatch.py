@@ -0,0 +1,49 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Queue of switch operations, applied to the network all at once: a switching sequence then costs
+a single network update and a single diagrams refresh, instead of one per switch.
+"""
+
+from typing import Dict
+
+from pypowsybl.network import Network
+
+class SwitchBatch:
+    """
+    The pending switch operations: switch id -> requested open status.
+    Queueing again an operation on a pending switch cancels it (the switch goes back to its network status).
+    """
+
+    def __init__(self):
+        self.pending: Dict[str, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def toggle(self, switch_id: str, open: bool):
+        if switch_id in self.pending:
+            del self.pending[switch_id]
+        else:
+            self.pending[switch_id] = open
+
+    def discard(self):
+        self.pending.clear()
+
+    def commit(self, network: Network) -> int:
+        """
+        Applies the pending operations to the network's working variant, with a single update_switches call.
+
+        Returns:
+            the number of applied operations
+        """
+        count = len(self.pending)
+        if count > 0:
+            network.update_switches(id=list(self.pending), open=list(self.pending.values()))
+            self.pending.clear()
+        return count
@@ -0,0 +1,300 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Sources of branch time series for the NAD explorer: an in-memory dataframe, or Parquet/Arrow/Feather files read
+out-of-core with pyarrow (an optional dependency). Only the time steps around the displayed one are materialized,
+and the decoded time steps are kept in a small LRU cache.
+The per-branch aggregates over the whole series (max, mean, percentile, ...) are computed in a single pass.
+"""
+
+import pathlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+TIME_SERIES_COLUMNS = ['timestamp', 'branch_id', 'value1', 'value2', 'connected1', 'connected2']
+
+class TimeSeriesSource(ABC):
+    """
+    Base class of the time series sources: the sorted time steps, and the rows of a time step, read on demand.
+
+    Args:
+        cache_size: the maximum number of decoded time steps kept in memory
+        window: the number of time steps read, before and after a requested time step that is not cached, in the same pass
+    """
+
+    def __init__(self, cache_size: int = 32, window: int = 2):
+        self.cache_size = max(1, cache_size)
+        self.window = max(0, window)
+        self._cache: 'OrderedDict[int, pd.DataFrame]' = OrderedDict()
+        self._steps: pd.Index = None
+
+    @abstractmethod
+    def _read_steps(self) -> pd.Index:
+        """
+        Returns the sorted time steps.
+        """
+
+    @abstractmethod
+    def _read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Returns the rows of the time steps from position start (included) to stop (excluded).
+        """
+
+    @abstractmethod
+    def iter_frames(self, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Iterates over all the rows of the time series, as successive dataframes, e.g., to compute aggregates in a single pass.
+        """
+
+    @property
+    def time_steps(self) -> pd.Index:
+        """
+        The sorted time steps.
+        """
+        if self._steps is None:
+            self._steps = self._read_steps()
+        return self._steps
+
+    def get_time_step(self, time_step) -> pd.DataFrame:
+        """
+        Returns the rows of a time step.
+        """
+        position = self.time_steps.get_loc(time_step)
+        frame = self._cache.get(position)
+        if frame is not None:
+            self._cache.move_to_end(position)
+            return frame
+
+        start = max(0, position - self.window)
+        stop = min(len(self.time_steps), position + self.window + 1)
+        rows = self._read_rows(start, stop)
+        codes = self.time_steps[start:stop].get_indexer(rows['timestamp'])
+        groups = {code: group for code, group in rows.groupby(codes, sort=False)}
+        # the requested time step is cached last, so that it is the last one evicted
+        for step_position in sorted(range(start, stop), key=lambda p: p == position):
+            step_rows = groups.get(step_position - start, rows.iloc[0:0])
+            self._cache[step_position] = step_rows.reset_index(drop=True)
+            self._cache.move_to_end(step_position)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return self._cache[position]
+
+    def clear_cache(self):
+        self._cache.clear()
+
+class DataFrameTimeSeriesSource(TimeSeriesSource):
+    """
+    Time series held in memory, in a dataframe with the TIME_SERIES_COLUMNS.
+    """
+
+    def __init__(self, data: pd.DataFrame, cache_size: int = 32, window: int = 2):
+        super().__init__(cache_size, window)
+        self.data = data
+
+    def _read_steps(self) -> pd.Index:
+        return pd.Index(np.sort(self.data['timestamp'].unique()))
+
+    def _read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        return self.data[self.data['timestamp'].isin(self.time_steps[start:stop])]
+
+    def iter_frames(self, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        yield self.data if columns is None else self.data[columns]
+
+class ArrowTimeSeriesSource(TimeSeriesSource):
+    """
+    Time series read out-of-core with pyarrow, from a pyarrow dataset or table, or from Parquet, Arrow IPC or Feather
+    files (a file, or a directory of files). Arrow IPC and Feather files are memory-mapped; Parquet row groups are filtered
+    on the timestamp column statistics, so that, when the files are sorted by timestamp, only the row groups of the requested
+    time steps are read.
+
+    Args:
+        source: a pyarrow dataset or table, or the path of a file or a directory
+        file_format: the files format, 'parquet' or 'ipc' (Arrow IPC and Feather). None guesses it from the file extension.
+        cache_size: the maximum number of decoded time steps kept in memory
+        window: the number of time steps read, before and after a requested time step that is not cached, in the same pass
+    """
+
+    def __init__(self, source, file_format: str = None, cache_size: int = 32, window: int = 2):
+        super().__init__(cache_size, window)
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+            import pyarrow.fs as fs
+        except ImportError as err:
+            raise ImportError('Reading time series from files requires pyarrow: pip install pyarrow') from err
+
+        if isinstance(source, ds.Dataset):
+            self.dataset = source
+        elif isinstance(source, pa.Table):
+            self.dataset = ds.dataset(source)
+        else:
+            path = pathlib.Path(source)
+            if file_format is None:
+                file_format = _guess_file_format(path)
+            self.dataset = ds.dataset(str(path), format=file_format, filesystem=fs.LocalFileSystem(use_mmap=True))
+        self._steps_array = None
+
+    def _read_steps(self) -> pd.Index:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # the distinct time steps, one record batch at a time, so that the whole column is never in memory
+        uniques = [pc.unique(batch.column(0)) for batch in self.dataset.to_batches(columns=['timestamp'])]
+        steps = pc.unique(pa.chunked_array(uniques, type=self.dataset.schema.field('timestamp').type))
+        self._steps_array = steps.take(pc.sort_indices(steps))
+        return pd.Index(self._steps_array.to_pandas())
+
+    def _read_rows(self, start: int, stop: int) -> pd.DataFrame:
+        import pyarrow.dataset as ds
+
+        steps = self._steps_array[start:stop]
+        return self.dataset.to_table(filter=ds.field('timestamp').isin(steps)).to_pandas()
+
+    def iter_frames(self, columns: List[str] = None) -> Iterator[pd.DataFrame]:
+        for batch in self.dataset.to_batches(columns=columns):
+            yield batch.to_pandas()
+
+def _guess_file_format(path: pathlib.Path) -> str:
+    file_path = path if path.is_file() else next((p for p in path.rglob('*') if p.is_file()), path)
+    if file_path.suffix.lower() in ('.arrow', '.feather', '.ipc'):
+        return 'ipc'
+    return 'parquet'
+
+TimeSeriesType = Union[pd.DataFrame, TimeSeriesSource, str, pathlib.Path]
+
+def get_time_series_source(time_series_data: TimeSeriesType) -> TimeSeriesSource:
+    """
+    Returns the time series source of a dataframe, of Parquet/Arrow/Feather files path, or of a pyarrow dataset or table.
+    A TimeSeriesSource is returned as is.
+    """
+    if isinstance(time_series_data, TimeSeriesSource):
+        return time_series_data
+    if isinstance(time_series_data, pd.DataFrame):
+        return DataFrameTimeSeriesSource(time_series_data)
+    return ArrowTimeSeriesSource(time_series_data)
+
+def _get_column(data: pd.DataFrame, column: str, default, dtype) -> np.ndarray:
+    if column in data:
+        return data[column].to_numpy(dtype=dtype)
+    return np.full(len(data), default, dtype=dtype)
+
+def to_branch_states(data: pd.DataFrame) -> List[dict]:
+    """
+    Converts time series rows (branch_id, value1, value2, connected1 and connected2 columns; the missing values and
+    connection status columns default to 0 and True) to the branch states format of the network-viewer API.
+    """
+    return pd.DataFrame({
+        'branchId': data['branch_id'].to_numpy(dtype=object),
+        'value1': _get_column(data, 'value1', 0, float),
+        'value2': _get_column(data, 'value2', 0, float),
+        'connected1': _get_column(data, 'connected1', True, bool),
+        'connected2': _get_column(data, 'connected2', True, bool),
+    }).to_dict('records')
+
+def _grow(values: np.ndarray, size: int, fill) -> np.ndarray:
+    if len(values) >= size:
+        return values
+    return np.concatenate([values, np.full(size - len(values), fill, dtype=values.dtype)])
+
+def compute_branch_aggregates(time_series_data: TimeSeriesType, percentile: float = 95, threshold: float = None) -> pd.DataFrame:
+    """
+    Computes per-branch aggregates of the branches loading, i.e., the max of the absolute side values (value1 and value2),
+    over all the time steps, in a single pass over the time series.
+
+    Args:
+        time_series_data: the time series, as accepted by :func:`get_time_series_source`
+        percentile: the loading percentile to compute, between 0 and 100. None skips it: the percentile needs all the loadings in memory (12 bytes per row), the other aggregates do not.
+        threshold: when not None, the number of time steps where the loading is above this threshold is computed too
+
+    Returns:
+        A dataframe indexed by branch id, with columns: count (time steps with a value), max, peak_timestamp (time step of the max),
+        mean, then p<percentile> (e.g., p95) and above_threshold, when requested.
+
+    Examples:
+
+        .. code-block:: python
+
+            compute_branch_aggregates('time_series.parquet', percentile=99, threshold=100)
+    """
+    source = get_time_series_source(time_series_data)
+    branch_codes = {}
+    counts = np.zeros(0, dtype=np.int64)
+    sums = np.zeros(0)
+    maxs = np.zeros(0)
+    peak_timestamps = np.zeros(0, dtype=object)
+    above = np.zeros(0, dtype=np.int64)
+    all_codes = []
+    all_loadings = []
+
+    for frame in source.iter_frames(columns=['timestamp', 'branch_id', 'value1', 'value2']):
+        loadings = np.fmax(np.abs(frame['value1'].to_numpy(dtype=float)), np.abs(frame['value2'].to_numpy(dtype=float)))
+        valid = ~np.isnan(loadings)
+        frame_codes, uniques = pd.factorize(frame['branch_id'])
+        frame_codes = frame_codes[valid]
+        loadings = loadings[valid]
+        timestamps = frame['timestamp'].to_numpy()[valid]
+        codes = np.array([branch_codes.setdefault(branch_id, len(branch_codes)) for branch_id in uniques], dtype=np.int64)[frame_codes]
+
+        size = len(branch_codes)
+        counts = _grow(counts, size, 0) + np.bincount(codes, minlength=size)
+        sums = _grow(sums, size, 0.0) + np.bincount(codes, weights=loadings, minlength=size)
+        if threshold is not None:
+            above = _grow(above, size, 0) + np.bincount(codes[loadings > threshold], minlength=size)
+
+        frame_maxs = np.full(size, -np.inf)
+        np.maximum.at(frame_maxs, codes, loadings)
+        # first row of each branch's max, in this frame
+        peak_rows = np.flatnonzero(loadings == frame_maxs[codes])
+        _, first_rows = np.unique(codes[peak_rows], return_index=True)
+        peak_rows = peak_rows[first_rows]
+        maxs = _grow(maxs, size, -np.inf)
+        peak_timestamps = _grow(peak_timestamps, size, None)
+        improved = peak_rows[loadings[peak_rows] > maxs[codes[peak_rows]]]
+        maxs[codes[improved]] = loadings[improved]
+        peak_timestamps[codes[improved]] = timestamps[improved]
+
+        if percentile is not None:
+            all_codes.append(codes.astype(np.int32))
+            all_loadings.append(loadings)
+
+    aggregates = pd.DataFrame({
+        'count': counts,
+        'max': np.where(counts > 0, maxs, np.nan),
+        'peak_timestamp': peak_timestamps,
+        'mean': sums / np.maximum(counts, 1),
+    }, index=pd.Index(list(branch_codes), name='branch_id'))
+    if percentile is not None:
+        aggregates[f'p{percentile:g}'] = _compute_percentiles(all_codes, all_loadings, counts, percentile)
+    if threshold is not None:
+        aggregates['above_threshold'] = above
+    return aggregates
+
+def _compute_percentiles(codes: List[np.ndarray], loadings: List[np.ndarray], counts: np.ndarray, percentile: float) -> np.ndarray:
+    # percentile with linear interpolation, as numpy.percentile, of each branch's sorted loadings
+    codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int32)
+    loadings = np.concatenate(loadings) if loadings else np.zeros(0)
+    # sorted by branch, then by loading
+    sorted_loadings = loadings[np.lexsort((loadings, codes))]
+    starts = np.cumsum(counts) - counts
+    positions = np.maximum(counts - 1, 0) * (percentile / 100)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    result = np.full(len(counts), np.nan)
+    has_values = counts > 0
+    low_values = sorted_loadings[(starts + lower)[has_values]]
+    high_values = sorted_loadings[(starts + upper)[has_values]]
+    # interpolated from the nearest value, as numpy does, so that the results are the same
+    fractions = (positions - lower)[has_values]
+    differences = high_values - low_values
+    result[has_values] = np.where(fractions < 0.5, low_values + differences * fractions,
+                                  high_values - differences * (1 - fractions))
+    return result
@@ -20,3 +20,19 @@ def _get_svg_metadata(svg) -> str:
         return svg._metadata
     else:
         raise ValueError('svg argument provide a _metadata method.')    
+
+def _get_payload_size(*values) -> int:
+    return sum(len(v) for v in values if v is not None)
+
+def _load_static_assets(widget_class, esm_path, css_path):
+    # the static bundles are resolved on the first widget instantiation, not when the module is imported
+    if '_esm' not in widget_class.__dict__:
+        widget_class._esm = esm_path.read_text(encoding='utf-8')
+        widget_class._css = css_path.read_text(encoding='utf-8')
+
+def _get_widget_state(widget) -> dict:
+    # the state of the widget's own synced traits, as sent to its views (without anywidget's frontend code and the layout)
+    import anywidget
+    base_traits = anywidget.AnyWidget.class_trait_names(sync=True)
+    traits = [name for name in widget.trait_names(sync=True) if name not in base_traits and not name.startswith('_')]
+    return widget.get_state(traits)
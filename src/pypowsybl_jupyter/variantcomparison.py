@@ -0,0 +1,186 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Comparison of two variants of a network (e.g., a base case and a contingency or planning variant): the diagrams are
+laid out and rendered once, then display the base values, the variant values or their differences. Switching between
+them only sends the branch and bus values to the browser.
+"""
+
+from typing import List
+
+import ipywidgets as widgets
+import numpy as np
+import pandas as pd
+from pypowsybl.network import Network, NadParameters
+
+from .nadwidget import display_nad
+from .networkmapwidget import NetworkMapWidget
+from .profiler import get_profiler
+from .scheduler import get_network_scheduler
+from .flowsrefresh import (
+    get_terminal_values, get_bus_values, get_nad_branch_states, get_nad_voltage_level_states, get_map_branch_states
+)
+
+COMPARISON_MODES = ['base', 'variant', 'delta']
+
+_VALUES_COLUMNS = ['p', 'q', 'i']
+_BUS_VALUES_COLUMNS = ['v_mag', 'v_angle']
+
+def _subtract(variant: pd.DataFrame, base: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    # aligned on the variant's index: the equipments missing from the base variant get NaN differences
+    delta = variant.copy()
+    delta[columns] = variant[columns].to_numpy(dtype=float) - base.reindex(variant.index)[columns].to_numpy(dtype=float)
+    return delta
+
+class VariantComparison:
+    """
+    The terminal values (p, q, i and connection status) and the buses values (voltage magnitude and angle) of two
+    variants of a network, and their differences (variant - base; the connection status are the variant's ones).
+
+    Args:
+        network: the network
+        variant_id: the compared variant
+        base_variant_id: the reference variant. None uses the network's working variant.
+
+    Examples:
+
+        .. code-block:: python
+
+            network.clone_variant(network.get_working_variant_id(), 'N-1')
+            ...
+            comparison = VariantComparison(network, 'N-1')
+            comparison.get_terminal_values('delta')
+    """
+
+    def __init__(self, network: Network, variant_id: str, base_variant_id: str = None):
+        self.network = network
+        self.variant_id = variant_id
+        self.base_variant_id = base_variant_id if base_variant_id is not None else network.get_working_variant_id()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reads again the values of both variants, e.g., after running a load flow on one of them.
+        """
+        with get_profiler().measure('variant_comparison', 'values_read'):
+            values = {}
+            for mode, variant_id in (('base', self.base_variant_id), ('variant', self.variant_id)):
+                # the scheduler switches the working variant, then restores it
+                with get_network_scheduler(self.network).reading(variant_id=variant_id):
+                    values[mode] = (get_terminal_values(self.network), get_bus_values(self.network))
+        with get_profiler().measure('variant_comparison', 'delta_computation'):
+            (base_terminals, base_buses), (variant_terminals, variant_buses) = values['base'], values['variant']
+            values['delta'] = (_subtract(variant_terminals, base_terminals, _VALUES_COLUMNS),
+                               _subtract(variant_buses, base_buses, _BUS_VALUES_COLUMNS))
+        self._values = values
+
+    def get_terminal_values(self, mode: str) -> pd.DataFrame:
+        """
+        Returns the terminal values of the base variant, of the compared variant, or their differences ('base', 'variant' or 'delta'),
+        indexed by (equipment id, side), see flowsrefresh.get_terminal_values.
+        """
+        return self._values[mode][0]
+
+    def get_bus_values(self, mode: str) -> pd.DataFrame:
+        """
+        Returns the buses voltage magnitude and angle of the base variant, of the compared variant, or their differences ('base', 'variant' or 'delta').
+        """
+        return self._values[mode][1]
+
+    def get_largest_deltas(self, count: int = 10, column: str = 'p') -> pd.DataFrame:
+        """
+        Returns the terminals whose value changed the most between the two variants, by absolute difference.
+        """
+        delta = self.get_terminal_values('delta')[column]
+        order = np.argsort(-np.abs(delta.to_numpy(dtype=float)))
+        # NaN differences are sorted last
+        order = order[~np.isnan(delta.to_numpy(dtype=float)[order])][:count]
+        return pd.DataFrame({
+            'base': self.get_terminal_values('base')[column].reindex(delta.index[order]).to_numpy(),
+            'variant': self.get_terminal_values('variant')[column].reindex(delta.index[order]).to_numpy(),
+            'delta': delta.iloc[order].to_numpy(),
+        }, index=delta.index[order])
+
+def compare_variants(network: Network, variant_id: str, base_variant_id: str = None, voltage_level_ids: list = None, depth: int = 1,
+                     nad_parameters: NadParameters = None, display_map: bool = True, mode: str = 'delta'):
+    """
+    Creates a widget comparing two variants of a network, with a NAD and, optionally, a network map. The diagrams are laid out
+    and rendered once; the 'Base', 'Variant' and 'Delta' buttons switch their displayed values (branch flows, bus voltages,
+    branches connection status) without sending the diagrams again.
+
+    Args:
+        network: the input network
+        variant_id: the compared variant (e.g., a contingency or a planning variant)
+        base_variant_id: the reference variant. None uses the network's working variant.
+        voltage_level_ids: the voltage levels displayed by the NAD. None displays all the network's voltage levels.
+        depth: the NAD depth around the voltage levels
+        nad_parameters: layout properties to adjust the svg rendering for the NAD
+        display_map: when True (default), a 'Network map' tab displays the compared lines flows on the network's map
+        mode: the initially displayed values: 'base', 'variant' or 'delta' (variant - base, the default)
+
+    Returns:
+        the comparison widget. Its `comparison` attribute is the VariantComparison, whose values are read again, and displayed, by the 'Refresh' button.
+
+    Examples:
+
+        .. code-block:: python
+
+            network.clone_variant(network.get_working_variant_id(), 'N-1')
+            network.set_working_variant('N-1')
+            network.update_lines(id='L1', connected1=False, connected2=False)
+            pp.loadflow.run_ac(network)
+            network.set_working_variant(network.get_variant_ids()[0])
+
+            compare_variants(network, 'N-1', voltage_level_ids=['VL1'], depth=2)
+    """
+    if mode not in COMPARISON_MODES:
+        raise ValueError(f'mode must be one of {COMPARISON_MODES}')
+
+    profiler = get_profiler()
+    comparison = VariantComparison(network, variant_id, base_variant_id)
+
+    with get_network_scheduler(network).reading(variant_id=comparison.base_variant_id):
+        nad_voltage_level_ids = voltage_level_ids if voltage_level_ids is not None else list(network.get_voltage_levels(attributes=[]).index)
+        with profiler.measure('variant_comparison', 'nad_generation'):
+            nad = network.get_network_area_diagram(voltage_level_ids=nad_voltage_level_ids, depth=depth, nad_parameters=nad_parameters)
+        nad_metadata = nad.metadata
+        nad_widget = display_nad(nad, drag_enabled=False)
+        map_widget = NetworkMapWidget(network) if display_map else None
+
+    def show_values(selected_mode: str):
+        with profiler.measure('variant_comparison', 'values_send'):
+            terminal_values = comparison.get_terminal_values(selected_mode)
+            nad_widget.set_branch_states(get_nad_branch_states(nad_metadata, terminal_values))
+            nad_widget.set_voltage_level_states(get_nad_voltage_level_states(nad_metadata, comparison.get_bus_values(selected_mode)))
+            if map_widget is not None:
+                map_widget.set_branch_states(get_map_branch_states(terminal_values))
+
+    mode_buttons = widgets.ToggleButtons(options=[('Base', 'base'), ('Variant', 'variant'), ('Delta', 'delta')], value=mode,
+                                         tooltips=[f'Values of {comparison.base_variant_id}', f'Values of {variant_id}',
+                                                   f'{variant_id} - {comparison.base_variant_id}'])
+    mode_buttons.observe(lambda d: show_values(d['new']), names='value')
+
+    refresh_button = widgets.Button(description='Refresh', tooltip='Read again the values of both variants')
+
+    def refresh(_):
+        comparison.refresh()
+        show_values(mode_buttons.value)
+
+    refresh_button.on_click(refresh)
+
+    show_values(mode)
+
+    if map_widget is not None:
+        diagrams = widgets.Tab()
+        diagrams.children = [nad_widget, map_widget]
+        diagrams.titles = ['Network Area', 'Network map']
+    else:
+        diagrams = nad_widget
+    comparison_widget = widgets.VBox([widgets.HBox([mode_buttons, refresh_button]), diagrams])
+    comparison_widget.comparison = comparison
+    return comparison_widget
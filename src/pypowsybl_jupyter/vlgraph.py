@@ -0,0 +1,142 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+"""
+Adjacency graph of the network's voltage levels (through lines, transformers, tie lines and HVDC lines),
+used to compute the voltage levels displayed in a network area diagram for a given depth without going through the network.
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pypowsybl.network import Network
+
+from .networksnapshot import NetworkSnapshot, get_network_snapshot
+
+class VoltageLevelGraph:
+    """
+    Voltage levels adjacency graph, stored as a CSR structure: the neighbours of the voltage level i
+    are indices[indptr[i]:indptr[i + 1]].
+
+    Args:
+        vl_ids: the voltage levels ids
+        edges: a (n, 2) array of voltage levels indices pairs, one per connection between two voltage levels
+    """
+
+    def __init__(self, vl_ids: pd.Index, edges: np.ndarray):
+        self.vl_ids = vl_ids
+        vls_count = len(vl_ids)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        sources = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+        order = np.argsort(sources, kind='stable')
+        self.indices = targets[order]
+        self.indptr = np.zeros(vls_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=vls_count), out=self.indptr[1:])
+
+    def _get_indices(self, vl_ids: List[str]) -> np.ndarray:
+        indices = self.vl_ids.get_indexer(vl_ids)
+        if (indices < 0).any():
+            unknown = [vl_id for vl_id, index in zip(vl_ids, indices) if index < 0]
+            raise ValueError(f'voltage levels {unknown} do not exist in the network.')
+        return indices
+
+    def _get_neighbours(self, frontier: np.ndarray) -> np.ndarray:
+        starts = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - starts
+        # positions, in indices, of the neighbours of all the frontier's voltage levels
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.indices[positions]
+
+    def get_depths(self, vl_ids: List[str], max_depth: int = -1) -> np.ndarray:
+        """
+        Returns, for each voltage level, its distance to the given voltage levels (-1 when farther than max_depth or unreachable).
+        A max_depth of -1 means no limit.
+        """
+        depths = np.full(len(self.vl_ids), -1, dtype=np.int64)
+        frontier = np.unique(self._get_indices(vl_ids))
+        depths[frontier] = 0
+        depth = 0
+        while len(frontier) > 0 and (max_depth == -1 or depth < max_depth):
+            depth += 1
+            neighbours = self._get_neighbours(frontier)
+            frontier = np.unique(neighbours[depths[neighbours] == -1])
+            depths[frontier] = depth
+        return depths
+
+    def get_voltage_levels(self, vl_ids: List[str], depth: int) -> List[str]:
+        """
+        Returns the ids of the voltage levels at most at the given depth from the given voltage levels,
+        i.e., the voltage levels displayed in a network area diagram built with the same voltage levels and depth.
+        """
+        depths = self.get_depths(vl_ids, depth)
+        return sorted(self.vl_ids[depths >= 0])
+
+    def get_voltage_levels_counts(self, vl_ids: List[str], max_depth: int) -> List[int]:
+        """
+        Returns the number of voltage levels that would be displayed for each depth, from 0 to max_depth.
+        """
+        depths = self.get_depths(vl_ids, max_depth)
+        return np.cumsum(np.bincount(depths[depths >= 0], minlength=max_depth + 1)).tolist()
+
+
+def format_voltage_levels_counts(counts: List[int], max_items: int = 10) -> str:
+    """
+    Formats the number of voltage levels displayed for each depth, up to the depth from which all the reachable voltage levels are displayed.
+    """
+    last_depth = counts.index(counts[-1])
+    items = [f'{depth}: {count}' for depth, count in enumerate(counts[:min(last_depth + 1, max_items)])]
+    if last_depth < max_items and last_depth < len(counts) - 1:
+        items[-1] = f'{last_depth}+: {counts[last_depth]}'
+    elif last_depth >= max_items:
+        items.append('...')
+    return 'VLs by depth - ' + ', '.join(items)
+
+def _get_edges(vl_ids: pd.Index, snapshot: NetworkSnapshot) -> np.ndarray:
+    pairs = [
+        snapshot.get_lines(state=False)[['voltage_level1_id', 'voltage_level2_id']].to_numpy(),
+        snapshot.get_2_windings_transformers()[['voltage_level1_id', 'voltage_level2_id']].to_numpy(),
+    ]
+
+    t3wt = snapshot.get_3_windings_transformers()
+    for side1, side2 in (('voltage_level1_id', 'voltage_level2_id'), ('voltage_level1_id', 'voltage_level3_id'), ('voltage_level2_id', 'voltage_level3_id')):
+        pairs.append(t3wt[[side1, side2]].to_numpy())
+
+    dangling_vls = snapshot.get_dangling_lines(state=False)['voltage_level_id']
+    tie_lines = snapshot.get_tie_lines()
+    pairs.append(np.column_stack([dangling_vls.reindex(tie_lines['dangling_line1_id']).to_numpy(),
+                                  dangling_vls.reindex(tie_lines['dangling_line2_id']).to_numpy()]))
+
+    stations_vls = pd.concat([snapshot.get_lcc_converter_stations(state=False)['voltage_level_id'],
+                              snapshot.get_vsc_converter_stations(state=False)['voltage_level_id']])
+    hvdc_lines = snapshot.get_hvdc_lines(state=False)
+    pairs.append(np.column_stack([stations_vls.reindex(hvdc_lines['converter_station1_id']).to_numpy(),
+                                  stations_vls.reindex(hvdc_lines['converter_station2_id']).to_numpy()]))
+
+    pairs = np.concatenate([p.reshape(-1, 2) for p in pairs])
+    edges = np.column_stack([vl_ids.get_indexer(pairs[:, 0]), vl_ids.get_indexer(pairs[:, 1])])
+    return edges[(edges >= 0).all(axis=1)]
+
+def get_voltage_level_graph(network: Network) -> VoltageLevelGraph:
+    """
+    Returns the voltage levels graph of the network's working variant, built once and cached with the network snapshot.
+
+    Examples:
+
+        .. code-block:: python
+
+            graph = get_voltage_level_graph(network)
+            graph.get_voltage_levels(['VL1'], depth=2)
+    """
+    snapshot = get_network_snapshot(network)
+
+    def build():
+        vl_ids = snapshot.get_voltage_levels().index
+        return VoltageLevelGraph(vl_ids, _get_edges(vl_ids, snapshot))
+
+    return snapshot.get_derived('voltage_level_graph', build)
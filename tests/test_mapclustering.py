@@ -0,0 +1,130 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pypowsybl_jupyter.mapclustering import CLUSTER_CELL_SIZE, build_map_clusters
+
+ZOOM_THRESHOLD = 9
+
+
+@pytest.fixture(scope='module')
+def network_positions():
+    rng = np.random.default_rng(11)
+    count = 400
+    substations = pd.DataFrame({
+        'name': [f'substation {i}' for i in range(count)],
+        # dense areas, and isolated substations
+        'latitude': np.concatenate([rng.normal(48.8, 0.05, 100), rng.normal(45.7, 0.3, 100), rng.uniform(42, 51, 200)]),
+        'longitude': np.concatenate([rng.normal(2.3, 0.05, 100), rng.normal(4.8, 0.3, 100), rng.uniform(-5, 8, 200)]),
+        'nominal_v': rng.choice([63.0, 90.0, 225.0, 400.0], count),
+    }, index=pd.Index([f'S{i}' for i in range(count)], name='id'))
+    branches_count = 600
+    branches = pd.DataFrame({
+        'substation1_id': rng.choice(substations.index, branches_count),
+        'substation2_id': rng.choice(substations.index, branches_count),
+        'p1': rng.normal(0, 100, branches_count),
+        'connected': rng.random(branches_count) > 0.1,
+    })
+    # a branch to a substation without position, and a branch without flow
+    branches.loc[0, 'substation2_id'] = 'UNKNOWN'
+    branches.loc[1, 'p1'] = np.nan
+    return substations, branches
+
+
+@pytest.fixture(scope='module')
+def levels(network_positions):
+    return build_map_clusters(*network_positions, zoom_threshold=ZOOM_THRESHOLD)
+
+
+def _expected_cells(substations: pd.DataFrame, zoom: int) -> pd.Series:
+    # the grid cell of each substation at a zoom level, as a (column, row) tuple, from the Web Mercator coordinates
+    cells_count = 256 * 2 ** zoom / CLUSTER_CELL_SIZE
+    cells = {}
+    for substation_id, row in substations.iterrows():
+        latitude = math.radians(row.latitude)
+        x = (row.longitude + 180) / 360
+        y = (1 - math.log(math.tan(latitude) + 1 / math.cos(latitude)) / math.pi) / 2
+        cells[substation_id] = (math.floor(x * cells_count), math.floor(y * cells_count))
+    return pd.Series(cells)
+
+
+def _expected_clusters(substations: pd.DataFrame, zoom: int) -> list:
+    # the substations ids of each cluster, sorted by cell
+    cells = _expected_cells(substations, zoom)
+    return [list(ids) for _, ids in sorted(cells.groupby(cells).groups.items())]
+
+
+def test_levels(levels):
+    assert [level['zoom'] for level in levels] == list(range(ZOOM_THRESHOLD))
+
+
+@pytest.mark.parametrize('zoom', range(ZOOM_THRESHOLD))
+def test_clusters(network_positions, levels, zoom):
+    substations, _ = network_positions
+    clusters = levels[zoom]['clusters']
+    expected = _expected_clusters(substations, zoom)
+    assert [cluster['count'] for cluster in clusters] == [len(ids) for ids in expected]
+    for cluster, ids in zip(clusters, expected):
+        members = substations.loc[ids]
+        assert cluster['nominalV'] == members['nominal_v'].max()
+        assert cluster['lat'] == pytest.approx(members['latitude'].mean(), rel=1e-12)
+        assert cluster['lon'] == pytest.approx(members['longitude'].mean(), rel=1e-12)
+        assert cluster['name'] == (members['name'].iloc[0] if len(ids) == 1 else f'{len(ids)} substations')
+
+
+@pytest.mark.parametrize('zoom', range(ZOOM_THRESHOLD - 1))
+def test_clusters_nesting(network_positions, zoom):
+    # each cluster is split into whole clusters at the next zoom level
+    substations, _ = network_positions
+    parents = _expected_cells(substations, zoom)
+    for ids in _expected_clusters(substations, zoom + 1):
+        assert parents[ids].nunique() == 1
+    assert len(_expected_clusters(substations, zoom)) <= len(_expected_clusters(substations, zoom + 1))
+
+
+@pytest.mark.parametrize('zoom', range(ZOOM_THRESHOLD))
+def test_bundles(network_positions, levels, zoom):
+    substations, branches = network_positions
+    cluster_ids = {}
+    for cluster, ids in zip(levels[zoom]['clusters'], _expected_clusters(substations, zoom)):
+        cluster_ids.update({substation_id: cluster['id'] for substation_id in ids})
+    cluster_indices = {cluster['id']: index for index, cluster in enumerate(levels[zoom]['clusters'])}
+
+    expected = {}
+    for branch in branches.itertuples():
+        if branch.substation1_id not in cluster_ids or branch.substation2_id not in cluster_ids:
+            continue
+        cluster1, cluster2 = cluster_ids[branch.substation1_id], cluster_ids[branch.substation2_id]
+        if cluster1 == cluster2:
+            continue
+        flow = 0.0 if np.isnan(branch.p1) else branch.p1
+        # oriented from the lower cluster index
+        if cluster_indices[cluster1] > cluster_indices[cluster2]:
+            cluster1, cluster2, flow = cluster2, cluster1, -flow
+        bundle = expected.setdefault((cluster1, cluster2), {'count': 0, 'connected': 0, 'p': 0.0})
+        bundle['count'] += 1
+        bundle['connected'] += int(branch.connected)
+        bundle['p'] += flow
+
+    bundles = {(bundle['cluster1'], bundle['cluster2']): bundle for bundle in levels[zoom]['bundles']}
+    assert bundles.keys() == expected.keys()
+    for key, bundle in bundles.items():
+        assert bundle['count'] == expected[key]['count']
+        assert bundle['connected'] == expected[key]['connected']
+        assert bundle['p'] == pytest.approx(expected[key]['p'], rel=1e-9, abs=1e-9)
+        assert bundle['name'] == ('1 line' if bundle['count'] == 1 else f"{bundle['count']} lines")
+
+
+def test_no_clusters(network_positions):
+    substations, branches = network_positions
+    assert build_map_clusters(substations, branches, zoom_threshold=0) == []
+    assert build_map_clusters(substations.iloc[:0], branches, zoom_threshold=ZOOM_THRESHOLD) == []
@@ -0,0 +1,197 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pypowsybl_jupyter.mapindex import MapSpatialIndex
+
+KM_PER_DEGREE = 6371.0088 * math.pi / 180
+
+
+class _BruteForce:
+    """
+    The expected query results, computed by scanning all the substations and lines segments.
+    """
+
+    def __init__(self, substations: pd.DataFrame, lines: pd.DataFrame):
+        self.reference_latitude = substations['latitude'].mean()
+        self.substations = {substation_id: self.project(row.latitude, row.longitude) for substation_id, row in substations.iterrows()}
+        self.lines = {}
+        for line_id, points in lines.groupby('id', sort=False):
+            path = [self.project(latitude, longitude) for latitude, longitude in zip(points['latitude'], points['longitude'])]
+            self.lines[line_id] = list(zip(path[:-1], path[1:]))
+
+    def project(self, latitude, longitude):
+        return (longitude * KM_PER_DEGREE * math.cos(math.radians(self.reference_latitude)), latitude * KM_PER_DEGREE)
+
+    def rectangle(self, south, west, north, east):
+        x_min, y_min = self.project(south, west)
+        x_max, y_max = self.project(north, east)
+        corners = [(x_min, y_min), (x_max, y_min), (x_max, y_max), (x_min, y_max)]
+        edges = list(zip(corners, corners[1:] + corners[:1]))
+
+        def in_box(point):
+            return x_min <= point[0] <= x_max and y_min <= point[1] <= y_max
+
+        substations = {substation_id for substation_id, point in self.substations.items() if in_box(point)}
+        lines = {line_id for line_id, segments in self.lines.items()
+                 if any(in_box(a) or in_box(b) or any(_cross(a, b, c, d) for c, d in edges) for a, b in segments)}
+        return substations, lines
+
+    def polygon(self, coordinates):
+        vertices = [self.project(latitude, longitude) for latitude, longitude in coordinates]
+        edges = list(zip(vertices, vertices[1:] + vertices[:1]))
+        substations = {substation_id for substation_id, point in self.substations.items() if _in_polygon(point, vertices)}
+        lines = {line_id for line_id, segments in self.lines.items()
+                 if any(_in_polygon(a, vertices) or any(_cross(a, b, c, d) for c, d in edges) for a, b in segments)}
+        return substations, lines
+
+    def distances(self, latitude, longitude):
+        x, y = self.project(latitude, longitude)
+        return pd.Series({substation_id: math.hypot(point[0] - x, point[1] - y) for substation_id, point in self.substations.items()})
+
+    def radius(self, latitude, longitude, radius):
+        point = self.project(latitude, longitude)
+        distances = self.distances(latitude, longitude)
+        lines = {line_id for line_id, segments in self.lines.items() if min(_distance(point, a, b) for a, b in segments) <= radius}
+        return set(distances[distances <= radius].index), lines
+
+
+def _orientation(p, q, r):
+    value = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+    return int(value > 0) - int(value < 0)
+
+
+def _cross(a, b, c, d):
+    return _orientation(a, b, c) != _orientation(a, b, d) and _orientation(c, d, a) != _orientation(c, d, b)
+
+
+def _in_polygon(point, vertices):
+    inside = False
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[-1:] + vertices[:-1]):
+        if (y1 > point[1]) != (y2 > point[1]) and point[0] < (x2 - x1) * (point[1] - y1) / (y2 - y1) + x1:
+            inside = not inside
+    return inside
+
+
+def _distance(point, a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    squared_length = dx * dx + dy * dy
+    t = 0 if squared_length == 0 else min(max(((point[0] - a[0]) * dx + (point[1] - a[1]) * dy) / squared_length, 0), 1)
+    return math.hypot(a[0] + t * dx - point[0], a[1] + t * dy - point[1])
+
+
+@pytest.fixture(scope='module')
+def positions():
+    rng = np.random.default_rng(7)
+    count = 300
+    substations = pd.DataFrame({
+        'latitude': rng.uniform(43, 51, count),
+        'longitude': rng.uniform(-4, 8, count),
+    }, index=pd.Index([f'S{i}' for i in range(count)], name='id'))
+    rows = []
+    for i in range(150):
+        # short lines between neighbouring points, and a few long ones crossing many grid cells
+        points_count = rng.integers(2, 6)
+        step = 2.0 if i % 10 == 0 else 0.1
+        latitude, longitude = rng.uniform(43, 51), rng.uniform(-4, 8)
+        for _ in range(points_count):
+            rows.append((f'L{i}', latitude, longitude))
+            latitude += rng.normal(0, step)
+            longitude += rng.normal(0, step)
+    lines = pd.DataFrame(rows, columns=['id', 'latitude', 'longitude'])
+    return substations, lines
+
+
+@pytest.fixture(scope='module')
+def index(positions):
+    return MapSpatialIndex(*positions)
+
+
+@pytest.fixture(scope='module')
+def brute_force(positions):
+    return _BruteForce(*positions)
+
+
+def _random_points(count, seed):
+    rng = np.random.default_rng(seed)
+    return zip(rng.uniform(43, 51, count), rng.uniform(-4, 8, count))
+
+
+@pytest.mark.parametrize('size', [0.05, 0.5, 3])
+def test_query_rectangle(index, brute_force, size):
+    for latitude, longitude in _random_points(20, 1):
+        result = index.query_rectangle(latitude, longitude, latitude + size, longitude + size * 1.5)
+        substations, lines = brute_force.rectangle(latitude, longitude, latitude + size, longitude + size * 1.5)
+        assert set(result['substations']) == substations
+        assert set(result['lines']) == lines
+
+
+@pytest.mark.parametrize('size', [0.2, 1, 4])
+def test_query_polygon(index, brute_force, size):
+    rng = np.random.default_rng(2)
+    for latitude, longitude in _random_points(20, 3):
+        # a star-shaped, generally non convex, polygon around the point
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 7))
+        radii = rng.uniform(0.2, 1, 7) * size
+        coordinates = list(zip(latitude + radii * np.sin(angles), longitude + radii * np.cos(angles)))
+        result = index.query_polygon(coordinates)
+        substations, lines = brute_force.polygon(coordinates)
+        assert set(result['substations']) == substations
+        assert set(result['lines']) == lines
+
+
+def test_query_polygon_degenerate(index):
+    assert index.query_polygon([(45, 2), (46, 3)]) == {'substations': [], 'lines': []}
+
+
+@pytest.mark.parametrize('radius', [5, 40, 250])
+def test_query_radius(index, brute_force, radius):
+    for latitude, longitude in _random_points(20, 4):
+        result = index.query_radius(latitude, longitude, radius)
+        substations, lines = brute_force.radius(latitude, longitude, radius)
+        assert set(result['substations']) == substations
+        assert set(result['lines']) == lines
+        # sorted by distance
+        distances = brute_force.distances(latitude, longitude)[result['substations']]
+        assert distances.is_monotonic_increasing
+
+
+@pytest.mark.parametrize('count', [1, 5, 300, 400])
+def test_nearest_substations(index, brute_force, count):
+    for latitude, longitude in _random_points(20, 5):
+        nearest = index.get_nearest_substations(latitude, longitude, count=count)
+        expected = brute_force.distances(latitude, longitude).sort_values(kind='stable').iloc[:count]
+        assert nearest.index.tolist() == expected.index.tolist()
+        np.testing.assert_allclose(nearest.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_nearest_substations_max_distance(index, brute_force):
+    for latitude, longitude in _random_points(20, 6):
+        nearest = index.get_nearest_substations(latitude, longitude, count=10, max_distance=30)
+        distances = brute_force.distances(latitude, longitude).sort_values(kind='stable')
+        expected = distances[distances <= 30].iloc[:10]
+        assert nearest.index.tolist() == expected.index.tolist()
+
+
+def test_far_point(index, brute_force):
+    # outside of the substations' bounding box
+    nearest = index.get_nearest_substations(60, 20, count=3)
+    expected = brute_force.distances(60, 20).sort_values(kind='stable').iloc[:3]
+    assert nearest.index.tolist() == expected.index.tolist()
+    assert index.query_radius(60, 20, 10) == {'substations': [], 'lines': []}
+
+
+def test_empty_index():
+    index = MapSpatialIndex(pd.DataFrame({'latitude': [], 'longitude': []}))
+    assert index.query_rectangle(40, 0, 50, 10) == {'substations': [], 'lines': []}
+    assert index.query_radius(45, 5, 100) == {'substations': [], 'lines': []}
+    assert index.get_nearest_substations(45, 5, count=3).empty
@@ -0,0 +1,198 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+import threading
+import time
+
+import pypowsybl.network as pn
+import pytest
+
+from pypowsybl_jupyter.scheduler import NetworkScheduler, Priority
+
+TIMEOUT = 10
+
+
+@pytest.fixture
+def network():
+    return pn.create_four_substations_node_breaker_network()
+
+
+@pytest.fixture
+def scheduler(network):
+    return NetworkScheduler(network, max_workers=4)
+
+
+class _ActiveAccesses:
+    """
+    Counts the running reads and writes, and the accesses started while a write was running or that started a write
+    while other accesses were running.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = {'read': 0, 'write': 0}
+        self.max_readers = 0
+        self.overlaps = 0
+
+    def run(self, kind: str, duration: float = 0.02):
+        with self._lock:
+            if self.active['write'] > 0 or (kind == 'write' and self.active['read'] > 0):
+                self.overlaps += 1
+            self.active[kind] += 1
+            self.max_readers = max(self.max_readers, self.active['read'])
+        time.sleep(duration)
+        with self._lock:
+            self.active[kind] -= 1
+
+
+class _HeldWrite:
+    """
+    Holds a write access on a worker thread until exited: the accesses of the calling thread are not nested in it.
+    """
+
+    def __init__(self, scheduler: NetworkScheduler):
+        self._scheduler = scheduler
+        self._granted = threading.Event()
+        self._release = threading.Event()
+
+    def _hold(self):
+        self._granted.set()
+        self._release.wait(TIMEOUT)
+
+    def __enter__(self):
+        self._future = self._scheduler.submit_write(self._hold)
+        assert self._granted.wait(TIMEOUT)
+        return self
+
+    def __exit__(self, *args):
+        self._release.set()
+        self._future.result(TIMEOUT)
+
+
+def test_reads_run_concurrently(scheduler):
+    # both reads must be in their access at the same time for the barrier to be passed
+    barrier = threading.Barrier(3, timeout=TIMEOUT)
+
+    def read():
+        barrier.wait()
+        return True
+
+    futures = [scheduler.submit_read(read), scheduler.submit_read(read)]
+    with scheduler.reading():
+        barrier.wait()
+    assert all(future.result(TIMEOUT) for future in futures)
+
+
+def test_writes_run_alone(scheduler):
+    accesses = _ActiveAccesses()
+    futures = []
+    for i in range(12):
+        if i % 3 == 0:
+            futures.append(scheduler.submit_write(accesses.run, 'write'))
+        else:
+            futures.append(scheduler.submit_read(accesses.run, 'read'))
+    for future in futures:
+        future.result(TIMEOUT)
+    assert accesses.overlaps == 0
+    # the reads between two writes run concurrently
+    assert accesses.max_readers > 1
+
+
+def test_read_waits_for_running_write(scheduler):
+    with _HeldWrite(scheduler):
+        with pytest.raises(TimeoutError):
+            with scheduler.reading(timeout=0.05):
+                pass
+        future = scheduler.submit_read(lambda: 'read')
+        time.sleep(0.05)
+        assert not future.done()
+    assert future.result(TIMEOUT) == 'read'
+
+
+def test_priority_ordering(scheduler):
+    order = []
+    with _HeldWrite(scheduler):
+        # submitted in the reverse order of their priorities, while the network is written
+        futures = [scheduler.submit_write(order.append, priority.name, priority=priority)
+                   for priority in (Priority.BACKGROUND, Priority.NORMAL, Priority.INTERACTIVE)]
+        time.sleep(0.05)
+        assert order == []
+    for future in futures:
+        future.result(TIMEOUT)
+    assert order == ['INTERACTIVE', 'NORMAL', 'BACKGROUND']
+
+
+def test_same_priority_in_submission_order(scheduler):
+    order = []
+    with _HeldWrite(scheduler):
+        futures = [scheduler.submit_write(order.append, i, priority=Priority.BACKGROUND) for i in range(5)]
+    for future in futures:
+        future.result(TIMEOUT)
+    assert order == list(range(5))
+
+
+def test_release_on_exception(scheduler):
+    with pytest.raises(ValueError):
+        with scheduler.writing():
+            raise ValueError('failed write')
+    with scheduler.writing(timeout=0):
+        pass
+
+    def fail():
+        raise ValueError('failed submitted write')
+
+    future = scheduler.submit_write(fail)
+    assert isinstance(future.exception(TIMEOUT), ValueError)
+    with scheduler.writing(timeout=TIMEOUT):
+        pass
+    assert scheduler.write_count == 4
+    assert scheduler.queue_depth == 0
+
+
+def test_timed_out_access_does_not_block(scheduler):
+    with _HeldWrite(scheduler):
+        with pytest.raises(TimeoutError):
+            with scheduler.writing(timeout=0.05):
+                pass
+    with scheduler.reading(timeout=0):
+        pass
+    assert scheduler.queue_depth == 0
+
+
+def test_nested_access(scheduler):
+    with scheduler.writing():
+        with scheduler.reading(timeout=0):
+            pass
+    with scheduler.reading():
+        with pytest.raises(RuntimeError):
+            with scheduler.writing():
+                pass
+
+
+def test_variant_access_restores_working_variant(network, scheduler):
+    network.clone_variant('InitialState', 'variant')
+
+    def read_variant():
+        return network.get_working_variant_id()
+
+    assert scheduler.submit_read(read_variant, variant_id='variant').result(TIMEOUT) == 'variant'
+    with scheduler.reading(variant_id='variant'):
+        assert network.get_working_variant_id() == 'variant'
+    assert network.get_working_variant_id() == 'InitialState'
+
+
+def test_metrics(scheduler):
+    with scheduler.reading(priority=Priority.BACKGROUND):
+        pass
+    scheduler.submit_write(lambda: None, priority=Priority.NORMAL).result(TIMEOUT)
+    # the worker releases the access after setting the future's result
+    deadline = time.time() + TIMEOUT
+    while scheduler.get_metrics().loc['NORMAL', 'completed'] != 1 and time.time() < deadline:
+        time.sleep(0.01)
+    metrics = scheduler.get_metrics()
+    assert metrics['completed'].to_dict() == {'INTERACTIVE': 0, 'NORMAL': 1, 'BACKGROUND': 1}
+    assert metrics['queued'].sum() == 0
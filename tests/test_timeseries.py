@@ -0,0 +1,101 @@
+# Copyright (c) 2025, RTE (http://www.rte-france.com)
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+# SPDX-License-Identifier: MPL-2.0
+#
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pypowsybl_jupyter.timeseries import DataFrameTimeSeriesSource, compute_branch_aggregates
+
+
+class _ChunkedTimeSeriesSource(DataFrameTimeSeriesSource):
+    """
+    Iterates over the rows in chunks, as the out-of-core sources do, to aggregate several frames.
+    """
+
+    def __init__(self, data: pd.DataFrame, chunk_size: int):
+        super().__init__(data)
+        self.chunk_size = chunk_size
+
+    def iter_frames(self, columns=None):
+        for start in range(0, len(self.data), self.chunk_size):
+            frame = self.data.iloc[start:start + self.chunk_size]
+            yield frame if columns is None else frame[columns]
+
+
+@pytest.fixture
+def time_series():
+    rng = np.random.default_rng(42)
+    steps = 200
+    branches = [f'B{i}' for i in range(7)]
+    data = pd.DataFrame({
+        'timestamp': np.repeat(pd.date_range('2025-01-01', periods=steps, freq='h'), len(branches)),
+        'branch_id': np.tile(branches, steps),
+        'value1': rng.normal(0, 300, steps * len(branches)).round(1),
+        'value2': rng.normal(0, 300, steps * len(branches)).round(1),
+    })
+    # missing values, and a branch without any value
+    data.loc[rng.choice(len(data), 50, replace=False), 'value1'] = np.nan
+    data.loc[data['branch_id'] == 'B6', ['value1', 'value2']] = np.nan
+    return data.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+def _expected_aggregates(data: pd.DataFrame, percentile: float, threshold: float) -> pd.DataFrame:
+    loadings = np.fmax(data['value1'].abs(), data['value2'].abs())
+    valid = data.assign(loading=loadings).dropna(subset=['loading'])
+    groups = valid.groupby('branch_id', sort=False)['loading']
+    # the first time step of the max, in the rows order
+    peaks = valid.loc[groups.idxmax(), ['branch_id', 'timestamp']].set_index('branch_id')['timestamp']
+    expected = pd.DataFrame({
+        'count': groups.count(),
+        'max': groups.max(),
+        'peak_timestamp': peaks,
+        'mean': groups.mean(),
+        f'p{percentile:g}': groups.apply(lambda values: np.percentile(values.to_numpy(), percentile)),
+        'above_threshold': groups.apply(lambda values: (values > threshold).sum()),
+    })
+    return expected.reindex(data['branch_id'].unique())
+
+
+@pytest.mark.parametrize('chunk_size', [None, 1, 97])
+@pytest.mark.parametrize('percentile', [0, 50, 95, 99.9, 100])
+def test_branch_aggregates(time_series, chunk_size, percentile):
+    source = time_series if chunk_size is None else _ChunkedTimeSeriesSource(time_series, chunk_size)
+    aggregates = compute_branch_aggregates(source, percentile=percentile, threshold=250)
+    expected = _expected_aggregates(time_series, percentile, 250)
+
+    assert aggregates.index.tolist() == expected.index.tolist()
+    assert aggregates['count'].tolist() == expected['count'].fillna(0).astype(int).tolist()
+    assert aggregates['above_threshold'].tolist() == expected['above_threshold'].fillna(0).astype(int).tolist()
+    np.testing.assert_array_equal(aggregates['max'].to_numpy(), expected['max'].to_numpy())
+    np.testing.assert_array_equal(aggregates[f'p{percentile:g}'].to_numpy(), expected[f'p{percentile:g}'].to_numpy())
+    # summed in a different order
+    np.testing.assert_allclose(aggregates['mean'].to_numpy(), expected['mean'].fillna(0).to_numpy(), rtol=1e-12)
+    has_values = aggregates['count'] > 0
+    assert aggregates['peak_timestamp'][has_values].tolist() == expected['peak_timestamp'][has_values].tolist()
+    assert pd.isna(aggregates.loc['B6', 'peak_timestamp'])
+
+
+@pytest.mark.parametrize('percentile', [33.3, 90, 95, 99])
+def test_branch_aggregates_percentile_matches_numpy(time_series, percentile):
+    aggregates = compute_branch_aggregates(time_series, percentile=percentile)
+    for branch_id, values in time_series.groupby('branch_id'):
+        loadings = np.fmax(values['value1'].abs(), values['value2'].abs()).dropna().to_numpy()
+        if len(loadings) > 0:
+            assert aggregates.loc[branch_id, f'p{percentile:g}'] == np.percentile(loadings, percentile)
+
+
+def test_branch_aggregates_optional_columns(time_series):
+    aggregates = compute_branch_aggregates(time_series, percentile=None)
+    assert aggregates.columns.tolist() == ['count', 'max', 'peak_timestamp', 'mean']
+
+
+def test_branch_aggregates_empty():
+    empty = pd.DataFrame({'timestamp': [], 'branch_id': [], 'value1': [], 'value2': []})
+    aggregates = compute_branch_aggregates(empty, percentile=95, threshold=100)
+    assert aggregates.empty
+    assert aggregates.columns.tolist() == ['count', 'max', 'peak_timestamp', 'mean', 'p95', 'above_threshold']